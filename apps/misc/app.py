@@ -2,77 +2,121 @@ from __future__ import annotations
 
 import json
 import random
+import time
+from collections import Counter
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
-import re
 
 import gradio as gr
-import pandas as pd
+
+from engine import (
+    INDEXED_MODES,
+    SEARCH_MODES,
+    STREAM_INTERVAL_S,
+    column_values,
+    feed_index,
+    find_record,
+    first_hf_record,
+    get_dataset_config_names,
+    get_first_record,
+    guess_conversation,
+    index_source,
+    indexed_records,
+    is_huggingface_id,
+    list_hf_configs,
+    load_dataset,
+    new_query,
+    rank_documents,
+    record_at,
+    records_at,
+    scan_page,
+    source_records,
+    write_index,
+)
+from fulltext import tokenize
+from near_dups import NearDupBuilder, open_near_dups
+from projection import compile_projection
+from sampling import StratifiedReservoir, sample_indices, seeded_rng
+from serving import MAX_THREADS, queue_options, search_event_options
+from source_stats import SourceStats, load_source_stats
 
 DATASET_LINK = "jihyoung/MiSC"
+# Records rendered per result page; searches stop as soon as a page is full
+PAGE_SIZE = 10
+# Histogram rows before the tail is folded into a final "≥" row
+STATS_HISTOGRAM_BINS = 20
+# Near-duplicate clusters listed per request, and members shown per cluster
+NEAR_DUP_MAX_CLUSTERS = 50
+NEAR_DUP_MEMBERS_SHOWN = 10
+# Largest sample per request (per stratum when stratified), and strata listed
+SAMPLE_MAX_SIZE = 500
+SAMPLE_MAX_STRATA = 50
+
+
+def _bar(count: int, peak: int, width: int = 24) -> str:
+    return "█" * max(1, round(width * count / peak)) if count else ""
+
 
-try:
-    from datasets import load_dataset, get_dataset_config_names
-except Exception:  # pragma: no cover - optional dependency at authoring time
-    load_dataset = None
-    get_dataset_config_names = None
-
-
-def is_huggingface_id(src: str) -> bool:
-    s = (src or "").strip()
-    if s.startswith("hf://"):
-        return True
-    # Treat local/absolute/relative paths as NON-HF
-    if s.startswith("/") or s.startswith("./") or s.startswith("../"):
-        return False
-    if Path(s).exists():
-        return False
-    # Plain namespace/name pattern counts as HF id
-    return bool(re.fullmatch(r"[A-Za-z0-9_.-]+/[A-Za-z0-9_.-]+", s))
-
-
-def normalize_hf_id(src: str) -> str:
-    return src.replace("hf://", "").strip()
-
-
-def load_hf_dataset(hf_id: str, config: Optional[str], split: str, streaming: bool = False):
-    if load_dataset is None:
-        raise RuntimeError("datasets library not available")
-    kwargs: Dict[str, Any] = {"split": split}
-    if config:
-        kwargs["name"] = config
-    if streaming:
-        kwargs["streaming"] = True
-    return load_dataset(normalize_hf_id(hf_id), **kwargs)
-
-
-def list_hf_configs(hf_id: str) -> List[str]:
-    try:
-        if get_dataset_config_names is None:
-            return []
-        return get_dataset_config_names(normalize_hf_id(hf_id))
-    except Exception:
-        return []
-
-
-def guess_conversation(sample: Dict[str, Any]) -> Dict[str, Any]:
-    # Try common container keys first
-    for k in [
-        "messages",
-        "conversations",
-        "conversation",
-        "dialogue",
-        "dialog",
-        "turns",
-        "utterances",
-        "sessions",
-    ]:
-        if k in sample and isinstance(sample[k], (list, tuple)):
-            return {"container_key": k}
-    # Prompt/response pattern
-    if "prompt" in sample and "response" in sample:
-        return {"prompt_key": "prompt", "response_key": "response"}
-    return {}
+def format_histogram(counter: Counter, label: str, unit: str) -> List[str]:
+    """Markdown table of an int-keyed histogram, binned to at most ``STATS_HISTOGRAM_BINS`` rows.
+
+    Values above the 99th percentile are folded into a final ``≥`` row.
+    """
+    values = sorted((int(k), n) for k, n in counter.items())
+    if not values:
+        return ["No data."]
+    total = sum(n for _, n in values)
+    seen = 0
+    cap = values[-1][0]
+    for value, n in values:
+        seen += n
+        if seen >= 0.99 * total:
+            cap = value
+            break
+    width = max(1, -(-(cap + 1) // STATS_HISTOGRAM_BINS))
+    bins: Counter = Counter()
+    for value, n in values:
+        bins[value // width if value <= cap else -1] += n
+    rows = [f"| {label} | {unit} | |", "|---|---:|---|"]
+    peak = max(bins.values())
+    for b in range(values[0][0] // width, cap // width + 1):
+        low = b * width
+        span = str(low) if width == 1 else f"{low}–{low + width - 1}"
+        rows.append(f"| {span} | {bins[b]:,} | {_bar(bins[b], peak)} |")
+    if bins[-1]:
+        rows.append(f"| ≥ {cap + 1} | {bins[-1]:,} | {_bar(bins[-1], peak)} |")
+    return rows
+
+
+def format_source_stats(stats: SourceStats, took_s: float) -> str:
+    counters = stats.counters
+    utterances = sum(counters["speaker_turns"].values())
+    words = sum(counters["speaker_words"].values())
+    sessions = sum(int(k) * n for k, n in counters["sessions_per_record"].items())
+    sections = [
+        "### Overview\n\n| Records | Fields | Sessions / record | Utterances / record | Words / utterance |\n"
+        "|---:|---:|---:|---:|---:|\n"
+        f"| {stats.records:,} | {len(stats.fields)} | {sessions / max(stats.records, 1):.1f}"
+        f" | {utterances / max(stats.records, 1):.1f} | {words / max(utterances, 1):.1f} |\n\n"
+        f"Ready in {took_s * 1000:.0f} ms."
+    ]
+    fields = ["| Field | Missing, null or empty | Value kinds |", "|---|---:|---|"]
+    for field, rate, kinds in stats.null_rates():
+        described = ", ".join(f"{kind} {n:,}" for kind, n in kinds.most_common())
+        fields.append(f"| `{field}` | {100 * rate:.1f}% | {described} |")
+    sections.append("### Fields\n\n" + "\n".join(fields))
+    if set(counters["sessions_per_record"]) - {"0"}:
+        sections.append("### Sessions per record\n\n" + "\n".join(format_histogram(counters["sessions_per_record"], "Sessions", "Records")))
+    sections.append("### Utterances per record\n\n" + "\n".join(format_histogram(counters["turns_per_record"], "Utterances", "Records")))
+    sections.append("### Words per utterance\n\n" + "\n".join(format_histogram(counters["words_per_utterance"], "Words", "Utterances")))
+    speakers = ["| Speaker | Utterances | Share | Words | Words / utterance |", "|---|---:|---:|---:|---:|"]
+    for speaker, turns in counters["speaker_turns"].most_common():
+        spoken = counters["speaker_words"][speaker]
+        speakers.append(
+            f"| {speaker} | {turns:,} | {100 * turns / max(utterances, 1):.1f}% | {spoken:,} | {spoken / max(turns, 1):.1f} |"
+        )
+    sections.append("### Speakers\n\n" + "\n".join(speakers))
+    return "\n\n".join(sections)
 
 
 def build_demo(dataset_source: str) -> gr.Blocks:
@@ -119,24 +163,44 @@ def build_demo(dataset_source: str) -> gr.Blocks:
                 label="Split",
             )
 
-        with gr.Row():
-            keyword = gr.Textbox(label="Keyword (optional)")
-            limit = gr.Slider(1, 100, value=10, step=1, label="Max items")
-        with gr.Row():
-            search_field = gr.Dropdown(choices=[""], value="", label="Search field (optional)", allow_custom_value=True)
-
-        with gr.Row():
-            load_btn = gr.Button("Load & Search")
-            random_btn = gr.Button("Random Item")
-        results_open = gr.State(True)
-        collapse_btn = gr.Button("Collapse Results", elem_id="collapse-btn", variant="secondary")
-        with gr.Accordion("Search Results", open=True, elem_id="results-acc") as acc:
-            out = gr.Markdown()
-
-        with gr.Row():
-            item_id = gr.Textbox(label="Item id/index (optional)")
-            chat_btn = gr.Button("View as Chat 💬")
-        chat = gr.Chatbot(height=420, type="tuples")
+        with gr.Tab("Explore"):
+            with gr.Row():
+                keyword = gr.Textbox(label="Keyword (optional)")
+                limit = gr.Slider(1, 1000, value=10, step=1, label="Max items")
+            with gr.Row():
+                search_field = gr.Dropdown(choices=[""], value="", label="Search field (optional)", allow_custom_value=True)
+                search_mode = gr.Radio(SEARCH_MODES, value=SEARCH_MODES[0], label="Search mode")
+                max_edits = gr.Slider(1, 3, value=1, step=1, label="Fuzzy: max typos per word")
+
+            with gr.Row():
+                load_btn = gr.Button("Load & Search")
+                random_btn = gr.Button("Random Item")
+            with gr.Row():
+                sample_size = gr.Slider(1, SAMPLE_MAX_SIZE, value=20, step=1, label="Sample size (per value when stratified)")
+                sample_seed = gr.Textbox(label="Seed (optional, integer)", placeholder="blank = new random seed")
+                sample_field = gr.Dropdown(choices=[""], value="", label="Stratify by field (optional)", allow_custom_value=True)
+                sample_btn = gr.Button("Sample")
+            results_open = gr.State(True)
+            collapse_btn = gr.Button("Collapse Results", elem_id="collapse-btn", variant="secondary")
+            with gr.Accordion("Search Results", open=True, elem_id="results-acc") as acc:
+                out = gr.Markdown()
+                result_cursor = gr.State(None)
+                with gr.Row():
+                    prev_btn = gr.Button("← Previous page", interactive=False)
+                    next_btn = gr.Button("Next page →", interactive=False)
+
+            with gr.Row():
+                dup_threshold = gr.Slider(0.5, 1.0, value=0.8, step=0.05, label="Near-duplicate similarity (estimated Jaccard)")
+                dup_btn = gr.Button("Find Near-Duplicates")
+
+            with gr.Row():
+                item_id = gr.Textbox(label="Item id/index (optional)")
+                chat_btn = gr.Button("View as Chat 💬")
+            chat = gr.Chatbot(height=420, type="tuples")
+
+        with gr.Tab("Statistics") as stats_tab:
+            stats_btn = gr.Button("Refresh Statistics")
+            stats_out = gr.Markdown()
 
         def detect_fields_from_sample(sample: Dict[str, Any]) -> List[str]:
             try:
@@ -144,27 +208,6 @@ def build_demo(dataset_source: str) -> gr.Blocks:
             except Exception:
                 return []
 
-        def get_first_record(_src: str, _config: str, _split: str) -> Dict[str, Any]:
-            if is_huggingface_id(_src) and load_dataset:
-                try:
-                    ds = load_hf_dataset(_src, _config or None, _split, streaming=False)
-                    return ds[0] if len(ds) > 0 else {}
-                except Exception:
-                    return {}
-            # files
-            try:
-                if _src.endswith(".csv"):
-                    df = pd.read_csv(_src, nrows=1)
-                    return df.iloc[0].to_dict() if not df.empty else {}
-                if _src.endswith(".jsonl"):
-                    first = next((l for l in Path(_src).read_text(encoding="utf-8").splitlines() if l.strip()), None)
-                    return json.loads(first) if first else {}
-                # json array
-                arr = json.loads(Path(_src).read_text(encoding="utf-8"))
-                return arr[0] if isinstance(arr, list) and arr else (arr if isinstance(arr, dict) else {})
-            except Exception:
-                return {}
-
         def on_src_change(_src: str, _config: str, _split: str):
             # Refresh config list for HF ids; disable for files
             if is_huggingface_id(_src) and get_dataset_config_names:
@@ -173,85 +216,320 @@ def build_demo(dataset_source: str) -> gr.Blocks:
                 fields = detect_fields_from_sample(sample)
                 return (
                     gr.update(choices=[""] + cfgs, value=(cfgs[0] if cfgs else ""), interactive=True),
-                    gr.update(choices=[""] + fields, value="")
+                    gr.update(choices=[""] + fields, value=""),
+                    gr.update(choices=[""] + fields, value=""),
                 )
             else:
                 sample = get_first_record(_src, _config, _split)
                 fields = detect_fields_from_sample(sample)
                 return (
                     gr.update(choices=[""], value="", interactive=False),
-                    gr.update(choices=[""] + fields, value="")
+                    gr.update(choices=[""] + fields, value=""),
+                    gr.update(choices=[""] + fields, value=""),
                 )
 
-        def fetch_slice(_src: str, _config: str, _split: str, _kw: str, _limit: int, _field: str):
+        def finish_page(cursor: Dict[str, Any], out_rows: List[Any], resume: Optional[int]):
+            page = cursor["page"]
+            cursor = dict(cursor, page_starts=cursor["page_starts"][: page + 1] + ([resume] if resume is not None else []))
+            md = "\n\n---\n\n".join(
+                ["```json\n" + json.dumps(r, ensure_ascii=False, indent=2) + "\n```" for r in out_rows]
+            )
+            if md:
+                md += f"\n\n---\n\nPage {page + 1}" + (" · more results →" if resume is not None else " · end of results")
+            elif page > 0:
+                md = f"No more matches after page {page}."
+            return (
+                md or "No matches.",
+                gr.update(open=True),
+                gr.update(value="Collapse Results"),
+                True,
+                cursor if md else None,
+                gr.update(interactive=page > 0),
+                gr.update(interactive=resume is not None),
+            )
+
+        def stream_page(cursor: Dict[str, Any]):
+            # Only the visible page is scanned for and rendered; cursor lives in gr.State.
+            # Records are streamed from the page's start position and the scan stops once
+            # the page is full. Partial results and scan progress are yielded while scanning.
+            # Pages already computed for the same query and source version come from the cache.
+            if cursor.get("mode") in INDEXED_MODES:
+                yield from stream_ranked_page(cursor)
+                return
+            page = cursor["page"]
+            count = min(PAGE_SIZE, cursor["limit"] - page * PAGE_SIZE)
+            shown = (gr.update(open=True), gr.update(value="Collapse Results"), True)
+            no_pages = (None, gr.update(interactive=False), gr.update(interactive=False))
+            yield ("⏳ Loading source…",) + shown + no_pages
+            task = scan_page(cursor, cursor["page_starts"][page], count)
+            started = time.perf_counter()
             try:
-                # Load HF dataset or fallback to local/remote files
-                if is_huggingface_id(_src) and load_dataset:
-                    ds = load_hf_dataset(_src, _config or None, _split, streaming=False)
-                    if hasattr(ds, "select"):
-                        head_n = min(_limit * 50, len(ds)) if len(ds) else _limit * 50
-                        rows = ds.select(range(head_n))
-                        rows = [rows[i] for i in range(min(head_n, len(rows)))]
-                    else:
-                        rows = list(ds.take(_limit * 50))
-                else:
-                    if _src.endswith(".csv"):
-                        df = pd.read_csv(_src)
-                        rows = df.to_dict(orient="records")
-                    elif _src.endswith(".jsonl"):
-                        rows = [
-                            json.loads(l)
-                            for l in Path(_src).read_text(encoding="utf-8").splitlines()
-                        ]
-                    else:
-                        rows = json.loads(Path(_src).read_text(encoding="utf-8"))
-
-                kw = (_kw or "").lower()
-                out_rows: List[Dict[str, Any]] = []
-                for r in rows:
-                    if _field and isinstance(r, dict) and _field in r:
-                        text = json.dumps(r.get(_field), ensure_ascii=False).lower()
-                    else:
-                        text = json.dumps(r, ensure_ascii=False).lower()
-                    if kw and kw not in text:
-                        continue
-                    out_rows.append(r)
-                    if len(out_rows) >= _limit:
+                while True:
+                    try:
+                        step = next(task)
+                    except StopIteration as done:
+                        out_rows, resume = done.value
                         break
-                md = "\n\n---\n\n".join(
-                    ["```json\n" + json.dumps(r, ensure_ascii=False, indent=2) + "\n```" for r in out_rows]
-                )
-                return md or "No matches.", gr.update(open=True), gr.update(value="Collapse Results"), True
+                    if isinstance(step, str):
+                        yield (step,) + shown + no_pages
+                        continue
+                    rows, scanned, fraction = step
+                    progress = (
+                        f"⏳ Scanned {scanned:,} rows ({fraction:.0%} of source)"
+                        f" · {scanned / max(time.perf_counter() - started, 1e-6):,.0f} rows/s · {len(rows)} found"
+                    )
+                    md = "\n\n---\n\n".join(
+                        ["```json\n" + json.dumps(r, ensure_ascii=False, indent=2) + "\n```" for r in rows] + [progress]
+                    )
+                    yield (md,) + shown + no_pages
+            finally:
+                # A superseded request stops here; closing the scan withdraws work not yet started
+                task.close()
+            if resume is not None and (page + 1) * PAGE_SIZE >= cursor["limit"]:
+                resume = None
+            yield finish_page(cursor, out_rows, resume)
+
+        def progress_rows(task):
+            # Generator: re-yields an engine task's progress lines as page rows; returns its result.
+            # Closing it (a superseded request) closes the task too.
+            try:
+                while True:
+                    try:
+                        line = next(task)
+                    except StopIteration as done:
+                        return done.value
+                    yield (line, gr.update(open=True), gr.update(value="Collapse Results"), True, None,
+                           gr.update(interactive=False), gr.update(interactive=False))
+            finally:
+                task.close()
+
+        def ensure_near_dup_index(_src: str, _config: str, _split: str):
+            # Generator like ensure_fulltext_index: one MinHash signature per record, shingled
+            # from the chat turns _parse_misc_chat extracts (all text values if it finds none).
+            signature, index_path, records = index_source(_src, _config, _split, "minhash")
+            index = open_near_dups(index_path, signature)
+            if index is not None:
+                return index
+            sample = get_first_record(_src, _config, _split)
+            project = compile_projection(sample, guess_conversation(sample))
+            builder = NearDupBuilder()
+
+            def add(record: Any, start: int) -> None:
+                turns = _parse_misc_chat(record) if isinstance(record, dict) else []
+                text = "\n".join(f"{u}\n{a}" for u, a in turns) if turns else project(record)
+                builder.add(tokenize(text), start)
+
+            end = yield from progress_rows(feed_index(records, add, "Computing MinHash signatures"))
+            index_path = write_index(index_path, "minhash", lambda path: builder.write(path, end, signature))
+            return open_near_dups(index_path, signature)
+
+        def ensure_source_stats(_src: str, _config: str, _split: str):
+            # Generator like ensure_fulltext_index, returning the source's SourceStats. A JSONL
+            # file that was only appended to is counted from where the cached stats stopped.
+            signature, stats_path, records = index_source(_src, _config, _split, "stats")
+            source = None if is_huggingface_id(_src) else Path(_src)
+            stats, resume = load_source_stats(stats_path, signature, source)
+            if stats is not None and resume is None:
+                return stats
+            if stats is None:
+                stats, resume = SourceStats(), 0
+            else:
+                records = index_source(_src, _config, _split, "stats", resume)[2]
+
+            def add(record: Any, start: int) -> None:
+                stats.add(record, _parse_misc_chat(record) if isinstance(record, dict) else [])
+
+            end = yield from progress_rows(feed_index(records, add, "Computing statistics", resume))
+            stats.mark_end(source, end, signature)
+            write_index(stats_path, "stats", stats.save)
+            return stats
+
+        def stream_ranked_page(cursor: Dict[str, Any]):
+            # BM25 top-`limit` (or, for fuzzy mode, the first `limit` documents in source
+            # order) is computed once per query and kept in the cursor; paging only
+            # materializes the records of the visible page.
+            page = cursor["page"]
+            ranked = cursor.get("ranked")
+            if ranked is None:
+                yield ("⏳ Opening full-text index…", gr.update(open=True), gr.update(value="Collapse Results"), True,
+                       None, gr.update(interactive=False), gr.update(interactive=False))
+                ranked, note, took_ms = yield from progress_rows(rank_documents(cursor))
+                cursor = dict(cursor, ranked=ranked, note=note, took_ms=took_ms)
+            if not ranked:
+                yield "No matches.", gr.update(open=True), gr.update(value="Collapse Results"), True, None, gr.update(interactive=False), gr.update(interactive=False)
+                return
+            page_hits = ranked[page * PAGE_SIZE: (page + 1) * PAGE_SIZE]
+            records = records_at(cursor["src"], cursor["config"], cursor["split"], [start for start, _ in page_hits])
+            blocks = [
+                f"**#{page * PAGE_SIZE + rank + 1}" + (f" · BM25 {score:.3f}" if score is not None else "") + "**\n\n```json\n"
+                + json.dumps(records.get(start), ensure_ascii=False, indent=2) + "\n```"
+                for rank, (start, score) in enumerate(page_hits)
+            ]
+            pages = (len(ranked) + PAGE_SIZE - 1) // PAGE_SIZE
+            kind = "ranked results" if cursor["mode"] == "Ranked (BM25)" else "results"
+            summary = f"Page {page + 1} of {pages} · {len(ranked)} {kind} in {cursor['took_ms']} ms"
+            blocks.append(summary + (f" ({cursor['note']})" if cursor.get("note") else ""))
+            yield (
+                "\n\n---\n\n".join(blocks),
+                gr.update(open=True),
+                gr.update(value="Collapse Results"),
+                True,
+                dict(cursor, page=page),
+                gr.update(interactive=page > 0),
+                gr.update(interactive=page + 1 < pages),
+            )
+
+        def fetch_slice(
+            _src: str,
+            _config: str,
+            _split: str,
+            _kw: str,
+            _limit: int,
+            _field: str,
+            _mode: str = SEARCH_MODES[0],
+            _max_edits: int = 1,
+        ):
+            try:
+                query = new_query(_src, _config, _split, _kw, _field, _mode, _max_edits, _limit)
+            except ValueError as e:
+                yield f"Invalid query: {e}", gr.update(), gr.update(), True, None, gr.update(interactive=False), gr.update(interactive=False)
+                return
+            cursor = dict(query, page=0, page_starts=[0])
+            try:
+                yield from stream_page(cursor)
+            except Exception as e:  # pragma: no cover - runtime UX
+                yield f"Load error: {e}", gr.update(), gr.update(), True, None, gr.update(interactive=False), gr.update(interactive=False)
+
+        def change_page(cursor: Optional[Dict[str, Any]], step: int):
+            if not cursor:
+                yield "Run a search first.", gr.update(), gr.update(), True, None, gr.update(interactive=False), gr.update(interactive=False)
+                return
+            if cursor.get("ranked") is not None:
+                last_page = max(len(cursor["ranked"]) - 1, 0) // PAGE_SIZE
+            else:
+                last_page = len(cursor["page_starts"]) - 1
+            page = min(max(cursor["page"] + step, 0), last_page)
+            try:
+                yield from stream_page(dict(cursor, page=page))
             except Exception as e:  # pragma: no cover - runtime UX
-                return f"Load error: {e}", gr.update(), gr.update(), True
+                yield f"Load error: {e}", gr.update(), gr.update(), True, None, gr.update(interactive=False), gr.update(interactive=False)
+
+        def draw_sample(_src: str, _config: str, _split: str, size: int, rng, field: str = ""):
+            # Generator: yields progress rows, returns ({stratum: (record numbers, stratum size)},
+            # read) where read(numbers) -> {number: record}. Unstratified samples of sources
+            # with numbered records (HF splits, columnar copies, JSONL/JSON offset indexes)
+            # draw record numbers from the count and read nothing else. Stratified samples
+            # read just the field's column where the source has one; otherwise, and for CSV
+            # files without a columnar copy, they take one streaming pass with reservoirs.
+            rows = indexed_records(_src, _config, _split)
+            if rows is not None and not field:
+                numbers = sample_indices(len(rows), size, rng)
+                return {"": (numbers, len(rows))}, lambda wanted: {n: rows[int(n)] for n in wanted}
+            reservoirs = StratifiedReservoir(size, rng)
+            count = 0
+
+            def stratum(value: Any) -> str:
+                return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+
+            def add(record: Any, start: int) -> None:
+                nonlocal count
+                key = ""
+                if field:
+                    key = stratum(record.get(field) if isinstance(record, dict) else None)
+                reservoirs.add(key, (count, start))
+                count += 1
+
+            def add_column(batches):
+                # Generator like feed_index over one column's batches of values
+                nonlocal count
+                last_emit = time.perf_counter()
+                for values in batches:
+                    for value in values:
+                        reservoirs.add(stratum(value), (count, count))
+                        count += 1
+                    if time.perf_counter() - last_emit >= STREAM_INTERVAL_S:
+                        last_emit = time.perf_counter()
+                        yield f"⏳ Sampling: {count:,} of {len(rows):,} records ({count / max(len(rows), 1):.0%})"
+
+            batches = column_values(_src, _config, _split, field) if field else None
+            if batches is not None:
+                yield from progress_rows(add_column(batches))
+
+                def read(wanted: List[int]) -> Dict[int, Any]:
+                    return {n: rows[int(n)] for n in wanted}
+            else:
+                yield from progress_rows(feed_index(source_records(_src, _config, _split), add, "Sampling"))
+                starts = {n: start for picks in reservoirs.reservoirs.values() for n, start in picks}
+
+                def read(wanted: List[int]) -> Dict[int, Any]:
+                    records = records_at(_src, _config, _split, [starts[n] for n in wanted])
+                    return {n: records.get(starts[n]) for n in wanted}
+            strata = {
+                key: ([n for n, _ in reservoirs.reservoirs[key]], reservoirs.counts[key])
+                for key in sorted(reservoirs.counts, key=lambda k: (-reservoirs.counts[k], k))
+            }
+            return strata, read
 
         def random_item(_src: str, _config: str, _split: str):
+            shown = (gr.update(open=True), gr.update(value="Collapse Results"), True)
+            no_pages = (None, gr.update(interactive=False), gr.update(interactive=False))
             try:
-                if is_huggingface_id(_src) and load_dataset:
-                    ds = load_hf_dataset(_src, _config or None, _split, streaming=False)
-                    if len(ds) == 0:
-                        return "No data."
-                    idx = random.randint(0, len(ds) - 1)
-                    r = ds[int(idx)]
+                strata, read = yield from draw_sample(_src, _config, _split, 1, random.Random())
+                numbers = strata[""][0] if strata else []
+                if not numbers:
+                    yield ("No data.",) + shown + no_pages
+                    return
+                r = read(numbers)[numbers[0]]
+                yield ("```json\n" + json.dumps(r, ensure_ascii=False, indent=2, default=str) + "\n```",) + shown + no_pages
+            except Exception as e:  # pragma: no cover - runtime UX
+                yield (f"Random error: {e}", gr.update(), gr.update(), True) + no_pages
+
+        def sample_items(_src: str, _config: str, _split: str, _size: float, _seed: str, _field: str):
+            # A reproducible batch: `size` records overall, or per value of `field`. Record
+            # numbers are listed (and given as JSON for reuse); the first page is rendered.
+            shown = (gr.update(open=True), gr.update(value="Collapse Results"), True)
+            no_pages = (None, gr.update(interactive=False), gr.update(interactive=False))
+            try:
+                rng, seed = seeded_rng(_seed)
+            except ValueError as e:
+                yield (f"Invalid seed: {e}",) + shown + no_pages
+                return
+            try:
+                size = int(_size)
+                field = (_field or "").strip()
+                strata, read = yield from draw_sample(_src, _config, _split, size, rng, field)
+                total = sum(len(numbers) for numbers, _ in strata.values())
+                if not total:
+                    yield ("No data.",) + shown + no_pages
+                    return
+                if field:
+                    header = f"**Sample of {total} records**, {size} per value of `{field}`"
+                    lines = [
+                        f"- **{key or '(empty)'}** ({len(numbers)} of {count:,}): " + ", ".join(f"`{n}`" for n in numbers)
+                        for key, (numbers, count) in list(strata.items())[:SAMPLE_MAX_STRATA]
+                    ]
+                    if len(strata) > SAMPLE_MAX_STRATA:
+                        lines.append(f"- … and {len(strata) - SAMPLE_MAX_STRATA} smaller strata")
                 else:
-                    if _src.endswith(".csv"):
-                        df = pd.read_csv(_src)
-                        if df.empty:
-                            return "No data."
-                        r = df.sample(1).to_dict(orient="records")[0]
-                    elif _src.endswith(".jsonl"):
-                        lines = Path(_src).read_text(encoding="utf-8").splitlines()
-                        if not lines:
-                            return "No data."
-                        r = json.loads(random.choice(lines))
-                    else:
-                        arr = json.loads(Path(_src).read_text(encoding="utf-8"))
-                        if not arr:
-                            return "No data."
-                        r = random.choice(arr)
-                return "```json\n" + json.dumps(r, ensure_ascii=False, indent=2) + "\n```", gr.update(open=True), gr.update(value="Collapse Results"), True
+                    header = f"**Sample of {total} of {strata[''][1]:,} records**"
+                    lines = ["Record indices: " + ", ".join(f"`{n}`" for n in strata[""][0])]
+                payload = {"seed": seed, "field": field, "indices": {key: numbers for key, (numbers, _) in strata.items()}}
+                blocks = [
+                    f"{header} · seed `{seed}` (reuse it to draw the same sample). Open any index with “View as Chat 💬”.",
+                    "\n".join(lines),
+                    "```json\n" + json.dumps(payload, ensure_ascii=False) + "\n```",
+                ]
+                first = [n for numbers, _ in strata.values() for n in numbers][:PAGE_SIZE]
+                records = read(first)
+                blocks += [
+                    f"**#{n}**\n```json\n" + json.dumps(records[n], ensure_ascii=False, indent=2, default=str) + "\n```"
+                    for n in first
+                ]
+                if total > len(first):
+                    blocks.append(f"Showing the first {len(first)} sampled records.")
+                yield ("\n\n---\n\n".join(blocks),) + shown + no_pages
             except Exception as e:  # pragma: no cover - runtime UX
-                return f"Random error: {e}", gr.update(), gr.update(), True
+                yield (f"Sampling failed: {e}", gr.update(), gr.update(), True) + no_pages
 
         def _parse_misc_chat(rec: Dict[str, Any]) -> List[Tuple[str, str]]:
             # MiSC-specific heuristic: combine all *_session_dialogue turns
@@ -314,30 +592,18 @@ def build_demo(dataset_source: str) -> gr.Blocks:
 
         def view_chat(_src: str, _config: str, _split: str, _id: str):
             try:
+                _id = (_id or "").strip()
+                if _id.isdigit():
+                    rec = record_at(_src, _config, _split, int(_id))
+                elif _id:
+                    _, rec = find_record(_src, _config, _split, _id)
+                else:
+                    rec = record_at(_src, _config, _split, 0)
                 if is_huggingface_id(_src) and load_dataset:
-                    ds = load_hf_dataset(_src, _config or None, _split, streaming=False)
-                    sample = ds[0] if len(ds) > 0 else {}
-                    meta = guess_conversation(sample if isinstance(sample, dict) else {})
-                    if _id and _id.isdigit():
-                        rec = ds[int(_id)]
-                    elif _id:
-                        rec = next((r for r in ds if str(r.get("id", "")) == _id), ds[0])
-                    else:
-                        rec = ds[0] if len(ds) > 0 else {}
+                    sample = first_hf_record(_src, _config or None, _split)
                 else:
-                    if _src.endswith(".csv"):
-                        df = pd.read_csv(_src)
-                        rec = df.iloc[int(_id)].to_dict() if _id.isdigit() else df.iloc[0].to_dict()
-                        sample = rec
-                    elif _src.endswith(".jsonl"):
-                        lines = Path(_src).read_text(encoding="utf-8").splitlines()
-                        rec = json.loads(lines[int(_id)]) if _id.isdigit() else json.loads(lines[0])
-                        sample = rec
-                    else:
-                        arr = json.loads(Path(_src).read_text(encoding="utf-8"))
-                        rec = arr[int(_id)] if _id.isdigit() else arr[0]
-                        sample = rec
-                    meta = guess_conversation(sample if isinstance(sample, dict) else {})
+                    sample = rec
+                meta = guess_conversation(sample if isinstance(sample, dict) else {})
 
                 history: List[Tuple[str, str]] = []
                 # Try MiSC-specific parsing first
@@ -381,33 +647,117 @@ def build_demo(dataset_source: str) -> gr.Blocks:
             except Exception as e:  # pragma: no cover - runtime UX
                 return [(f"Chat error: {e}", "")]
 
+        def find_near_duplicates(_src: str, _config: str, _split: str, _threshold: float):
+            # MinHash signatures are computed once per source and clustered with LSH;
+            # only the records of the clusters shown are read back.
+            shown = (gr.update(open=True), gr.update(value="Collapse Results"), True)
+            no_pages = (None, gr.update(interactive=False), gr.update(interactive=False))
+            threshold = float(_threshold)
+            try:
+                yield ("⏳ Opening near-duplicate index…",) + shown + no_pages
+                index = yield from ensure_near_dup_index(_src, _config, _split)
+                clusters = index.clusters(threshold)
+                if not clusters:
+                    yield (f"No near-duplicate records at estimated similarity ≥ {threshold:.2f}.",) + shown + no_pages
+                    return
+                listed = clusters[:NEAR_DUP_MAX_CLUSTERS]
+                starts = [index.doc_starts[doc] for cluster in listed for doc in cluster[:NEAR_DUP_MEMBERS_SHOWN]]
+                records = records_at(_src, _config, _split, starts)
+                blocks = [
+                    f"**{len(clusters)} clusters** of near-duplicate records (estimated similarity ≥ {threshold:.2f}),"
+                    f" covering {sum(len(c) for c in clusters)} of {len(index)} records."
+                    " Open any index with “View as Chat 💬”."
+                ]
+                for number, cluster in enumerate(listed, start=1):
+                    lines = [f"**Cluster {number}** · {len(cluster)} records"]
+                    for doc in cluster[:NEAR_DUP_MEMBERS_SHOWN]:
+                        rec = records.get(index.doc_starts[doc])
+                        label = f"- index `{doc}`"
+                        if isinstance(rec, dict) and rec.get("id") is not None:
+                            label += f" · id `{rec['id']}`"
+                        if doc != cluster[0]:
+                            label += f" · {index.similarity(cluster[0], doc):.2f} vs. first"
+                        turns = _parse_misc_chat(rec) if isinstance(rec, dict) else []
+                        preview = next((u or a for u, a in turns if u or a), "") or json.dumps(rec, ensure_ascii=False)
+                        lines.append(f"{label} · “{preview[:80]}”")
+                    if len(cluster) > NEAR_DUP_MEMBERS_SHOWN:
+                        lines.append(f"- … and {len(cluster) - NEAR_DUP_MEMBERS_SHOWN} more")
+                    blocks.append("\n".join(lines))
+                if len(clusters) > NEAR_DUP_MAX_CLUSTERS:
+                    blocks.append(f"Showing the {NEAR_DUP_MAX_CLUSTERS} largest clusters.")
+                yield ("\n\n---\n\n".join(blocks),) + shown + no_pages
+            except Exception as e:  # pragma: no cover - runtime UX
+                yield (f"Near-duplicate search failed: {e}", gr.update(), gr.update(), True) + no_pages
+
+        def show_stats(_src: str, _config: str, _split: str):
+            # Cached aggregates render at once; a changed source is (re)counted with progress.
+            try:
+                started = time.perf_counter()
+                building = ensure_source_stats(_src, _config, _split)
+                while True:
+                    try:
+                        row = next(building)
+                    except StopIteration as done:
+                        stats = done.value
+                        break
+                    yield row[0]
+                yield format_source_stats(stats, time.perf_counter() - started)
+            except Exception as e:  # pragma: no cover - runtime UX
+                yield f"Statistics failed: {e}"
+
         def toggle_results(open_state: bool):
             new_open = not bool(open_state)
             return new_open, gr.update(open=new_open), gr.update(value=("Collapse Results" if new_open else "Expand Results"))
 
-        src.change(on_src_change, inputs=[src, config, split], outputs=[config, search_field])
-        load_btn.click(
-            fetch_slice,
-            inputs=[src, config, split, keyword, limit, search_field],
-            outputs=[out, acc, collapse_btn, results_open],
-        )
-        random_btn.click(
-            random_item,
-            inputs=[src, config, split],
-            outputs=[out, acc, collapse_btn, results_open],
-        )
+        src.change(on_src_change, inputs=[src, config, split], outputs=[config, search_field, sample_field])
+
+        def prev_page(cursor: Optional[Dict[str, Any]]):
+            yield from change_page(cursor, -1)
+
+        def next_page(cursor: Optional[Dict[str, Any]]):
+            yield from change_page(cursor, 1)
+
+        page_outputs = [out, acc, collapse_btn, results_open, result_cursor, prev_btn, next_btn]
+        search_events = [
+            load_btn.click(
+                fetch_slice,
+                inputs=[src, config, split, keyword, limit, search_field, search_mode, max_edits],
+                outputs=page_outputs,
+                **search_event_options(),
+            ),
+            prev_btn.click(prev_page, inputs=[result_cursor], outputs=page_outputs, **search_event_options()),
+            next_btn.click(next_page, inputs=[result_cursor], outputs=page_outputs, **search_event_options()),
+            dup_btn.click(
+                find_near_duplicates, inputs=[src, config, split, dup_threshold], outputs=page_outputs,
+                **search_event_options(),
+            ),
+            random_btn.click(random_item, inputs=[src, config, split], outputs=page_outputs, **search_event_options()),
+            sample_btn.click(
+                sample_items,
+                inputs=[src, config, split, sample_size, sample_seed, sample_field],
+                outputs=page_outputs,
+                **search_event_options(),
+            ),
+        ]
+        # Changing the query cancels a search that is still streaming results
+        for query_input in (src, config, split, keyword, search_field, search_mode, max_edits):
+            query_input.change(None, inputs=None, outputs=None, cancels=search_events)
         collapse_btn.click(
             toggle_results,
             inputs=[results_open],
             outputs=[results_open, acc, collapse_btn],
         )
         chat_btn.click(view_chat, inputs=[src, config, split, item_id], outputs=[chat])
+        # Aggregates are cached per source, so opening the tab renders without a scan
+        stats_tab.select(show_stats, inputs=[src, config, split], outputs=[stats_out])
+        stats_btn.click(show_stats, inputs=[src, config, split], outputs=[stats_out])
 
     return demo
 
 
 if __name__ == "__main__":
     demo = build_demo(DATASET_LINK)
-    demo.queue().launch()
+    # Bounded queue: past MISC_QUEUE_MAX_SIZE waiting requests, new ones are turned away at once
+    demo.queue(**queue_options()).launch(max_threads=MAX_THREADS)
 
 
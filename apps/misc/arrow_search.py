@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except Exception:  # pragma: no cover - optional dependency at authoring time
+    pa = None
+    pc = None
+
+# Rows handed to the compute kernels at a time
+ARROW_BATCH_ROWS = 20_000
+
+# (matching row or None for a progress tick, position to resume after it,
+#  fraction of the split scanned, rows scanned)
+ArrowHit = Tuple[Optional[Dict[str, Any]], int, float, int]
+
+
+def column_matches(column: Any, pattern: str) -> Optional[Any]:
+    """Case-insensitive per-row match of ``pattern`` in a column's values.
+
+    Lists and structs are searched through their leaves; numbers and booleans
+    are matched on their string form. Returns a boolean array, or None when the
+    column holds nothing searchable (binary, images, ...).
+    """
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks()
+    t = column.type
+    if pa.types.is_string(t) or pa.types.is_large_string(t):
+        return pc.fill_null(pc.match_substring(column, pattern=pattern, ignore_case=True), False)
+    if pa.types.is_dictionary(t):
+        return column_matches(column.dictionary_decode(), pattern)
+    if pa.types.is_integer(t) or pa.types.is_floating(t) or pa.types.is_boolean(t):
+        return column_matches(pc.cast(column, pa.string()), pattern)
+    if pa.types.is_list(t) or pa.types.is_large_list(t) or pa.types.is_fixed_size_list(t):
+        inner = column_matches(pc.list_flatten(column), pattern)
+        if inner is None:
+            return None
+        parents = pc.cast(pc.filter(pc.list_parent_indices(column), inner), pa.int64())
+        return pc.is_in(pa.array(range(len(column)), pa.int64()), value_set=parents)
+    if pa.types.is_struct(t):
+        mask = None
+        for i in range(t.num_fields):
+            field_mask = column_matches(column.field(i), pattern)
+            if field_mask is not None:
+                mask = field_mask if mask is None else pc.or_(mask, field_mask)
+        return mask
+    return None
+
+
+def table_matches(table: Any, pattern: str, field: str = "") -> Any:
+    """Rows of ``table`` whose ``field`` (or any column, if unset or absent) matches."""
+    names = [field] if field and field in table.column_names else table.column_names
+    mask = None
+    for name in names:
+        column_mask = column_matches(table.column(name), pattern)
+        if column_mask is not None:
+            mask = column_mask if mask is None else pc.or_(mask, column_mask)
+    return mask if mask is not None else pa.array([False] * table.num_rows)
+
+
+def iter_arrow_matches(ds: Any, pattern: str, field: str = "", start: int = 0) -> Iterator[ArrowHit]:
+    """Search a ``datasets.Dataset`` batch by batch with ``pyarrow.compute``.
+
+    Covers the whole split from row ``start``; only matching rows are converted
+    to Python. A progress tick follows every batch that is not the last.
+    """
+    arrow_ds = ds.with_format("arrow")
+    total = len(arrow_ds)
+    for offset in range(start, total, ARROW_BATCH_ROWS):
+        batch = arrow_ds[offset: offset + ARROW_BATCH_ROWS]
+        if pattern:
+            hits = pc.indices_nonzero(table_matches(batch, pattern, field)).to_pylist()
+        else:
+            hits = range(batch.num_rows)
+        for i in hits:
+            position = offset + i + 1
+            yield batch.slice(i, 1).to_pylist()[0], position, position / total, position - start
+        end = offset + batch.num_rows
+        if end < total:
+            yield None, end, end / total, end - start
+
+
+def iter_column_values(ds: Any, column: str) -> Iterator[List[Any]]:
+    """One column of a ``datasets.Dataset`` as Python lists of ``ARROW_BATCH_ROWS`` values.
+
+    Only that column is converted; a missing column reads as all None.
+    """
+    arrow_ds = ds.with_format("arrow")
+    total = len(arrow_ds)
+    for offset in range(0, total, ARROW_BATCH_ROWS):
+        batch = arrow_ds[offset: offset + ARROW_BATCH_ROWS]
+        if column in batch.column_names:
+            yield batch.column(column).to_pylist()
+        else:
+            yield [None] * batch.num_rows
+
+
+def arrow_search_available(ds: Any) -> bool:
+    return pc is not None and hasattr(ds, "with_format")
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from line_index import sidecar_path, source_signature
+from projection import Hit, Projection, TextMatcher, compile_projection
+from scan import iter_file_records
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc as ipc
+except Exception:  # pragma: no cover - optional dependency at authoring time
+    pa = None
+    pc = None
+    ipc = None
+
+COLUMNAR_SUFFIX = ".arrow"
+COLUMNAR_VERSION = 2
+# Records per Arrow record batch; search and column reads go one batch at a time
+COLUMNAR_BATCH_ROWS = 10_000
+# Each record's JSON text, so records read back exactly as the text readers decode them
+RECORD_COLUMN = "__record__"
+# Each record's searchable text, as projection.py builds it for the whole record
+TEXT_COLUMN = "__text__"
+_METADATA_KEY = b"misc_columnar"
+# Copies are made by `python columnar.py SOURCE...`; MISC_COLUMNAR=1 reads through them
+COLUMNAR_ENABLED = os.environ.get("MISC_COLUMNAR", "0") == "1" and pa is not None
+
+_open_sources: Dict[str, "ColumnarSource"] = {}
+_open_sources_lock = threading.Lock()
+# Whole-record projection: every text leaf, lowercased (see projection.compile_projection)
+_project_record = compile_projection({}, {})
+
+
+def _fallback_path(source: Path) -> Path:
+    # Where the copy goes when the source's directory is read-only
+    tag = hashlib.sha1(str(source.resolve()).encode("utf-8")).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / "misc-columnar" / f"{tag}-{source.name}{COLUMNAR_SUFFIX}"
+
+
+def _typed(record: Dict[str, Any]) -> Dict[str, Any]:
+    # CSV gaps arrive as NaN; as values they are missing, not the text "nan"
+    return {k: None if isinstance(v, float) and math.isnan(v) else v for k, v in record.items()}
+
+
+def _record_batches(source: Path) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for record, _, _ in iter_file_records(str(source)):
+        if not isinstance(record, dict):
+            raise ValueError("records are not objects")
+        batch.append(record)
+        if len(batch) == COLUMNAR_BATCH_ROWS:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def convert_source(source: Path, path: Path, signature: Tuple[int, int]) -> None:
+    """Write ``source``'s records to an Arrow IPC file at ``path`` in two streaming passes.
+
+    The first pass infers one schema for every field, the second writes a
+    record batch per ``COLUMNAR_BATCH_ROWS`` records. Raises ``ValueError``
+    (or an Arrow error) when the records do not fit a common schema.
+    """
+    schemas = [pa.Table.from_pylist([_typed(r) for r in batch]).schema for batch in _record_batches(source)]
+    fields = pa.unify_schemas(schemas, promote_options="permissive") if schemas else pa.schema([])
+    for reserved in (RECORD_COLUMN, TEXT_COLUMN):
+        if reserved in fields.names:
+            raise ValueError(f"records already have a {reserved} field")
+    schema = fields.append(pa.field(RECORD_COLUMN, pa.large_string())).append(pa.field(TEXT_COLUMN, pa.large_string()))
+    schema = schema.with_metadata({
+        _METADATA_KEY: json.dumps({"version": COLUMNAR_VERSION, "signature": list(signature)}).encode("utf-8"),
+    })
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink, ipc.new_file(sink, schema) as writer:
+        for batch in _record_batches(source):
+            rows = [_typed(r) for r in batch]
+            for row, record in zip(rows, batch):
+                row[RECORD_COLUMN] = json.dumps(record, ensure_ascii=False, default=str)
+                row[TEXT_COLUMN] = _project_record(record)
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+    tmp_path.replace(path)
+
+
+class ColumnarSource:
+    """A local source's records as a memory-mapped Arrow table, read like a ``datasets.Dataset``.
+
+    ``source[n]`` is record ``n``, decoded from its stored JSON text.
+    ``source[a:b]`` (or ``source.with_format("arrow")[a:b]``) is an Arrow table
+    of those rows' fields, so the column readers written for Hugging Face
+    splits run on local files unchanged. Only the pages touched are read from
+    disk.
+    """
+
+    def __init__(self, source: Path, path: Path) -> None:
+        self.source = source
+        self.path = path
+        table = ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        metadata = json.loads((table.schema.metadata or {}).get(_METADATA_KEY, b"{}"))
+        if metadata.get("version") != COLUMNAR_VERSION:
+            raise ValueError(f"{path} was written by an incompatible version")
+        self.signature: Tuple[int, ...] = tuple(metadata.get("signature", ()))
+        self._records = table.column(RECORD_COLUMN)
+        self._texts = table.column(TEXT_COLUMN)
+        self._fields = table.drop_columns([RECORD_COLUMN, TEXT_COLUMN])
+
+    def __len__(self) -> int:
+        return self._fields.num_rows
+
+    @property
+    def column_names(self) -> List[str]:
+        return self._fields.column_names
+
+    def with_format(self, _format: str) -> "ColumnarSource":
+        return self
+
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(key, slice):
+            start, stop, _ = key.indices(len(self))
+            return self._fields.slice(start, max(stop - start, 0))
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError(f"record {key} out of range (0..{len(self) - 1})")
+        return json.loads(self._records[key].as_py())
+
+    def iter_matches(self, kw: str, matches: TextMatcher, project: Projection, start: int = 0) -> Iterator[Hit]:
+        """Records from number ``start`` whose projected text satisfies ``matches``, like the text path.
+
+        ``kw`` is the lowercased substring the query looks for. The stored
+        whole-record texts are filtered for it with ``pyarrow.compute`` first;
+        a field's text is part of its record's text, so every match survives.
+        Survivors are confirmed with ``project`` and ``matches`` on the decoded
+        record, so results never depend on whether a copy exists. Positions are
+        record numbers; a progress tick (``None``) follows each batch that is
+        not the last.
+        """
+        total = len(self)
+        for offset in range(start, total, COLUMNAR_BATCH_ROWS):
+            texts = self._texts.slice(offset, COLUMNAR_BATCH_ROWS)
+            if kw:
+                hits = pc.indices_nonzero(pc.fill_null(pc.match_substring(texts, pattern=kw), False)).to_pylist()
+            else:
+                hits = range(len(texts))
+            for i in hits:
+                record = self[offset + i]
+                if matches(project(record)):
+                    position = offset + i + 1
+                    yield record, position, position / total, position - start
+            end = offset + len(texts)
+            if end < total:
+                yield None, end, end / total, end - start
+
+
+def open_columnar(src: str) -> Optional[ColumnarSource]:
+    """Shared columnar copy of a local JSONL/JSON/CSV source, if reading through copies is enabled.
+
+    Returns None unless ``MISC_COLUMNAR=1`` and an up-to-date copy made by
+    ``convert`` exists; callers then read the text file. A copy whose source
+    changed since is ignored, never rebuilt here.
+    """
+    if not COLUMNAR_ENABLED:
+        return None
+    source = Path(src)
+    signature = source_signature(source)
+    key = str(source.resolve())
+    with _open_sources_lock:
+        columnar = _open_sources.get(key)
+        if columnar is not None and columnar.signature == signature:
+            return columnar
+        for path in (sidecar_path(source, COLUMNAR_SUFFIX), _fallback_path(source)):
+            columnar = _load(source, path, signature)
+            if columnar is not None:
+                _open_sources[key] = columnar
+                return columnar
+        return None
+
+
+def convert(src: str) -> Path:
+    """Write (or refresh) the columnar copy of ``src``; returns its path.
+
+    The copy goes next to the source, or under the temp directory when the
+    source's directory is read-only. Raises ``ValueError`` (or an Arrow error)
+    when the records do not fit one schema.
+    """
+    source = Path(src)
+    signature = source_signature(source)
+    path = sidecar_path(source, COLUMNAR_SUFFIX)
+    try:
+        convert_source(source, path, signature)
+    except OSError:
+        path = _fallback_path(source)
+        convert_source(source, path, signature)
+    return path
+
+
+def _load(source: Path, path: Path, signature: Tuple[int, int]) -> Optional[ColumnarSource]:
+    if not path.exists():
+        return None
+    try:
+        columnar = ColumnarSource(source, path)
+    except (ValueError, KeyError, OSError, pa.ArrowException):
+        return None
+    return columnar if columnar.signature == signature else None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Write columnar Arrow copies of local MiSC sources (read with MISC_COLUMNAR=1).")
+    parser.add_argument("sources", nargs="+", help="JSONL, JSON or CSV files")
+    args = parser.parse_args()
+    if pa is None:
+        parser.error("pyarrow is not installed")
+    failures = 0
+    for src in args.sources:
+        started = time.perf_counter()
+        try:
+            path = convert(src)
+        except (ValueError, TypeError, OSError, pa.ArrowException) as e:
+            failures += 1
+            print(f"{src}: not converted: {e}", file=sys.stderr)
+            continue
+        print(f"{src} -> {path} ({path.stat().st_size / 1e6:,.1f} MB, {time.perf_counter() - started:.1f}s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,596 @@
+from __future__ import annotations
+
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Generator, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from arrow_search import ArrowHit, arrow_search_available, iter_arrow_matches, iter_column_values
+from columnar import open_columnar
+from fulltext import FullTextBuilder, iter_indexable, open_fulltext, tokenize
+from id_index import ID_FIELD, IdIndexBuilder, open_id_index, record_id_of
+from line_index import open_line_index, open_record_index, source_signature
+from matching import MATCH_MODES, compile_regex, trigram_index_for
+from projection import PROJECTIONS, compile_projection
+from result_cache import ResultCache, cache_key
+from scan import iter_file_records, read_records
+from serving import WORKERS, stream_offloaded
+
+SEARCH_MODES = MATCH_MODES + ["Ranked (BM25)"]
+# Modes answered from the full-text index rather than by scanning
+INDEXED_MODES = ("Fuzzy", "Ranked (BM25)")
+# Minimum seconds between progress lines while a search or index build streams
+STREAM_INTERVAL_S = 0.1
+# Ranked hits read back from the source per batch by run_query
+READ_BATCH = 256
+
+# Full-text indexes of Hugging Face splits (local files keep theirs next to the file)
+FULLTEXT_DIR = Path(__file__).resolve().parents[2] / "data" / "misc" / ".fulltext"
+NEAR_DUP_DIR = Path(__file__).resolve().parents[2] / "data" / "misc" / ".minhash"
+STATS_DIR = Path(__file__).resolve().parents[2] / "data" / "misc" / ".stats"
+ID_INDEX_DIR = Path(__file__).resolve().parents[2] / "data" / "misc" / ".ids"
+# Where indexes of Hugging Face splits are kept, per index kind
+HF_INDEX_DIRS = {"fulltext": FULLTEXT_DIR, "minhash": NEAR_DUP_DIR, "stats": STATS_DIR, "ids": ID_INDEX_DIR}
+# Opened Hugging Face dataset handles kept per process
+HF_HANDLE_CACHE_SIZE = int(os.environ.get("MISC_HF_HANDLE_CACHE", "8"))
+# Search pages and rankings shared between users and requests; see ResultCache.
+# Setting MISC_RESULT_CACHE_DIR also keeps them on disk across restarts.
+RESULT_CACHE_ENTRIES = int(os.environ.get("MISC_RESULT_CACHE_ENTRIES", "256"))
+RESULT_CACHE_TTL_S = float(os.environ.get("MISC_RESULT_CACHE_TTL_S", "900"))
+RESULT_CACHE_DIR = Path(os.environ["MISC_RESULT_CACHE_DIR"]) if os.environ.get("MISC_RESULT_CACHE_DIR") else None
+
+try:
+    from datasets import load_dataset, get_dataset_config_names
+except Exception:  # pragma: no cover - optional dependency at authoring time
+    load_dataset = None
+    get_dataset_config_names = None
+
+
+def is_huggingface_id(src: str) -> bool:
+    s = (src or "").strip()
+    if s.startswith("hf://"):
+        return True
+    # Treat local/absolute/relative paths as NON-HF
+    if s.startswith("/") or s.startswith("./") or s.startswith("../"):
+        return False
+    if Path(s).exists():
+        return False
+    # Plain namespace/name pattern counts as HF id
+    return bool(re.fullmatch(r"[A-Za-z0-9_.-]+/[A-Za-z0-9_.-]+", s))
+
+
+def normalize_hf_id(src: str) -> str:
+    return src.replace("hf://", "").strip()
+
+
+def _open_hf_dataset(hf_id: str, config: Optional[str], split: str, streaming: bool):
+    if load_dataset is None:
+        raise RuntimeError("datasets library not available")
+    kwargs: Dict[str, Any] = {"split": split}
+    if config:
+        kwargs["name"] = config
+    if streaming:
+        kwargs["streaming"] = True
+    return load_dataset(normalize_hf_id(hf_id), **kwargs)
+
+
+class DatasetHandleCache:
+    """Process-wide LRU of opened datasets keyed by (hf_id, config, split, streaming).
+
+    ``load_dataset`` re-resolves metadata and re-opens the Arrow files on every
+    call; cached handles are memory-mapped ``Dataset`` objects that later clicks
+    reuse as is. Only one thread opens a given key; concurrent callers wait for it.
+    Failed opens are not cached.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple[str, str, str, bool], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[Tuple[str, str, str, bool], threading.Lock] = {}
+
+    def _lookup(self, key: Tuple[str, str, str, bool]) -> Any:
+        # Caller holds self._lock
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._entries[key]
+
+    def get(self, hf_id: str, config: Optional[str], split: str, streaming: bool = False) -> Any:
+        key = (normalize_hf_id(hf_id), config or "", split, streaming)
+        with self._lock:
+            cached = self._lookup(key)
+            if cached is not None:
+                return cached
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            with self._lock:
+                cached = self._lookup(key)
+                if cached is not None:
+                    return cached
+            ds = _open_hf_dataset(hf_id, config, split, streaming)
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = ds
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return ds
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+HF_HANDLES = DatasetHandleCache(HF_HANDLE_CACHE_SIZE)
+# Memoized per process: dataset config names by hf_id, first records by (hf_id, config, split)
+_hf_configs: Dict[str, List[str]] = {}
+_hf_first_records: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+
+
+RESULT_CACHE = ResultCache(RESULT_CACHE_ENTRIES, RESULT_CACHE_TTL_S, RESULT_CACHE_DIR)
+
+
+def load_hf_dataset(hf_id: str, config: Optional[str], split: str, streaming: bool = False):
+    return HF_HANDLES.get(hf_id, config, split, streaming)
+
+
+def list_hf_configs(hf_id: str) -> List[str]:
+    key = normalize_hf_id(hf_id)
+    if key in _hf_configs:
+        return _hf_configs[key]
+    try:
+        if get_dataset_config_names is None:
+            return []
+        configs = get_dataset_config_names(key)
+    except Exception:
+        return []  # not cached: a network hiccup should not stick
+    _hf_configs[key] = configs
+    return configs
+
+
+def first_hf_record(hf_id: str, config: Optional[str], split: str) -> Dict[str, Any]:
+    key = (normalize_hf_id(hf_id), config or "", split)
+    if key not in _hf_first_records:
+        ds = load_hf_dataset(hf_id, config, split)
+        _hf_first_records[key] = ds[0] if len(ds) > 0 else {}
+    return _hf_first_records[key]
+
+
+def guess_conversation(sample: Dict[str, Any]) -> Dict[str, Any]:
+    # Try common container keys first
+    for k in [
+        "messages",
+        "conversations",
+        "conversation",
+        "dialogue",
+        "dialog",
+        "turns",
+        "utterances",
+        "sessions",
+    ]:
+        if k in sample and isinstance(sample[k], (list, tuple)):
+            return {"container_key": k}
+    # Prompt/response pattern
+    if "prompt" in sample and "response" in sample:
+        return {"prompt_key": "prompt", "response_key": "response"}
+    return {}
+
+
+def get_first_record(_src: str, _config: str, _split: str) -> Dict[str, Any]:
+    if is_huggingface_id(_src) and load_dataset:
+        try:
+            return first_hf_record(_src, _config or None, _split)
+        except Exception:
+            return {}
+    # files
+    try:
+        columnar = open_columnar(_src)
+        if columnar is not None:
+            return columnar[0] if len(columnar) else {}
+        if _src.endswith(".csv"):
+            df = pd.read_csv(_src, nrows=1)
+            return df.iloc[0].to_dict() if not df.empty else {}
+        if _src.endswith(".jsonl"):
+            lines = open_line_index(_src)
+            return lines[0] if len(lines) else {}
+        # json array: decode only the first item
+        first = next(iter_file_records(_src), None)
+        return first[0] if first and isinstance(first[0], dict) else {}
+    except Exception:
+        return {}
+
+
+def search_rows(query: Dict[str, Any], start: int) -> Iterator[ArrowHit]:
+    # Yields (matching row or None, resume position, fraction scanned, rows scanned).
+    # HF splits are filtered in Arrow across the whole split, except in Regex mode.
+    # Other sources are matched on a projection of their text leaves compiled from
+    # the first record; for local files the projected text is cached in chunks
+    # between queries.
+    regex = query.get("mode") == "Regex"
+    kw = query["kw"] or ""
+    if not regex:
+        kw = kw.lower()
+    _src, _config, _split, _field = query["src"], query["config"], query["split"], query["field"]
+    if is_huggingface_id(_src):
+        # RuntimeError without the datasets library, as from every other HF entry point
+        ds = load_hf_dataset(_src, _config or None, _split, streaming=False)
+        # Regex stays on the text path, as for local files: Arrow's RE2 kernels reject
+        # Python-only syntax (lookarounds, backreferences) and lack re.MULTILINE
+        if not regex and arrow_search_available(ds):
+            return iter_arrow_matches(ds, kw, _field, start)
+    sample = get_first_record(_src, _config, _split)
+    project = compile_projection(sample, guess_conversation(sample), _field)
+    if regex:
+        matches = compile_regex(kw).search
+    else:
+        def matches(text: str) -> bool:
+            return kw in text
+    if not is_huggingface_id(_src):
+        # Columnar copies prefilter their stored texts in Arrow, then match like the
+        # text path; positions are record numbers. Regex stays on the text path so
+        # Python-only pattern syntax keeps working.
+        columnar = None if regex else open_columnar(_src)
+        if columnar is not None:
+            return columnar.iter_matches(kw, matches, project, start)
+        return PROJECTIONS.iter_matches(_src, matches, _field, start, project)
+    total = max(len(ds), 1)
+    return (
+        (r if matches(project(r)) else None, start + n + 1, (start + n + 1) / total, n + 1)
+        for n, r in enumerate(ds.skip(start))
+    )
+
+
+def source_records(_src: str, _config: str, _split: str, start: int = 0):
+    # (record, start, end, fraction) stream over a whole source; HF starts are row numbers.
+    if is_huggingface_id(_src) and load_dataset:
+        ds = load_hf_dataset(_src, _config or None, _split, streaming=False)
+        total = max(len(ds), 1)
+        return ((r, i, i + 1, (i + 1) / total) for i, r in enumerate(ds))
+    return iter_indexable(iter_file_records(_src, start), start)
+
+
+def source_version(_src: str, _config: str, _split: str) -> List[Any]:
+    # Changes whenever the source's data does: the HF split's fingerprint, or a file's mtime and size
+    if is_huggingface_id(_src):
+        ds = load_hf_dataset(_src, _config or None, _split, streaming=False)
+        return [getattr(ds, "_fingerprint", None) or len(ds)]
+    return list(source_signature(Path(_src)))
+
+
+def index_source(_src: str, _config: str, _split: str, kind: str, start: int = 0):
+    # (source signature, index path, record stream) for a one-pass index build; local
+    # files keep their indexes next to the file and can start later.
+    signature = source_version(_src, _config, _split)
+    if is_huggingface_id(_src) and load_dataset:
+        name = re.sub(r"[^\w.-]+", "_", f"{normalize_hf_id(_src)}__{_config or 'default'}__{_split}")
+        index_path = HF_INDEX_DIRS[kind] / f"{name}.idx"
+    else:
+        index_path = Path(f"{_src}.{kind}.idx")
+    return signature, index_path, source_records(_src, _config, _split, start)
+
+
+def feed_index(records, add: Callable[[Any, int], None], label: str, end: int = 0):
+    # Generator: streams records into `add`, yielding progress lines; returns the end position.
+    count = 0
+    started = last_emit = time.perf_counter()
+    for record, start, end, fraction in records:
+        add(record, start)
+        count += 1
+        now = time.perf_counter()
+        if now - last_emit >= STREAM_INTERVAL_S:
+            last_emit = now
+            rate = count / max(now - started, 1e-6)
+            yield f"⏳ {label}: {count:,} records ({fraction:.0%}) · {rate:,.0f} records/s"
+    return end
+
+
+def write_index(index_path: Path, kind: str, write: Callable[[Path], None]) -> Path:
+    try:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        write(index_path)
+    except OSError:
+        # read-only data dir: keep the index in the temp dir instead
+        index_path = Path(tempfile.gettempdir()) / f"misc-{kind}" / index_path.name
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        write(index_path)
+    return index_path
+
+
+def ensure_fulltext_index(_src: str, _config: str, _split: str):
+    # Generator: yields progress lines while the index is (re)built, returns the index.
+    # One streaming pass over the source; records are projected like a substring search.
+    signature, index_path, records = index_source(_src, _config, _split, "fulltext")
+    index = open_fulltext(index_path, signature)
+    if index is not None:
+        return index
+    sample = get_first_record(_src, _config, _split)
+    project = compile_projection(sample, guess_conversation(sample))
+    builder = FullTextBuilder()
+    end = yield from feed_index(
+        records, lambda record, start: builder.add(project(record), start), "Building full-text index"
+    )
+    index_path = write_index(index_path, "fulltext", lambda path: builder.write(path, end, signature))
+    return open_fulltext(index_path, signature)
+
+
+def records_at(_src: str, _config: str, _split: str, starts: List[int]) -> Dict[int, Any]:
+    # Records by index start position: HF row numbers or local file positions
+    if is_huggingface_id(_src) and load_dataset:
+        ds = load_hf_dataset(_src, _config or None, _split, streaming=False)
+        return {start: ds[int(start)] for start in starts}
+    return read_records(_src, starts)
+
+
+def record_at(_src: str, _config: str, _split: str, row: int) -> Any:
+    # Record number `row` (0-based), reading only that record where the format allows
+    if is_huggingface_id(_src) and load_dataset:
+        ds = load_hf_dataset(_src, _config or None, _split, streaming=False)
+        if not 0 <= row < len(ds):
+            raise IndexError(f"record {row} out of range (0..{len(ds) - 1})")
+        return ds[row]
+    rows = indexed_records(_src, _config, _split)
+    if rows is not None:
+        return rows[row]
+    # CSV positions are row numbers already
+    item = next(iter_file_records(_src, row), None)
+    if item is None:
+        raise IndexError(f"record {row} out of range")
+    return item[0]
+
+
+def indexed_records(_src: str, _config: str, _split: str):
+    # Records by number (len() and [n]) without a scan: HF splits, columnar copies of
+    # local files, or the JSONL/JSON offset index; None for CSV without a columnar copy.
+    if is_huggingface_id(_src) and load_dataset:
+        return load_hf_dataset(_src, _config or None, _split, streaming=False)
+    columnar = open_columnar(_src)
+    if columnar is not None:
+        return columnar
+    if _src.endswith(".csv"):
+        return None
+    return open_record_index(_src)
+
+
+def column_values(_src: str, _config: str, _split: str, field: str) -> Optional[Iterator[List[Any]]]:
+    # Batches of one field's values in record order, read through Arrow without decoding
+    # whole records; None when the source has no Arrow form (callers stream records).
+    rows = indexed_records(_src, _config, _split)
+    if rows is None or not arrow_search_available(rows):
+        return None
+    return iter_column_values(rows, field)
+
+
+def ensure_id_index(_src: str, _config: str, _split: str):
+    # Generator like ensure_fulltext_index: maps each record's id to its record number.
+    # HF splits and columnar copies read just the id column; other files stream records.
+    signature, index_path, records = index_source(_src, _config, _split, "ids")
+    index = open_id_index(index_path, signature)
+    if index is not None:
+        return index
+    builder = IdIndexBuilder()
+    count = 0
+    batches = column_values(_src, _config, _split, ID_FIELD)
+    if batches is not None:
+        total = max(len(indexed_records(_src, _config, _split)), 1)
+        for values in batches:
+            for value in values:
+                builder.add(None if value is None else str(value), count)
+                count += 1
+            yield f"⏳ Building id index: {count:,} records ({count / total:.0%})"
+    else:
+        def add(record: Any, start: int) -> None:
+            nonlocal count
+            builder.add(record_id_of(record), count)
+            count += 1
+
+        yield from feed_index(records, add, "Building id index")
+    index_path = write_index(index_path, "ids", lambda path: builder.write(path, count, signature))
+    return open_id_index(index_path, signature)
+
+
+def find_record(_src: str, _config: str, _split: str, record_id: str) -> Tuple[int, Any]:
+    """(record number, record) of the first record whose id is ``record_id``.
+
+    Raises ``LookupError`` when no record has that id.
+    """
+    index = drain(ensure_id_index(_src, _config, _split))
+    for row in index.candidates(record_id):
+        record = record_at(_src, _config, _split, row)
+        if record_id_of(record) == record_id:
+            return row, record
+    raise LookupError(f"no record with {ID_FIELD} '{record_id}' in {_src} ({index.count:,} records, {len(index):,} with an {ID_FIELD})")
+
+
+def drain(task: Generator[str, None, Any], progress: Optional[Callable[[str], None]] = None) -> Any:
+    """Run a progress-yielding generator (e.g. ``ensure_fulltext_index``) to the end; returns its result."""
+    while True:
+        try:
+            line = next(task)
+        except StopIteration as done:
+            return done.value
+        if progress is not None:
+            progress(line)
+
+
+def new_query(
+    src: str,
+    config: str = "",
+    split: str = "train",
+    kw: str = "",
+    field: str = "",
+    mode: str = SEARCH_MODES[0],
+    max_edits: int = 1,
+    limit: int = 10,
+) -> Dict[str, Any]:
+    """A search over one source, as the UI keeps it in its result cursor.
+
+    Raises ``ValueError`` for an unknown mode or an invalid regex, before any scan.
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"unknown search mode '{mode}' (expected one of: {', '.join(SEARCH_MODES)})")
+    if mode == "Regex":
+        compile_regex(kw or "")
+    return {
+        "src": src,
+        "config": config or "",
+        "split": split,
+        "kw": kw or "",
+        "field": field or "",
+        "mode": mode,
+        "max_edits": int(max_edits),
+        "limit": int(limit),
+    }
+
+
+def query_key(query: Dict[str, Any], **page: int) -> str:
+    """``RESULT_CACHE`` key of a query (and page), normalized, against the source's current version.
+
+    Substring and fuzzy keywords match case-insensitively; regexes and ranked
+    queries (whose OR/NOT operators are upper case) are kept as typed. The
+    search field and typo limit count only in the modes that use them.
+    """
+    mode = query["mode"]
+    normalized = {
+        "src": query["src"].strip(),
+        "config": query["config"],
+        "split": query["split"],
+        "kw": query["kw"].lower() if mode in ("Substring", "Fuzzy") else query["kw"],
+        "field": query["field"] if mode not in INDEXED_MODES else "",
+        "mode": mode,
+        "max_edits": query["max_edits"] if mode == "Fuzzy" else 0,
+        "limit": query["limit"],
+        # Scans of a columnar copy resume at record numbers rather than byte offsets
+        "columnar": not is_huggingface_id(query["src"]) and open_columnar(query["src"]) is not None,
+        **page,
+    }
+    return cache_key("query", normalized, source_version(query["src"], query["config"], query["split"]))
+
+
+def scan_page(query: Dict[str, Any], start: int, count: int):
+    # Generator: the first `count` matches of a scanning query from position `start`, shared
+    # through RESULT_CACHE. Yields (matches so far, rows scanned, fraction of the source) after
+    # each match and every STREAM_INTERVAL_S, or a status line while an identical scan in
+    # flight is awaited or the scan runs in a worker process (MISC_SEARCH_WORKERS); returns
+    # (matches, position to resume from or None at the end of the source).
+    if WORKERS > 0:
+        task = lambda: stream_offloaded(_scanned_page, query, start, count, waiting="⏳ Scanning in a worker process…")
+    else:
+        task = lambda: _scan_page(query, start, count)
+    rows, resume = yield from RESULT_CACHE.stream(
+        query_key(query, start=start, count=count), task, "⏳ Waiting for an identical search that is already running…",
+        STREAM_INTERVAL_S,
+    )
+    return rows, resume
+
+
+def _scan_page(query: Dict[str, Any], start: int, count: int):
+    hits = search_rows(query, start)
+    rows: List[Any] = []
+    last_emit = time.perf_counter()
+    for row, position, fraction, scanned in hits:
+        if row is not None:
+            rows.append(row)
+            if len(rows) >= count:
+                # Offer a next page only if the source has rows left
+                return rows, (position if next(hits, None) is not None else None)
+        now = time.perf_counter()
+        if row is not None or now - last_emit >= STREAM_INTERVAL_S:
+            last_emit = now
+            yield rows, scanned, fraction
+    return rows, None
+
+
+def _scanned_page(query: Dict[str, Any], start: int, count: int):
+    # _scan_page run to the end, in a worker process
+    return drain(_scan_page(query, start, count))
+
+
+def rank_documents(query: Dict[str, Any]):
+    # Generator: yields progress lines while the full-text index opens or builds (or while an
+    # identical ranking in flight is awaited, or the ranking runs in a worker process), then
+    # returns (ranked, note, took_ms), shared through RESULT_CACHE. `ranked` lists (start,
+    # BM25 score) for the top `limit` records, or (start, None) for the first `limit` fuzzy
+    # matches in source order.
+    if WORKERS > 0:
+        task = lambda: stream_offloaded(_ranked_documents, query, waiting="⏳ Ranking in a worker process…")
+    else:
+        task = lambda: _rank_documents(query)
+    ranked, note, took_ms = yield from RESULT_CACHE.stream(
+        query_key(query), task, "⏳ Waiting for an identical search…", STREAM_INTERVAL_S
+    )
+    return ranked, note, took_ms
+
+
+def _rank_documents(query: Dict[str, Any]):
+    index = yield from ensure_fulltext_index(query["src"], query["config"], query["split"])
+    started = time.perf_counter()
+    note = None
+    if query["mode"] == "Fuzzy":
+        # Each query word expands to the indexed spellings within max_edits of it
+        words = tokenize(query["kw"] or "")
+        if not words:
+            raise ValueError("fuzzy search needs at least one word")
+        trigram_index = trigram_index_for(index, index.vocabulary)
+        groups = [trigram_index.similar(w, query["max_edits"]) for w in words]
+        docs = index.docs_any_of(groups)[: query["limit"]]
+        ranked = [(index.doc_starts[d], None) for d in docs]
+        note = "matched: " + (", ".join(sorted(set().union(*groups))) or "nothing")
+    else:
+        hits = index.search(query["kw"] or "", query["limit"])
+        ranked = [(index.doc_starts[d], round(score, 4)) for d, score in hits]
+    return ranked, note, round(1000 * (time.perf_counter() - started), 1)
+
+
+def _ranked_documents(query: Dict[str, Any]):
+    # _rank_documents run to the end, in a worker process
+    return drain(_rank_documents(query))
+
+
+def run_query(
+    query: Dict[str, Any],
+    progress: Optional[Callable[[str], None]] = None,
+) -> Iterator[Tuple[Any, Optional[float]]]:
+    """Stream every match of ``query`` (up to its limit) as (record, BM25 score or None).
+
+    Scans stop as soon as the limit is reached; indexed modes rank once and read
+    back only the hits, in batches. Index builds report to ``progress``. Indexes,
+    dataset handles and projection caches stay warm for the next query.
+    """
+    if query["mode"] in INDEXED_MODES:
+        ranked, _, _ = drain(rank_documents(query), progress)
+        for i in range(0, len(ranked), READ_BATCH):
+            batch = ranked[i: i + READ_BATCH]
+            records = records_at(query["src"], query["config"], query["split"], [start for start, _ in batch])
+            for start, score in batch:
+                yield records.get(start), score
+        return
+    found = 0
+    if query["limit"] <= 0:
+        return
+    for row, _, _, _ in search_rows(query, 0):
+        if row is not None:
+            yield row, None
+            found += 1
+            if found >= query["limit"]:
+                return
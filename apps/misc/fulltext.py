@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import mmap
+import re
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+MAGIC = b"MISCFTIX"
+FULLTEXT_VERSION = 1
+TOKEN_RE = re.compile(r"\w+")
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Section name -> array typecode; every section is 8-byte aligned in the file
+SECTIONS: Tuple[Tuple[str, str], ...] = (
+    ("doc_starts", "Q"),  # source position of document d; doc_starts[n] is where indexing stopped
+    ("doc_lengths", "I"),  # tokens per document
+    ("term_df", "I"),  # documents containing term t
+    ("term_offsets", "Q"),  # postings of term t are postings[off[t], off[t + 1])
+    ("term_position_offsets", "Q"),  # positions of term t are positions[off[t], off[t + 1])
+    ("postings", "B"),  # varints: (document delta, tf) per posting
+    ("positions", "B"),  # varints: per posting, tf position deltas
+)
+_BLOBS = ("postings", "positions")
+# Decoded postings lists kept per open index
+_POSTINGS_CACHE_TERMS = 512
+_OR_RE = re.compile(r"\s+OR\s+")
+_CLAUSE_RE = re.compile(r'(-?)"([^"]*)"|(\S+)')
+
+_open_indexes: Dict[str, "FullTextIndex"] = {}
+_open_indexes_lock = threading.Lock()
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def _put_varint(n: int, out: bytearray) -> None:
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varints(blob: Any, pos: int, count: int) -> Tuple[List[int], int]:
+    values: List[int] = []
+    for _ in range(count):
+        n = shift = 0
+        while True:
+            byte = blob[pos]
+            pos += 1
+            n |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        values.append(n)
+    return values, pos
+
+
+class FullTextBuilder:
+    """Accumulates postings one document at a time during a streaming pass."""
+
+    def __init__(self) -> None:
+        self.doc_starts = array("Q")
+        self.doc_lengths = array("I")
+        # term -> [postings varints, position varints, last document, df]
+        self._terms: Dict[str, List[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, text: str, start: int) -> None:
+        doc = len(self.doc_lengths)
+        tokens = tokenize(text)
+        self.doc_starts.append(start)
+        self.doc_lengths.append(len(tokens))
+        positions: Dict[str, List[int]] = {}
+        for i, token in enumerate(tokens):
+            positions.setdefault(token, []).append(i)
+        for token, where in positions.items():
+            entry = self._terms.get(token)
+            if entry is None:
+                entry = self._terms[token] = [bytearray(), bytearray(), 0, 0]
+            _put_varint(doc - entry[2], entry[0])
+            _put_varint(len(where), entry[0])
+            entry[2] = doc
+            entry[3] += 1
+            previous = 0
+            for p in where:
+                _put_varint(p - previous, entry[1])
+                previous = p
+
+    def write(self, path: Path, end: int, signature: List[Any]) -> None:
+        vocabulary = sorted(self._terms)
+        cols: Dict[str, array] = {name: array(code) for name, code in SECTIONS if name not in _BLOBS}
+        cols["doc_starts"].extend(self.doc_starts)
+        cols["doc_starts"].append(end)
+        cols["doc_lengths"].extend(self.doc_lengths)
+        cols["term_offsets"].append(0)
+        cols["term_position_offsets"].append(0)
+        blobs: Dict[str, bytearray] = {name: bytearray() for name in _BLOBS}
+        for term in vocabulary:
+            term_postings, term_positions, _, df = self._terms[term]
+            blobs["postings"] += term_postings
+            blobs["positions"] += term_positions
+            cols["term_df"].append(df)
+            cols["term_offsets"].append(len(blobs["postings"]))
+            cols["term_position_offsets"].append(len(blobs["positions"]))
+        payloads: List[Tuple[str, bytes]] = [
+            (name, bytes(blobs[name]) if name in _BLOBS else cols[name].tobytes()) for name, _ in SECTIONS
+        ]
+        sections: Dict[str, Tuple[int, int]] = {}
+        offset = 0
+        for name, payload in payloads:
+            sections[name] = (offset, len(payload))
+            offset += (len(payload) + 7) // 8 * 8
+        header = json.dumps({
+            "version": FULLTEXT_VERSION,
+            "byteorder": sys.byteorder,
+            "signature": signature,
+            "total_tokens": sum(self.doc_lengths),
+            "vocabulary": vocabulary,
+            "sections": sections,
+        }, ensure_ascii=False).encode("utf-8")
+        header += b" " * (-(len(MAGIC) + 8 + len(header)) % 8)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            for _, payload in payloads:
+                f.write(payload)
+                f.write(b"\0" * (-len(payload) % 8))
+        tmp_path.replace(path)
+
+
+class FullTextIndex:
+    """Memory-mapped BM25 index written by ``FullTextBuilder.write``.
+
+    Postings are delta-coded (document, tf) varints decoded per query term (and
+    kept for recently used terms); term positions are a separate varint stream
+    only decoded for phrase queries. Documents map back to their source
+    through ``doc_starts``.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mm)
+        if bytes(view[: len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a full-text index")
+        header_len = int.from_bytes(view[len(MAGIC): len(MAGIC) + 8], "little")
+        body_start = len(MAGIC) + 8 + header_len
+        header: Dict[str, Any] = json.loads(bytes(view[len(MAGIC) + 8: body_start]))
+        if header.get("version") != FULLTEXT_VERSION or header.get("byteorder") != sys.byteorder:
+            raise ValueError(f"{path} was written by an incompatible index version")
+        self.signature: List[Any] = header["signature"]
+        self.vocabulary: List[str] = header["vocabulary"]
+        self._term_ids: Dict[str, int] = {t: i for i, t in enumerate(self.vocabulary)}
+        cols: Dict[str, memoryview] = {}
+        for name, code in SECTIONS:
+            offset, length = header["sections"][name]
+            section = view[body_start + offset: body_start + offset + length]
+            cols[name] = section if code == "B" else section.cast(code)
+        self.doc_starts = cols["doc_starts"]
+        self.doc_lengths = cols["doc_lengths"]
+        self.term_df = cols["term_df"]
+        self.term_offsets = cols["term_offsets"]
+        self.term_position_offsets = cols["term_position_offsets"]
+        self.postings = cols["postings"]
+        self.positions = cols["positions"]
+        self._decoded: "OrderedDict[int, Tuple[List[int], List[int]]]" = OrderedDict()
+        self._decoded_lock = threading.Lock()
+        self.avg_length = header["total_tokens"] / max(len(self), 1)
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def _postings(self, term: str) -> Tuple[List[int], List[int]]:
+        """(documents, term frequencies) of ``term``."""
+        t = self._term_ids.get(term)
+        if t is None:
+            return [], []
+        with self._decoded_lock:
+            cached = self._decoded.get(t)
+            if cached is not None:
+                self._decoded.move_to_end(t)
+                return cached
+        pairs, _ = _read_varints(self.postings, self.term_offsets[t], 2 * self.term_df[t])
+        docs: List[int] = []
+        doc = 0
+        for delta in pairs[0::2]:
+            doc += delta
+            docs.append(doc)
+        decoded = (docs, pairs[1::2])
+        with self._decoded_lock:
+            self._decoded[t] = decoded
+            while len(self._decoded) > _POSTINGS_CACHE_TERMS:
+                self._decoded.popitem(last=False)
+        return decoded
+
+    def _term_positions(self, term: str, docs: Set[int]) -> Dict[int, FrozenSet[int]]:
+        t = self._term_ids[term]
+        term_docs, tfs = self._postings(term)
+        pos = self.term_position_offsets[t]
+        found: Dict[int, FrozenSet[int]] = {}
+        for doc, tf in zip(term_docs, tfs):
+            deltas, pos = _read_varints(self.positions, pos, tf)
+            if doc in docs:
+                where, p = [], 0
+                for delta in deltas:
+                    p += delta
+                    where.append(p)
+                found[doc] = frozenset(where)
+        return found
+
+    def _df(self, term: str) -> int:
+        t = self._term_ids.get(term)
+        return 0 if t is None else self.term_df[t]
+
+    def _clause_docs(self, terms: List[str]) -> Set[int]:
+        docs: Optional[Set[int]] = None
+        for term in sorted(set(terms), key=self._df):
+            term_docs = set(self._postings(term)[0])
+            docs = term_docs if docs is None else docs & term_docs
+            if not docs:
+                return set()
+        if docs is None or len(terms) == 1:
+            return docs or set()
+        # Phrase: every term must follow its predecessor
+        per_term = [self._term_positions(term, docs) for term in terms]
+        return {
+            doc for doc in docs
+            if any(all(p + i in per_term[i][doc] for i in range(1, len(terms))) for p in per_term[0][doc])
+        }
+
+    def docs_any_of(self, groups: List[Iterable[str]]) -> List[int]:
+        """Documents holding at least one term of every group, in source order."""
+        docs: Optional[Set[int]] = None
+        for group in groups:
+            group_docs: Set[int] = set()
+            for term in group:
+                group_docs.update(self._postings(term)[0])
+            docs = group_docs if docs is None else docs & group_docs
+            if not docs:
+                return []
+        return sorted(docs or ())
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Top ``k`` (document, BM25 score) pairs for ``query``, best first.
+
+        Words must all occur (``a b``); ``"a b"`` is a phrase; ``OR`` (upper
+        case) separates alternatives; ``-word``, ``-"a phrase"`` or ``NOT word``
+        excludes. Raises ``ValueError`` for a query without positive terms.
+        """
+        matched: Set[int] = set()
+        scoring_terms: Set[str] = set()
+        for disjunct in _OR_RE.split(query.strip()):
+            positive: List[List[str]] = []
+            negative: List[List[str]] = []
+            negate_next = False
+            for m in _CLAUSE_RE.finditer(disjunct):
+                if m.group(3) in ("AND", "NOT"):
+                    negate_next = m.group(3) == "NOT"
+                    continue
+                word = m.group(3) or ""
+                negated = negate_next or m.group(1) == "-" or word.startswith("-")
+                negate_next = False
+                terms = tokenize(m.group(2) if m.group(2) is not None else word)
+                if terms:
+                    (negative if negated else positive).append(terms)
+            if not positive:
+                continue
+            docs: Optional[Set[int]] = None
+            for terms in sorted(positive, key=len):
+                clause = self._clause_docs(terms)
+                docs = clause if docs is None else docs & clause
+                if not docs:
+                    break
+            for terms in negative:
+                if docs:
+                    docs -= self._clause_docs(terms)
+            matched |= docs or set()
+            for terms in positive:
+                scoring_terms.update(terms)
+        if not scoring_terms:
+            raise ValueError("query needs at least one word that is not excluded")
+
+        n = len(self)
+        scores: Dict[int, float] = {}
+        for term in scoring_terms:
+            term_docs, tfs = self._postings(term)
+            if not term_docs:
+                continue
+            idf = math.log(1 + (n - len(term_docs) + 0.5) / (len(term_docs) + 0.5))
+            for doc, tf in zip(term_docs, tfs):
+                if doc in matched:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc] / self.avg_length)
+                    scores[doc] = scores.get(doc, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return heapq.nlargest(k, ((doc, scores.get(doc, 0.0)) for doc in matched), key=lambda x: (x[1], -x[0]))
+
+
+def open_fulltext(path: Path, signature: List[Any]) -> Optional[FullTextIndex]:
+    """Shared index at ``path`` if it exists and was built from ``signature``."""
+    key = str(path.resolve())
+    with _open_indexes_lock:
+        index = _open_indexes.get(key)
+        if index is not None and index.signature == signature:
+            return index
+        if not path.exists():
+            return None
+        try:
+            index = FullTextIndex(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        if index.signature != signature:
+            return None
+        _open_indexes[key] = index
+        return index
+
+
+def iter_indexable(records: Iterator[Tuple[Any, int, float]], start: int = 0) -> Iterator[Tuple[Any, int, int, float]]:
+    """(record, start position, end position, fraction) from a (record, end, fraction) stream."""
+    for record, end, fraction in records:
+        yield record, start, end, fraction
+        start = end
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import sys
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+MAGIC = b"MISCIDIX"
+ID_INDEX_VERSION = 1
+# Record field holding the id that "View as Chat" looks up
+ID_FIELD = "id"
+
+_open_indexes: Dict[str, "IdIndex"] = {}
+_open_indexes_lock = threading.Lock()
+
+
+def id_hash(record_id: str) -> int:
+    """Stable 64-bit hash of an id (never 0, which marks an empty slot)."""
+    value = int.from_bytes(hashlib.blake2b(record_id.encode("utf-8"), digest_size=8).digest(), "little")
+    return value or 1
+
+
+def record_id_of(record: Any) -> Optional[str]:
+    """The record's id as typed in the UI, or None if it has none."""
+    if not isinstance(record, dict):
+        return None
+    value = record.get(ID_FIELD)
+    return None if value is None else str(value)
+
+
+class IdIndexBuilder:
+    """Collects (id, record number) pairs during a streaming pass over a source."""
+
+    def __init__(self) -> None:
+        self.hashes = array("Q")
+        self.rows = array("Q")
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def add(self, record_id: Optional[str], row: int) -> None:
+        if record_id is not None:
+            self.hashes.append(id_hash(record_id))
+            self.rows.append(row)
+
+    def write(self, path: Path, count: int, signature: List[Any]) -> None:
+        # Open addressing with linear probing at load factor <= 1/2. Slots hold
+        # (hash, record number + 1); repeated ids keep their source order along
+        # the probe sequence, so the first record with an id is found first.
+        capacity = 1
+        while capacity < 2 * max(len(self), 1):
+            capacity *= 2
+        mask = capacity - 1
+        slot_hashes = array("Q", bytes(8 * capacity))
+        slot_rows = array("Q", bytes(8 * capacity))
+        for h, row in zip(self.hashes, self.rows):
+            slot = h & mask
+            while slot_rows[slot]:
+                slot = (slot + 1) & mask
+            slot_hashes[slot] = h
+            slot_rows[slot] = row + 1
+        header = json.dumps({
+            "version": ID_INDEX_VERSION,
+            "byteorder": sys.byteorder,
+            "signature": signature,
+            "field": ID_FIELD,
+            "capacity": capacity,
+            "ids": len(self),
+            "count": count,
+        }).encode("utf-8")
+        header += b" " * (-(len(MAGIC) + 8 + len(header)) % 8)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            f.write(slot_hashes.tobytes())
+            f.write(slot_rows.tobytes())
+        tmp_path.replace(path)
+
+
+class IdIndex:
+    """Memory-mapped id -> record number table written by ``IdIndexBuilder.write``.
+
+    A lookup hashes the id and probes a few slots, so it costs the same on a
+    million-row split as on ten rows. Hashes can collide, so ``candidates``
+    yields record numbers that callers confirm against the record's own id.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mm)
+        if bytes(view[: len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not an id index")
+        header_len = int.from_bytes(view[len(MAGIC): len(MAGIC) + 8], "little")
+        body_start = len(MAGIC) + 8 + header_len
+        header: Dict[str, Any] = json.loads(bytes(view[len(MAGIC) + 8: body_start]))
+        if (
+            header.get("version") != ID_INDEX_VERSION
+            or header.get("byteorder") != sys.byteorder
+            or header.get("field") != ID_FIELD
+        ):
+            raise ValueError(f"{path} was written by an incompatible index version")
+        self.signature: List[Any] = header["signature"]
+        self.ids: int = header["ids"]
+        self.count: int = header["count"]  # records in the source, with or without an id
+        capacity = header["capacity"]
+        self._mask = capacity - 1
+        rows_start = body_start + 8 * capacity
+        self._hashes = view[body_start: rows_start].cast("Q")
+        self._rows = view[rows_start: rows_start + 8 * capacity].cast("Q")
+
+    def __len__(self) -> int:
+        return self.ids
+
+    def candidates(self, record_id: str) -> Iterator[int]:
+        """Record numbers whose id hashes like ``record_id``, in source order."""
+        h = id_hash(record_id)
+        slot = h & self._mask
+        while self._rows[slot]:
+            if self._hashes[slot] == h:
+                yield self._rows[slot] - 1
+            slot = (slot + 1) & self._mask
+
+
+def open_id_index(path: Path, signature: List[Any]) -> Optional[IdIndex]:
+    """Shared index at ``path`` if it exists and was built from ``signature``."""
+    key = str(path.resolve())
+    with _open_indexes_lock:
+        index = _open_indexes.get(key)
+        if index is not None and index.signature == signature:
+            return index
+        if not path.exists():
+            return None
+        try:
+            index = IdIndex(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        if index.signature != signature:
+            return None
+        _open_indexes[key] = index
+        return index
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import json
+import mmap
+import sys
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Optional, Tuple
+
+from scan import iter_json
+
+MAGIC = b"MISCLIDX"
+LINE_INDEX_VERSION = 1
+SIDECAR_SUFFIX = ".lines.idx"
+# Item offsets of JSON array files share the sidecar format under their own suffix
+RECORDS_SIDECAR_SUFFIX = ".records.idx"
+
+_open_indexes: Dict[str, "LineIndex"] = {}
+_open_indexes_lock = threading.Lock()
+
+
+def sidecar_path(source: Path, suffix: str = SIDECAR_SUFFIX) -> Path:
+    return source.with_name(source.name + suffix)
+
+
+def source_signature(source: Path) -> Tuple[int, int]:
+    stat = source.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def scan_line_offsets(source: Path) -> array:
+    """Byte offset of every non-blank line, plus the file size as a final sentinel."""
+    offsets = array("Q")
+    pos = 0
+    with source.open("rb") as f:
+        for line in f:
+            if line.strip():
+                offsets.append(pos)
+            pos += len(line)
+    offsets.append(pos)
+    return offsets
+
+
+def scan_json_positions(source: Path) -> array:
+    """Position ``iter_json`` resumes from to decode each array item, plus the end of the last one.
+
+    The first item is read from 0 (so the BOM and opening bracket are handled);
+    every later one from the end of the item before it.
+    """
+    offsets = array("Q", [0])
+    for _, end, _ in iter_json(source):
+        offsets.append(end)
+    return offsets
+
+
+def write_sidecar(path: Path, signature: Tuple[int, int], offsets: array) -> None:
+    header = json.dumps({
+        "version": LINE_INDEX_VERSION,
+        "byteorder": sys.byteorder,
+        "signature": list(signature),
+        "count": len(offsets),
+    }).encode("utf-8")
+    header += b" " * (-(len(MAGIC) + 8 + len(header)) % 8)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        f.write(offsets.tobytes())
+    tmp_path.replace(path)
+
+
+def read_sidecar(path: Path, signature: Tuple[int, int]) -> Optional[memoryview]:
+    """Map the sidecar's offsets, or return None if it is missing, foreign or stale."""
+    try:
+        with path.open("rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    view = memoryview(mm)
+    try:
+        if bytes(view[: len(MAGIC)]) != MAGIC:
+            return None
+        header_len = int.from_bytes(view[len(MAGIC): len(MAGIC) + 8], "little")
+        body_start = len(MAGIC) + 8 + header_len
+        header: Dict[str, Any] = json.loads(bytes(view[len(MAGIC) + 8: body_start]))
+        if (
+            header.get("version") != LINE_INDEX_VERSION
+            or header.get("byteorder") != sys.byteorder
+            or tuple(header.get("signature", ())) != signature
+        ):
+            return None
+        offsets = view[body_start: body_start + 8 * header["count"]].cast("Q")
+        return offsets if len(offsets) == header["count"] else None
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class LineIndex:
+    """Random access to the records of a JSONL file by record number.
+
+    Offsets come from a sidecar file next to the source (``train.jsonl.lines.idx``),
+    memory-mapped so opening a record costs one seek and one read regardless of
+    file size. Blank lines are not records.
+    """
+
+    def __init__(self, source: Path, signature: Tuple[int, int], offsets) -> None:
+        self.source = source
+        self.signature = signature
+        self._offsets = offsets  # memoryview over the sidecar, or an in-memory array
+        self._file: Optional[BinaryIO] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def read_line(self, i: int) -> bytes:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"record {i} out of range (0..{len(self) - 1})")
+        with self._lock:
+            if self._file is None:
+                self._file = self.source.open("rb")
+            self._file.seek(self._offsets[i])
+            return self._file.readline()
+
+    def __getitem__(self, i: int) -> Any:
+        return json.loads(self.read_line(i))
+
+
+class JsonRecordIndex(LineIndex):
+    """Random access to the items of a top-level JSON array by item number.
+
+    Offsets (``train.json.records.idx``) are the positions ``iter_json`` resumes
+    from, so reading an item seeks once and decodes only that item.
+    """
+
+    def __getitem__(self, i: int) -> Any:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"record {i} out of range (0..{len(self) - 1})")
+        item = next(iter_json(self.source, self._offsets[i]), None)
+        if item is None:
+            raise IndexError(f"record {i} is missing; {self.source} changed while open")
+        return item[0]
+
+
+def _build_index(source: Path, suffix: str, scan: Callable[[Path], array], cls: type) -> LineIndex:
+    signature = source_signature(source)
+    path = sidecar_path(source, suffix)
+    offsets = read_sidecar(path, signature)
+    if offsets is None:
+        offsets = scan(source)
+        try:
+            write_sidecar(path, signature, offsets)
+        except OSError:
+            pass  # read-only data dir: keep the in-memory offsets
+    return cls(source, signature, offsets)
+
+
+def build_line_index(source: Path) -> LineIndex:
+    return _build_index(source, SIDECAR_SUFFIX, scan_line_offsets, LineIndex)
+
+
+def build_json_record_index(source: Path) -> JsonRecordIndex:
+    return _build_index(source, RECORDS_SIDECAR_SUFFIX, scan_json_positions, JsonRecordIndex)
+
+
+def open_line_index(src: str) -> LineIndex:
+    """Shared ``LineIndex`` for a JSONL path, rebuilt when the file changes."""
+    return _open_index(src, build_line_index)
+
+
+def open_record_index(src: str) -> LineIndex:
+    """Shared record-number index of a local JSONL or JSON array file."""
+    return _open_index(src, build_line_index if src.endswith(".jsonl") else build_json_record_index)
+
+
+def _open_index(src: str, build: Callable[[Path], LineIndex]) -> LineIndex:
+    source = Path(src)
+    signature = source_signature(source)
+    key = str(source.resolve())
+    with _open_indexes_lock:
+        index = _open_indexes.get(key)
+        if index is None or index.signature != signature:
+            index = _open_indexes[key] = build(source)
+        return index
@@ -0,0 +1,108 @@
+# Shared by the explorers under apps/: edit the copy in apps/multiwoz, then run
+# scripts/sync_shared_modules.py to regenerate the others.
+import re
+import threading
+import weakref
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Sequence, Set
+
+MATCH_MODES: List[str] = ["Substring", "Regex", "Fuzzy"]
+# Fuzzy expansions remembered per vocabulary
+_EXPANSION_CACHE_SIZE: int = 4096
+
+_trigram_indexes: "weakref.WeakKeyDictionary[object, TrigramIndex]" = weakref.WeakKeyDictionary()
+_trigram_indexes_lock = threading.Lock()
+
+
+@lru_cache(maxsize=256)
+def compile_regex(pattern: str) -> "re.Pattern[str]":
+    """Case-insensitive compiled pattern, shared across requests."""
+    try:
+        return re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+    except re.error as e:
+        raise ValueError(f"invalid regex: {e}") from None
+
+
+def trigrams(word: str) -> Set[str]:
+    padded: str = f"  {word} "
+    return {padded[i: i + 3] for i in range(len(padded) - 2)}
+
+
+def within_edits(a: str, b: str, max_edits: int) -> bool:
+    """Whether ``a`` and ``b`` are at most ``max_edits`` insertions, deletions,
+    substitutions or adjacent transpositions apart (optimal string alignment)."""
+    if abs(len(a) - len(b)) > max_edits:
+        return False
+    previous2: List[int] = []
+    previous: List[int] = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current: List[int] = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost: int = 0 if a[i - 1] == b[j - 1] else 1
+            value: int = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+        if min(current) > max_edits:
+            return False
+        previous2, previous = previous, current
+    return previous[len(b)] <= max_edits
+
+
+class TrigramIndex:
+    """Trigram -> word postings over a vocabulary, for typo-tolerant lookups.
+
+    A word within ``k`` edits of the query shares all but at most ``4k`` of its
+    padded trigrams (a transposition touches four), so only words passing that
+    count (and the length bound) are verified with ``within_edits``.
+    """
+
+    def __init__(self, vocabulary: Sequence[str]) -> None:
+        self.vocabulary: Sequence[str] = vocabulary
+        self._grams: Dict[str, List[int]] = {}
+        self._by_length: Dict[int, List[int]] = {}
+        for i, word in enumerate(vocabulary):
+            self._by_length.setdefault(len(word), []).append(i)
+            for gram in trigrams(word):
+                self._grams.setdefault(gram, []).append(i)
+        self._expansions: Dict[tuple, FrozenSet[str]] = {}
+        self._lock = threading.Lock()
+
+    def similar(self, word: str, max_edits: int) -> FrozenSet[str]:
+        """Vocabulary words within ``max_edits`` of ``word`` (including itself)."""
+        key = (word, max_edits)
+        with self._lock:
+            cached = self._expansions.get(key)
+        if cached is not None:
+            return cached
+        query_grams: Set[str] = trigrams(word)
+        needed: int = len(query_grams) - 4 * max_edits
+        if needed > 0:
+            counts: Counter = Counter()
+            for gram in query_grams:
+                counts.update(self._grams.get(gram, ()))
+            candidates: List[int] = [i for i, n in counts.items() if n >= needed]
+        else:
+            candidates = [
+                i
+                for length in range(max(len(word) - max_edits, 0), len(word) + max_edits + 1)
+                for i in self._by_length.get(length, ())
+            ]
+        found: FrozenSet[str] = frozenset(
+            self.vocabulary[i] for i in candidates if within_edits(word, self.vocabulary[i], max_edits)
+        )
+        with self._lock:
+            if len(self._expansions) >= _EXPANSION_CACHE_SIZE:
+                self._expansions.clear()
+            self._expansions[key] = found
+        return found
+
+
+def trigram_index_for(owner: object, vocabulary: Sequence[str]) -> TrigramIndex:
+    """The ``TrigramIndex`` of ``owner``'s vocabulary, built once per owner object."""
+    with _trigram_indexes_lock:
+        index = _trigram_indexes.get(owner)
+        if index is None:
+            index = _trigram_indexes[owner] = TrigramIndex(vocabulary)
+        return index
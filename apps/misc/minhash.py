@@ -0,0 +1,104 @@
+# Shared by the explorers under apps/: edit the copy in apps/multiwoz, then run
+# scripts/sync_shared_modules.py to regenerate the others.
+import hashlib
+from array import array
+from typing import Dict, List, Sequence, Set
+
+# MinHash values per document; LSH splits them into NUM_BANDS bands of equal width
+NUM_HASHES: int = 128
+NUM_BANDS: int = 32
+# Words per shingle
+SHINGLE_WORDS: int = 3
+_BAND_ROWS: int = NUM_HASHES // NUM_BANDS
+_EMPTY: int = 0xFFFFFFFF
+# Offset added per bin skipped when densifying, so borrowed values differ per bin
+_DENSIFY_STEP: int = 0x9E3779B1
+
+
+def shingle_hashes(tokens: Sequence[str]) -> Set[int]:
+    """Stable 64-bit hashes of the distinct ``SHINGLE_WORDS``-word shingles of ``tokens``."""
+    if not tokens:
+        return set()
+    width: int = min(SHINGLE_WORDS, len(tokens))
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(tokens[i: i + width]).encode("utf-8"), digest_size=8).digest(), "little")
+        for i in range(len(tokens) - width + 1)
+    }
+
+
+def minhash(tokens: Sequence[str]) -> array:
+    """``NUM_HASHES`` MinHash values of the shingle set of ``tokens``.
+
+    One-permutation hashing: each shingle hash picks a bin with its low bits
+    and competes for that bin's minimum with its high 32 bits, so a signature
+    costs one hash per shingle. Bins no shingle fell into borrow the value of
+    the next filled bin (rotation densification). A text without words gets an
+    all-empty signature, which never matches.
+    """
+    bins = array("I", [_EMPTY]) * NUM_HASHES
+    for h in shingle_hashes(tokens):
+        b: int = h % NUM_HASHES
+        value: int = h >> 32
+        if value < bins[b]:
+            bins[b] = value
+    filled: List[int] = [b for b in range(NUM_HASHES) if bins[b] != _EMPTY]
+    if filled and len(filled) < NUM_HASHES:
+        source = array("I", bins)
+        for b in range(NUM_HASHES):
+            if source[b] == _EMPTY:
+                distance: int = 1
+                while source[(b + distance) % NUM_HASHES] == _EMPTY:
+                    distance += 1
+                bins[b] = (source[(b + distance) % NUM_HASHES] + distance * _DENSIFY_STEP) % _EMPTY
+    return bins
+
+
+def signature_similarity(signatures: Sequence[int], a: int, b: int) -> float:
+    """Estimated Jaccard similarity of documents ``a`` and ``b``, whose signatures lie end to end in ``signatures``."""
+    sa: Sequence[int] = signatures[a * NUM_HASHES: (a + 1) * NUM_HASHES]
+    sb: Sequence[int] = signatures[b * NUM_HASHES: (b + 1) * NUM_HASHES]
+    return sum(1 for x, y in zip(sa, sb) if x == y) / NUM_HASHES
+
+
+def lsh_clusters(signatures: Sequence[int], count: int, threshold: float) -> List[List[int]]:
+    """Groups of the ``count`` documents linked by an estimated similarity of at least ``threshold``.
+
+    ``signatures`` is an ``array`` or ``memoryview`` of unsigned ints. Documents
+    sharing all values of any band land in the same bucket, so only bucket-mates
+    are compared instead of every pair: within a bucket, a document is compared
+    to the bucket's leaders (earlier members not yet linked to one another)
+    until one is similar enough, and the work grows with bucket sizes rather
+    than with the square of the corpus. Largest clusters first; members in
+    document order.
+    """
+    parent: List[int] = list(range(count))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    empty: bytes = (array("I", [_EMPTY]) * _BAND_ROWS).tobytes()
+    for band in range(NUM_BANDS):
+        buckets: Dict[bytes, List[int]] = {}
+        for doc in range(count):
+            start: int = doc * NUM_HASHES + band * _BAND_ROWS
+            key: bytes = signatures[start: start + _BAND_ROWS].tobytes()
+            if key != empty:
+                buckets.setdefault(key, []).append(doc)
+        for bucket in buckets.values():
+            if len(bucket) < 2:
+                continue
+            leaders: List[int] = [bucket[0]]
+            for doc in bucket[1:]:
+                for leader in leaders:
+                    if find(doc) == find(leader) or signature_similarity(signatures, doc, leader) >= threshold:
+                        parent[find(doc)] = find(leader)
+                        break
+                else:
+                    leaders.append(doc)
+    groups: Dict[int, List[int]] = {}
+    for doc in range(count):
+        groups.setdefault(find(doc), []).append(doc)
+    return sorted((g for g in groups.values() if len(g) > 1), key=lambda g: (-len(g), g[0]))
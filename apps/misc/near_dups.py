@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+import mmap
+import sys
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from minhash import NUM_HASHES, lsh_clusters, minhash, signature_similarity
+
+MAGIC = b"MISCMHIX"
+NEAR_DUP_VERSION = 1
+
+_open_indexes: Dict[str, "NearDupIndex"] = {}
+_open_indexes_lock = threading.Lock()
+
+
+class NearDupBuilder:
+    """Accumulates one MinHash signature per record during a streaming pass."""
+
+    def __init__(self) -> None:
+        self.doc_starts = array("Q")
+        self.signatures = array("I")
+
+    def __len__(self) -> int:
+        return len(self.doc_starts)
+
+    def add(self, tokens: Sequence[str], start: int) -> None:
+        self.doc_starts.append(start)
+        self.signatures.extend(minhash(tokens))
+
+    def write(self, path: Path, end: int, signature: List[Any]) -> None:
+        doc_starts = array("Q", self.doc_starts)
+        doc_starts.append(end)
+        header = json.dumps({
+            "version": NEAR_DUP_VERSION,
+            "byteorder": sys.byteorder,
+            "signature": signature,
+            "num_hashes": NUM_HASHES,
+            "count": len(self),
+        }).encode("utf-8")
+        header += b" " * (-(len(MAGIC) + 8 + len(header)) % 8)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            f.write(doc_starts.tobytes())
+            f.write(self.signatures.tobytes())
+        tmp_path.replace(path)
+
+
+class NearDupIndex:
+    """Memory-mapped MinHash signatures written by ``NearDupBuilder.write``.
+
+    The fraction of equal values in two signatures estimates the Jaccard
+    similarity of the records' shingle sets. Clustering buckets records by each
+    LSH band, so only bucket-mates are compared instead of every pair. Records
+    map back to their source through ``doc_starts``.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mm)
+        if bytes(view[: len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a near-duplicate index")
+        header_len = int.from_bytes(view[len(MAGIC): len(MAGIC) + 8], "little")
+        body_start = len(MAGIC) + 8 + header_len
+        header: Dict[str, Any] = json.loads(bytes(view[len(MAGIC) + 8: body_start]))
+        if (
+            header.get("version") != NEAR_DUP_VERSION
+            or header.get("byteorder") != sys.byteorder
+            or header.get("num_hashes") != NUM_HASHES
+        ):
+            raise ValueError(f"{path} was written by an incompatible index version")
+        self.signature: List[Any] = header["signature"]
+        count = header["count"]
+        starts_end = body_start + 8 * (count + 1)
+        self.doc_starts = view[body_start: starts_end].cast("Q")
+        self.signatures = view[starts_end: starts_end + 4 * NUM_HASHES * count].cast("I")
+        self._clusters: Dict[float, List[List[int]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.doc_starts) - 1
+
+    def similarity(self, a: int, b: int) -> float:
+        """Estimated Jaccard similarity of two records' shingle sets."""
+        return signature_similarity(self.signatures, a, b)
+
+    def clusters(self, threshold: float) -> List[List[int]]:
+        """Groups of records linked by an estimated similarity of at least ``threshold``.
+
+        Largest clusters first; members in source order (see ``lsh_clusters``).
+        """
+        threshold = round(threshold, 2)
+        with self._lock:
+            cached = self._clusters.get(threshold)
+        if cached is not None:
+            return cached
+        found = lsh_clusters(self.signatures, len(self), threshold)
+        with self._lock:
+            self._clusters[threshold] = found
+        return found
+
+
+def open_near_dups(path: Path, signature: List[Any]) -> Optional[NearDupIndex]:
+    """Shared index at ``path`` if it exists and was built from ``signature``."""
+    key = str(path.resolve())
+    with _open_indexes_lock:
+        index = _open_indexes.get(key)
+        if index is not None and index.signature == signature:
+            return index
+        if not path.exists():
+            return None
+        try:
+            index = NearDupIndex(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        if index.signature != signature:
+            return None
+        _open_indexes[key] = index
+        return index
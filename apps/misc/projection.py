@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import os
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from line_index import source_signature
+from scan import ScanItem, iter_file_records
+
+# Records projected per cached chunk
+PROJECTION_CHUNK_ROWS = 1000
+PROJECTION_CACHE_MB = int(os.environ.get("MISC_PROJECTION_CACHE_MB", "256"))
+# Approximate per-record overhead of a cached text (str header, position and fraction objects)
+_RECORD_OVERHEAD_BYTES = 120
+
+Projection = Callable[[Any], str]
+# Projected text -> whether the record matches
+TextMatcher = Callable[[str], bool]
+# (matching record or None for a progress tick, resume position, fraction scanned, rows scanned)
+Hit = Tuple[Optional[Any], int, float, int]
+
+
+def text_leaves(value: Any, out: List[str]) -> None:
+    """Append every string (and number/bool, as text) found in ``value``; keys are skipped."""
+    stack = [value]
+    while stack:
+        v = stack.pop()
+        if isinstance(v, str):
+            out.append(v)
+        elif isinstance(v, dict):
+            stack.extend(reversed(list(v.values())))
+        elif isinstance(v, (list, tuple)):
+            stack.extend(reversed(v))
+        elif isinstance(v, bool):
+            out.append("true" if v else "false")
+        elif isinstance(v, (int, float)):
+            out.append(repr(v))
+
+
+def _generic(value: Any, out: List[str]) -> None:
+    text_leaves(value, out)
+
+
+def _string(value: Any, out: List[str]) -> None:
+    if isinstance(value, str):
+        out.append(value)
+    else:
+        text_leaves(value, out)
+
+
+def _string_list(value: Any, out: List[str]) -> None:
+    if isinstance(value, list) and all(isinstance(x, str) for x in value):
+        out.extend(value)
+    else:
+        text_leaves(value, out)
+
+
+def _session(value: Any, out: List[str]) -> None:
+    # MiSC ``*_session_dialogue``: [[speakers...], [utterances...]]
+    if isinstance(value, list) and len(value) == 2 and all(isinstance(x, list) for x in value):
+        _string_list(value[0], out)
+        _string_list(value[1], out)
+    else:
+        text_leaves(value, out)
+
+
+def _messages(value: Any, out: List[str]) -> None:
+    # Conversation container: [{"role": ..., "content": ...}, ...]
+    if not isinstance(value, list):
+        text_leaves(value, out)
+        return
+    for m in value:
+        if isinstance(m, dict):
+            for v in m.values():
+                if isinstance(v, str):
+                    out.append(v)
+                elif v is not None:
+                    text_leaves(v, out)
+        else:
+            text_leaves(m, out)
+
+
+def _extractor_for(key: str, sample_value: Any, conversation: Dict[str, Any]) -> Callable[[Any, List[str]], None]:
+    if key == conversation.get("container_key"):
+        return _messages
+    if isinstance(sample_value, str):
+        return _string
+    if isinstance(sample_value, list):
+        if "dialogue" in key.lower() and len(sample_value) == 2 and all(isinstance(x, list) for x in sample_value):
+            return _session
+        if all(isinstance(x, str) for x in sample_value):
+            return _string_list
+    return _generic
+
+
+def compile_projection(sample: Dict[str, Any], conversation: Dict[str, Any], field: str = "") -> Projection:
+    """Build a record -> lowercase searchable text function from a sample record.
+
+    Only text leaves are kept (no keys, quotes or escapes). Each field the sample
+    has gets an extractor specialised to its shape (plain string, list of strings,
+    MiSC ``[[speakers], [utterances]]`` session, message list); anything else,
+    including keys the sample lacks, falls back to a generic walk. With ``field``
+    set, only that field is projected for records that have it.
+    """
+    extractors = {k: _extractor_for(k, v, conversation) for k, v in sample.items()}
+
+    def project_record(r: Any) -> str:
+        out: List[str] = []
+        if isinstance(r, dict):
+            for k, v in r.items():
+                extractors.get(k, _generic)(v, out)
+        else:
+            text_leaves(r, out)
+        return "\n".join(out).lower()
+
+    if not field:
+        return project_record
+    field_extractor = extractors.get(field, _generic)
+
+    def project_field(r: Any) -> str:
+        if not (isinstance(r, dict) and field in r):
+            return project_record(r)
+        out: List[str] = []
+        field_extractor(r[field], out)
+        return "\n".join(out).lower()
+
+    return project_field
+
+
+class _Chunk:
+    __slots__ = ("start", "ends", "fractions", "texts", "at_eof", "nbytes")
+
+    def __init__(self, start: int) -> None:
+        self.start = start
+        self.ends: List[int] = []  # resume position after each record
+        self.fractions: List[float] = []
+        self.texts: List[str] = []
+        self.at_eof = False
+        self.nbytes = 0
+
+    def record_start(self, k: int) -> int:
+        return self.start if k == 0 else self.ends[k - 1]
+
+
+class ProjectionCache:
+    """Searchable text of local-file records, cached in chunks of consecutive rows.
+
+    A chunk is keyed by (file, mtime/size, search field, start position) and
+    holds each record's projected text and end position, so a repeated or paged
+    query matches cached strings and only re-reads the records that hit.
+    Chunks are charged their approximate in-memory size against ``budget_bytes`` and evicted
+    least recently used first.
+    """
+
+    def __init__(self, budget_bytes: int) -> None:
+        self.budget_bytes = budget_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._chunks: "OrderedDict[Tuple[Any, ...], _Chunk]" = OrderedDict()
+        self._starts: Dict[Tuple[Any, ...], List[int]] = {}  # source key -> sorted chunk starts
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _find(self, source_key: Tuple[Any, ...], pos: int) -> Optional[Tuple[_Chunk, int]]:
+        """The cached chunk holding a record that starts at ``pos``, and that record's index."""
+        with self._lock:
+            starts = self._starts.get(source_key, [])
+            i = bisect_left(starts, pos + 1) - 1
+            if i < 0:
+                return None
+            chunk = self._chunks[source_key + (starts[i],)]
+            if pos == chunk.start:
+                first = 0
+            else:
+                first = bisect_left(chunk.ends, pos) + 1
+                if first >= len(chunk.ends) or chunk.ends[first - 1] != pos:
+                    return None
+            self._chunks.move_to_end(source_key + (chunk.start,))
+            self.hits += 1
+            return chunk, first
+
+    def _next_start(self, source_key: Tuple[Any, ...], pos: int) -> Optional[int]:
+        with self._lock:
+            starts = self._starts.get(source_key, [])
+            i = bisect_left(starts, pos + 1)
+            return starts[i] if i < len(starts) else None
+
+    def _store(self, source_key: Tuple[Any, ...], chunk: _Chunk) -> None:
+        with self._lock:
+            key = source_key + (chunk.start,)
+            if key in self._chunks:
+                return
+            self.misses += 1
+            self._chunks[key] = chunk
+            insort(self._starts.setdefault(source_key, []), chunk.start)
+            self._bytes += chunk.nbytes
+            while self._bytes > self.budget_bytes and len(self._chunks) > 1:
+                old_key, old = self._chunks.popitem(last=False)
+                self._starts[old_key[:-1]].remove(old.start)
+                self._bytes -= old.nbytes
+                self.evictions += 1
+
+    def iter_matches(self, src: str, matches: TextMatcher, field: str, start: int, project: Projection) -> Iterator[Hit]:
+        """Records of ``src`` from ``start`` whose projected text satisfies ``matches``.
+
+        Matches come with their resume position; a progress tick (``None``)
+        follows each chunk that is not the end of the file.
+        """
+        path = Path(src)
+        source_key = (str(path.resolve()), source_signature(path), field)
+        pos = start
+        scanned = 0
+        csv = src.endswith(".csv")
+        while True:
+            found = self._find(source_key, pos)
+            if found is not None:
+                chunk, first = found
+                reader: Optional[Iterator[ScanItem]] = None
+                reader_end = -1
+                for k in range(first, len(chunk.ends)):
+                    scanned += 1
+                    if not matches(chunk.texts[k]):
+                        continue
+                    # Re-read only the records that hit: seek for byte positions,
+                    # read forward for CSV row numbers
+                    record_start = chunk.record_start(k)
+                    if reader is None or reader_end > record_start or (reader_end < record_start and not csv):
+                        reader = iter_file_records(src, record_start)
+                        reader_end = record_start
+                    while reader_end < record_start:
+                        _, reader_end, _ = next(reader)
+                    record, reader_end, _ = next(reader)
+                    yield record, chunk.ends[k], chunk.fractions[k], scanned
+            else:
+                chunk = _Chunk(pos)
+                stop = self._next_start(source_key, pos)
+                try:
+                    for record, end, fraction in iter_file_records(src, pos):
+                        scanned += 1
+                        text = project(record)
+                        chunk.ends.append(end)
+                        chunk.fractions.append(fraction)
+                        chunk.texts.append(text)
+                        chunk.nbytes += len(text) + _RECORD_OVERHEAD_BYTES
+                        if matches(text):
+                            yield record, end, fraction, scanned
+                        if len(chunk.ends) >= PROJECTION_CHUNK_ROWS or end == stop:
+                            break
+                    else:
+                        chunk.at_eof = True
+                finally:
+                    # Keep what was projected even when the caller stops early (page full)
+                    if chunk.ends:
+                        self._store(source_key, chunk)
+                if not chunk.ends:
+                    return
+            if chunk.at_eof:
+                return
+            pos = chunk.ends[-1]
+            yield None, pos, chunk.fractions[-1], scanned
+
+    def clear(self) -> None:
+        with self._lock:
+            self._chunks.clear()
+            self._starts.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "chunks": len(self._chunks),
+                "bytes": self._bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+PROJECTIONS = ProjectionCache(PROJECTION_CACHE_MB * 1024 * 1024)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from engine import SEARCH_MODES, new_query, run_query
+
+# Short spellings accepted for --mode, besides the UI names
+MODE_ALIASES = {"substring": "Substring", "regex": "Regex", "fuzzy": "Fuzzy", "bm25": "Ranked (BM25)", "ranked": "Ranked (BM25)"}
+FORMATS = ("jsonl", "ids")
+
+
+def resolve_mode(mode: str) -> str:
+    if mode in SEARCH_MODES:
+        return mode
+    try:
+        return MODE_ALIASES[mode.lower()]
+    except KeyError:
+        raise ValueError(f"unknown mode '{mode}' (expected one of: {', '.join(MODE_ALIASES)})") from None
+
+
+def query_from_spec(spec: Dict[str, Any], defaults: argparse.Namespace) -> Dict[str, Any]:
+    """Engine query for one batch line (or the command line alone), defaults filled from ``defaults``."""
+    unknown = set(spec) - {"source", "config", "split", "keyword", "field", "mode", "max_edits", "limit"}
+    if unknown:
+        raise ValueError(f"unknown keys: {', '.join(sorted(unknown))}")
+    source = spec.get("source", defaults.source)
+    if not source:
+        raise ValueError("no source given")
+    return new_query(
+        source,
+        spec.get("config", defaults.config),
+        spec.get("split", defaults.split),
+        spec.get("keyword", defaults.keyword),
+        spec.get("field", defaults.field),
+        resolve_mode(spec.get("mode", defaults.mode)),
+        spec.get("max_edits", defaults.max_edits),
+        spec.get("limit", defaults.limit),
+    )
+
+
+def format_result(record: Any, score: Optional[float], fmt: str, number: Optional[int] = None) -> str:
+    """One output line; ``number`` tags lines of a batch written to a single stream."""
+    if fmt == "ids":
+        value = record.get("id", "") if isinstance(record, dict) else ""
+        return str(value) if number is None else f"{number}\t{value}"
+    row: Dict[str, Any] = {"record": record}
+    if score is not None:
+        row["score"] = score
+    if number is not None:
+        row = {"query": number, **row}
+    return json.dumps(row, ensure_ascii=False, default=str)
+
+
+def iter_specs(batch: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """(line number, spec or None, parse error or None) for each non-blank batch line."""
+    stream = sys.stdin if batch == "-" else open(batch, encoding="utf-8")
+    try:
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                spec = json.loads(line)
+            except ValueError as e:
+                yield number, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(spec, dict):
+                yield number, None, "expected a JSON object"
+                continue
+            yield number, spec, None
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def write_results(query: Dict[str, Any], out: TextIO, fmt: str, number: Optional[int], verbose: bool) -> int:
+    progress = (lambda line: print(line, file=sys.stderr, flush=True)) if verbose else None
+    count = 0
+    for record, score in run_query(query, progress):
+        out.write(format_result(record, score, fmt, number) + "\n")
+        count += 1
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run explorer searches without the UI and stream the matches.")
+    parser.add_argument("--source", help="HF dataset id or local .jsonl/.json/.csv path")
+    parser.add_argument("--config", default="", help="HF config")
+    parser.add_argument("--split", default="train")
+    parser.add_argument("--keyword", default="")
+    parser.add_argument("--field", default="", help="restrict substring/regex matching to one field")
+    parser.add_argument("--mode", default="substring", help="substring, regex, fuzzy or bm25")
+    parser.add_argument("--max-edits", type=int, default=1, help="fuzzy mode: typos allowed per word")
+    parser.add_argument("--limit", type=int, default=100, help="matches per query")
+    parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    parser.add_argument("--batch", help="JSONL file of queries ('-' for stdin)")
+    parser.add_argument("--output", help="write results here instead of stdout")
+    parser.add_argument("--output-dir", help="batch: write each query's results to <dir>/<line>.<format>")
+    parser.add_argument("--verbose", action="store_true", help="report index builds on stderr")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    queries = results = failures = 0
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if not args.batch:
+            try:
+                query = query_from_spec({}, args)
+            except ValueError as e:
+                parser.error(str(e))
+            write_results(query, out, args.format, None, args.verbose)
+            return 0
+        out_dir = Path(args.output_dir) if args.output_dir else None
+        if out_dir is not None:
+            out_dir.mkdir(parents=True, exist_ok=True)
+        for number, spec, error in iter_specs(args.batch):
+            queries += 1
+            try:
+                if error is not None:
+                    raise ValueError(error)
+                query = query_from_spec(spec, args)
+                if out_dir is None:
+                    results += write_results(query, out, args.format, number, args.verbose)
+                else:
+                    with (out_dir / f"{number:06d}.{args.format}").open("w", encoding="utf-8") as f:
+                        results += write_results(query, f, args.format, None, args.verbose)
+            except Exception as e:
+                failures += 1
+                print(f"query {number}: {e}", file=sys.stderr, flush=True)
+        took = time.perf_counter() - started
+        print(
+            f"{queries} queries, {results} results, {failures} failed in {took:.2f}s"
+            f" ({queries / max(took, 1e-6):,.0f} queries/s)",
+            file=sys.stderr,
+        )
+        return 1 if failures else 0
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+# Shared by the explorers under apps/: edit the copy in apps/multiwoz, then run
+# scripts/sync_shared_modules.py to regenerate the others.
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Generator, Optional, Tuple, TypeVar
+
+Y = TypeVar("Y")
+
+
+def cache_key(namespace: str, query: Dict, version: Any) -> str:
+    """Canonical key of a normalized query against one version of the data."""
+    return json.dumps([namespace, query, version], sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+class ResultCache:
+    """Process-wide cache of query results with single-flight computation.
+
+    Keys come from ``cache_key``, so a result is never served for data that
+    changed since. Entries expire ``ttl_s`` seconds after they were computed and
+    the least recently used ones are evicted beyond ``max_entries``. Only one
+    caller computes a given key at a time; concurrent callers wait for it and
+    reuse its result. Failed computations are not cached, so a waiter then
+    computes the result itself.
+
+    With ``disk_dir`` set, results are also written there as gzipped JSON and
+    survive restarts (results that are not JSON-serializable stay in memory).
+    Returned values are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_entries: int, ttl_s: float, disk_dir: Optional[Path] = None) -> None:
+        self.max_entries: int = max_entries
+        self.ttl_s: float = ttl_s
+        self.disk_dir: Optional[Path] = disk_dir
+        self.hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+        self.coalesced: int = 0
+        self.evictions: int = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / (hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json.gz")
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, Any]]:
+        if self.disk_dir is None:
+            return None
+        path: Path = self._disk_path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry: Dict = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("key") != key:
+            return None
+        if time.time() - entry["created"] > self.ttl_s:
+            path.unlink(missing_ok=True)
+            return None
+        return entry["created"], entry["value"]
+
+    def _write_disk(self, key: str, created: float, value: Any) -> None:
+        if self.disk_dir is None:
+            return
+        try:
+            payload: str = json.dumps({"key": key, "created": created, "value": value}, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return  # not JSON-serializable: memory only
+        try:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            path: Path = self._disk_path(key)
+            tmp_path: Path = path.with_name(path.name + ".tmp")
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                f.write(payload)
+            tmp_path.replace(path)
+            # Keep the newest max_entries files; expired ones are also dropped when read
+            files = sorted(self.disk_dir.glob("*.json.gz"), key=lambda p: p.stat().st_mtime, reverse=True)
+            for old in files[self.max_entries:]:
+                old.unlink(missing_ok=True)
+        except OSError:
+            pass  # read-only cache dir: memory only
+
+    def lookup(self, key: str) -> Tuple[bool, Any]:
+        """(True, result) if ``key`` has a live result in memory or on disk, else (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.time() - entry[0] <= self.ttl_s:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1]
+                self._entries.pop(key)
+        entry = self._read_disk(key)
+        if entry is None:
+            return False, None
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, entry)
+        return True, entry[1]
+
+    def _remember(self, key: str, entry: Tuple[float, Any]) -> None:
+        # Caller holds self._lock
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def store(self, key: str, value: Any) -> None:
+        created: float = time.time()
+        with self._lock:
+            self._remember(key, (created, value))
+        self._write_disk(key, created, value)
+
+    def _claim(self, key: str) -> Optional[threading.Event]:
+        # None: the caller now computes `key` and must _release it; else the event to wait on
+        with self._lock:
+            pending: Optional[threading.Event] = self._inflight.get(key)
+            if pending is None:
+                self._inflight[key] = threading.Event()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+            return pending
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            pending: Optional[threading.Event] = self._inflight.pop(key, None)
+        if pending is not None:
+            pending.set()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Cached result of ``key``, computing it with ``compute`` at most once at a time."""
+        while True:
+            hit, value = self.lookup(key)
+            if hit:
+                return value
+            pending: Optional[threading.Event] = self._claim(key)
+            if pending is None:
+                break
+            pending.wait()
+        try:
+            value = compute()
+            self.store(key, value)
+            return value
+        finally:
+            self._release(key)
+
+    def stream(
+        self,
+        key: str,
+        task: Callable[[], Generator[Y, None, Any]],
+        waiting: Y,
+        interval_s: float = 0.1,
+    ) -> Generator[Y, None, Any]:
+        """Generator form of ``get_or_compute`` for progress-yielding tasks.
+
+        The computing caller re-yields the task's progress items; callers
+        waiting on it yield ``waiting`` every ``interval_s`` seconds. Returns the
+        task's result. Closing the generator mid-task releases the key.
+        """
+        while True:
+            hit, value = self.lookup(key)
+            if hit:
+                return value
+            pending: Optional[threading.Event] = self._claim(key)
+            if pending is None:
+                break
+            while not pending.wait(interval_s):
+                yield waiting
+        try:
+            value = yield from task()
+            self.store(key, value)
+            return value
+        finally:
+            self._release(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.disk_dir is not None:
+            for path in self.disk_dir.glob("*.json.gz"):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "inflight": len(self._inflight),
+            }
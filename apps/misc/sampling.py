@@ -0,0 +1,70 @@
+# Shared by the explorers under apps/: edit the copy in apps/multiwoz, then run
+# scripts/sync_shared_modules.py to regenerate the others.
+import random
+from typing import Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+
+def seeded_rng(seed: Optional[str]) -> Tuple[random.Random, int]:
+    """A generator for ``seed`` (an integer, as typed in the UI), or for a fresh seed if blank.
+
+    The seed actually used is returned so any batch can be drawn again.
+    """
+    text: str = (seed or "").strip()
+    if not text:
+        chosen: int = random.SystemRandom().randrange(2 ** 31)
+    else:
+        try:
+            chosen = int(text)
+        except ValueError:
+            raise ValueError(f"seed must be an integer, got '{text}'") from None
+    return random.Random(chosen), chosen
+
+
+def sample_indices(population: int, n: int, rng: random.Random) -> List[int]:
+    """``n`` distinct positions of ``range(population)`` (all of them if fewer), in draw order."""
+    return rng.sample(range(population), min(n, population))
+
+
+def stratified_sample(strata: Dict[str, Sequence[int]], per_stratum: int, rng: random.Random) -> Dict[str, List[int]]:
+    """Up to ``per_stratum`` members of every stratum, never picking a member twice.
+
+    Strata may overlap (a MultiWOZ dialogue can belong to several services);
+    smaller strata draw first so they are not starved by larger ones.
+    """
+    taken: Set[int] = set()
+    picks: Dict[str, List[int]] = {}
+    for name in sorted(strata, key=lambda s: len(strata[s])):
+        members: Sequence[int] = strata[name]
+        if taken:
+            members = [m for m in members if m not in taken]
+        chosen: List[int] = [members[i] for i in sample_indices(len(members), per_stratum, rng)]
+        taken.update(chosen)
+        picks[name] = chosen
+    return {name: picks[name] for name in strata}
+
+
+class StratifiedReservoir:
+    """Uniform samples of ``n`` items per stratum from a stream of unknown length, in one pass.
+
+    Reservoir sampling (Algorithm R): the k-th item of a stratum replaces a
+    random slot of its reservoir with probability n / k. Strata interleave in
+    the stream, so each keeps its own count. Use a single stratum for a plain
+    uniform sample.
+    """
+
+    def __init__(self, n: int, rng: random.Random) -> None:
+        self.n: int = n
+        self.rng: random.Random = rng
+        self.reservoirs: Dict[Hashable, List[object]] = {}
+        self.counts: Dict[Hashable, int] = {}
+
+    def add(self, stratum: Hashable, item: object) -> None:
+        seen: int = self.counts.get(stratum, 0) + 1
+        self.counts[stratum] = seen
+        reservoir: List[object] = self.reservoirs.setdefault(stratum, [])
+        if len(reservoir) < self.n:
+            reservoir.append(item)
+        else:
+            slot: int = self.rng.randrange(seen)
+            if slot < self.n:
+                reservoir[slot] = item
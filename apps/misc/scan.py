@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+import pandas as pd
+
+# Rows per pandas chunk when streaming CSV
+CSV_CHUNK_ROWS = 2000
+# Bytes read at a time when streaming a JSON array
+JSON_READ_BYTES = 1 << 20
+_JSON_GAP_RE = re.compile(r"[ \t\r\n,]*")
+
+# (record, position to resume after this record, fraction of the source consumed)
+ScanItem = Tuple[Any, int, float]
+
+
+def iter_jsonl(path: Path, start: int = 0) -> Iterator[ScanItem]:
+    """Records of a JSONL file one line at a time; positions are byte offsets."""
+    size = max(path.stat().st_size, 1)
+    with path.open("rb") as f:
+        f.seek(start)
+        pos = start
+        for line in f:
+            pos += len(line)
+            if line.strip():
+                yield json.loads(line), pos, pos / size
+
+
+def iter_csv(path: Path, start: int = 0) -> Iterator[ScanItem]:
+    """Records of a CSV file in ``CSV_CHUNK_ROWS`` chunks; positions are row numbers."""
+    size = max(path.stat().st_size, 1)
+    with path.open("rb") as f:
+        # A callable keeps skipping constant-memory however far in we resume
+        reader = pd.read_csv(f, chunksize=CSV_CHUNK_ROWS, skiprows=lambda i: 0 < i <= start)
+        row = start
+        for chunk in reader:
+            fraction = min(f.tell() / size, 1.0)
+            for rec in chunk.to_dict(orient="records"):
+                row += 1
+                yield rec, row, fraction
+
+
+def iter_json(path: Path, start: int = 0) -> Iterator[ScanItem]:
+    """Items of a top-level JSON array, decoded incrementally; positions are byte offsets.
+
+    Only the item being decoded (plus one read buffer) is held in memory. A file
+    holding a single non-array value yields that value once.
+    """
+    size = max(path.stat().st_size, 1)
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    in_array = start > 0  # resumed positions always lie inside the array
+    with path.open("rb") as f:
+        if start == 0 and f.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8:
+            start = len(codecs.BOM_UTF8)
+        f.seek(start)
+        buf = ""
+        i = 0  # read position in buf
+        byte_pos = start  # byte offset of buf[i] in the file
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buf, i, eof
+            chunk = f.read(JSON_READ_BYTES)
+            eof = not chunk
+            buf = buf[i:] + text_decoder.decode(chunk, final=eof)
+            i = 0
+            return not eof
+
+        fill()
+        while True:
+            # Whitespace and commas between items are ASCII: one byte per char
+            gap_end = _JSON_GAP_RE.match(buf, i).end()
+            byte_pos += gap_end - i
+            i = gap_end
+            if i >= len(buf):
+                if fill():
+                    continue
+                return
+            if not in_array:
+                if buf[i] != "[":
+                    while fill():
+                        pass
+                    yield json.loads(buf[i:]), size, 1.0
+                    return
+                in_array = True
+                i += 1
+                byte_pos += 1
+                continue
+            if buf[i] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buf, i)
+            except json.JSONDecodeError:
+                if fill():
+                    continue
+                raise
+            if end == len(buf) and not eof:
+                # A scalar may continue past the buffer ("12" of "123")
+                fill()
+                continue
+            byte_pos += len(buf[i:end].encode("utf-8"))
+            i = end
+            yield item, byte_pos, byte_pos / size
+
+
+def iter_file_records(src: str, start: int = 0) -> Iterator[ScanItem]:
+    """Stream a local JSON/JSONL/CSV source from ``start`` (0 or a position it yielded)."""
+    path = Path(src)
+    if src.endswith(".csv"):
+        return iter_csv(path, start)
+    if src.endswith(".jsonl"):
+        return iter_jsonl(path, start)
+    return iter_json(path, start)
+
+
+def read_records(src: str, starts: List[int]) -> Dict[int, Any]:
+    """Records beginning at each of ``starts`` (positions yielded by ``iter_file_records``).
+
+    Byte-positioned formats seek straight to each record; CSV reads forward once.
+    """
+    records: Dict[int, Any] = {}
+    if not src.endswith(".csv"):
+        for start in starts:
+            item = next(iter_file_records(src, start), None)
+            if item is not None:
+                records[start] = item[0]
+        return records
+    wanted = set(starts)
+    if not wanted:
+        return records
+    position, last = min(wanted), max(wanted)
+    for record, end, _ in iter_file_records(src, position):
+        if position in wanted:
+            records[position] = record
+        if end > last:
+            break
+        position = end
+    return records
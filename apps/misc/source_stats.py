@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+STATS_VERSION = 1
+# Bytes before the last counted position that must be unchanged to resume after an append
+_TAIL_BYTES = 4096
+
+# Counter-valued aggregates (int keys are stored as str for JSON)
+COUNTERS: Sequence[str] = (
+    "sessions_per_record",  # *_session_dialogue lists -> records
+    "turns_per_record",  # utterances in the extracted chat -> records
+    "words_per_utterance",  # word count -> utterances
+    "speaker_turns",  # "main speaker" / "other speakers" -> utterances
+    "speaker_words",  # same keys -> words
+)
+
+
+def value_kind(value: Any) -> str:
+    """Coarse JSON type of a field value; NaN (a missing CSV cell) counts as null."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string" if value else "empty"
+    if isinstance(value, (list, tuple)):
+        return "list" if value else "empty"
+    if isinstance(value, dict):
+        return "object" if value else "empty"
+    return type(value).__name__
+
+
+def tail_digest(path: Path, end: int) -> str:
+    """Hash of the ``_TAIL_BYTES`` before ``end``, to recognise a file that was only appended to."""
+    with path.open("rb") as f:
+        f.seek(max(end - _TAIL_BYTES, 0))
+        return hashlib.blake2b(f.read(min(end, _TAIL_BYTES)), digest_size=16).hexdigest()
+
+
+class SourceStats:
+    """Additive aggregates over the records of one source.
+
+    ``fields`` maps each field seen to how many records hold each value kind;
+    records lacking the field count as ``missing``. ``end`` is the source
+    position after the last record counted, so stats of an append-only JSONL
+    file can be extended instead of recomputed.
+    """
+
+    def __init__(self, payload: Optional[Dict[str, Any]] = None) -> None:
+        payload = payload or {}
+        self.records: int = payload.get("records", 0)
+        self.fields: Dict[str, Counter] = {k: Counter(v) for k, v in payload.get("fields", {}).items()}
+        self.counters: Dict[str, Counter] = {name: Counter(payload.get(name, {})) for name in COUNTERS}
+        self.signature: List[Any] = payload.get("signature", [])
+        self.end: int = payload.get("end", 0)
+        self.tail: str = payload.get("tail", "")
+
+    def add(self, record: Any, turns: List[Tuple[str, str]]) -> None:
+        """Count one record and the (main speaker, other speaker) turns extracted from it."""
+        self.records += 1
+        if isinstance(record, dict):
+            for key, value in record.items():
+                self.fields.setdefault(key, Counter())[value_kind(value)] += 1
+            sessions = sum(1 for k, v in record.items() if "dialogue" in k.lower() and isinstance(v, list))
+            self.counters["sessions_per_record"][str(sessions)] += 1
+        utterances = 0
+        for pair in turns:
+            for speaker, text in zip(("main speaker", "other speakers"), pair):
+                if not text:
+                    continue
+                words = len(text.split())
+                utterances += 1
+                self.counters["words_per_utterance"][str(words)] += 1
+                self.counters["speaker_turns"][speaker] += 1
+                self.counters["speaker_words"][speaker] += words
+        self.counters["turns_per_record"][str(utterances)] += 1
+
+    def mark_end(self, source: Optional[Path], end: int, signature: List[Any]) -> None:
+        """Record what has been counted; a JSONL file ending in a newline there may later be extended."""
+        self.end = end
+        self.signature = signature
+        self.tail = ""
+        if source is not None and source.name.endswith(".jsonl") and end > 0:
+            with source.open("rb") as f:
+                f.seek(end - 1)
+                if f.read(1) == b"\n":
+                    self.tail = tail_digest(source, end)
+
+    def null_rates(self) -> List[Tuple[str, float, Counter]]:
+        """(field, share of records where it is missing, null or empty, kinds incl. ``missing``) per field."""
+        rows = []
+        for field, kinds in self.fields.items():
+            kinds = Counter(kinds)
+            kinds["missing"] = self.records - sum(kinds.values())
+            absent = kinds["missing"] + kinds["null"] + kinds["empty"]
+            rows.append((field, absent / max(self.records, 1), +kinds))
+        return rows
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "version": STATS_VERSION,
+            "signature": self.signature,
+            "end": self.end,
+            "tail": self.tail,
+            "records": self.records,
+            "fields": {k: dict(v) for k, v in self.fields.items()},
+            **{name: dict(counter) for name, counter in self.counters.items()},
+        }
+
+    def save(self, path: Path) -> None:
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(self.to_payload(), ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(path)
+
+
+def load_source_stats(path: Path, signature: List[Any], source: Optional[Path] = None) -> Tuple[Optional[SourceStats], Optional[int]]:
+    """Cached stats at ``path`` and where counting must resume.
+
+    Returns (stats, None) when they match ``signature``; (stats, position) when
+    ``source`` is a JSONL file that only grew since, so counting resumes at
+    ``position``; (None, None) otherwise.
+    """
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None, None
+    if payload.get("version") != STATS_VERSION:
+        return None, None
+    stats = SourceStats(payload)
+    if stats.signature == signature:
+        return stats, None
+    if source is not None and source.name.endswith(".jsonl") and stats.tail:
+        try:
+            grown = source.stat().st_size > stats.end and tail_digest(source, stats.end) == stats.tail
+        except OSError:
+            grown = False
+        if grown:
+            return stats, stats.end
+    return None, None
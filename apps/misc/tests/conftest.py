@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import csv
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+# The app's modules import one another by bare name, as when app.py runs from its folder
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+RECORDS: List[Dict[str, Any]] = [
+    {
+        "id": "misc-0",
+        "first_session_dialogue": [["Alice", "Bob"], ["I planted tomatoes in the garden.", "Did they grow?"]],
+        "relationship": "neighbours",
+    },
+    {
+        "id": "misc-1",
+        "first_session_dialogue": [["Carol", "Dan"], ["The garden party is on Sunday.", "I will bring a cake."]],
+        "relationship": "friends",
+    },
+    {
+        "id": "misc-2",
+        "first_session_dialogue": [["Erin", "Frank"], ["My cat sleeps all day.", "Mine chases birds in the garden."]],
+        "relationship": "coworkers",
+    },
+    {
+        "id": "misc-3",
+        "first_session_dialogue": [["Grace", "Heidi"], ["Café au lait, s'il vous plaît.", "Naïve question: is it strong?"]],
+        "relationship": "strangers",
+    },
+]
+
+
+@pytest.fixture
+def records() -> List[Dict[str, Any]]:
+    return RECORDS
+
+
+@pytest.fixture
+def jsonl_file(tmp_path: Path) -> Path:
+    """The records as JSONL, with a blank line between the second and third."""
+    path = tmp_path / "train.jsonl"
+    lines = [json.dumps(r, ensure_ascii=False) for r in RECORDS]
+    lines.insert(2, "")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def json_file(tmp_path: Path) -> Path:
+    """The records as an indented JSON array with a UTF-8 BOM."""
+    path = tmp_path / "train.json"
+    path.write_bytes(b"\xef\xbb\xbf" + json.dumps(RECORDS, indent=2, ensure_ascii=False).encode("utf-8"))
+    return path
+
+
+@pytest.fixture
+def csv_file(tmp_path: Path) -> Path:
+    """Flat rows whose quoted ``text`` fields span several lines."""
+    path = tmp_path / "train.csv"
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "text"])
+        writer.writerow(["misc-0", "I planted tomatoes\nin the garden."])
+        writer.writerow(["misc-1", "plain row"])
+        writer.writerow(["misc-2", "first line\n\nafter a blank line, \"quoted\""])
+        writer.writerow(["misc-3", "last row"])
+    return path
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import pytest
+
+import fulltext
+from fulltext import FullTextBuilder, FullTextIndex, iter_indexable, open_fulltext, tokenize
+
+DOCUMENTS = [
+    "I planted tomatoes in the garden. Did they grow?",
+    "The garden party is on Sunday. I will bring a cake.",
+    "My cat sleeps all day. Mine chases birds in the garden.",
+    "Café au lait, s'il vous plaît. Naïve question: is it strong?",
+    "Garden garden garden: the party was in the rose garden.",
+]
+SIGNATURE = ["train.jsonl", 1, 2]
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    builder = FullTextBuilder()
+    for doc, text in enumerate(DOCUMENTS):
+        builder.add(text, 100 * doc)
+    path = tmp_path / "train.fulltext"
+    builder.write(path, 100 * len(DOCUMENTS), SIGNATURE)
+    return path
+
+
+@pytest.fixture
+def index(index_path):
+    return FullTextIndex(index_path)
+
+
+def docs(index, query, k=10):
+    return sorted(doc for doc, _ in index.search(query, k))
+
+
+def test_tokenize_lowercases_words():
+    assert tokenize("Naïve question: it's GREAT") == ["naïve", "question", "it", "s", "great"]
+
+
+def test_index_layout(index):
+    assert len(index) == len(DOCUMENTS)
+    assert list(index.doc_starts) == [0, 100, 200, 300, 400, 500]
+    assert index.vocabulary == sorted(set(index.vocabulary))
+
+
+def test_words_must_all_occur(index):
+    assert docs(index, "garden") == [0, 1, 2, 4]
+    assert docs(index, "garden party") == [1, 4]
+    assert docs(index, "café naïve") == [3]
+    assert docs(index, "garden zeppelin") == []
+
+
+def test_phrases_need_adjacent_words(index):
+    assert docs(index, '"garden party"') == [1]
+    assert docs(index, '"the garden"') == [0, 1, 2]
+    assert docs(index, '"party garden"') == []
+
+
+def test_or_separates_alternatives(index):
+    assert docs(index, "cat OR cake") == [1, 2]
+    assert docs(index, '"rose garden" OR tomatoes') == [0, 4]
+    # Lower-case "or" is an ordinary word
+    assert docs(index, "cat or cake") == []
+
+
+def test_exclusions(index):
+    assert docs(index, "garden -party") == [0, 2]
+    assert docs(index, "garden NOT cat") == [0, 1, 4]
+    assert docs(index, 'garden -"garden party"') == [0, 2, 4]
+    assert docs(index, "garden AND -tomatoes -cat") == [1, 4]
+
+
+@pytest.mark.parametrize("query", ["NOT garden", "-garden", '-"garden party"', "", "   ", "-cat OR NOT cake"])
+def test_queries_without_positive_terms_are_rejected(index, query):
+    with pytest.raises(ValueError, match="at least one word"):
+        index.search(query, 10)
+
+
+def test_bm25_ranks_by_term_frequency_and_length(index):
+    ranked = index.search("garden", 10)
+    assert ranked[0][0] == 4
+    assert [score for _, score in ranked] == sorted((score for _, score in ranked), reverse=True)
+    assert all(score > 0 for _, score in ranked)
+    # A rare term outweighs a common one
+    assert index.search("garden OR tomatoes", 1)[0][0] == 0
+    assert len(index.search("garden", 2)) == 2
+
+
+def test_docs_any_of_groups(index):
+    assert index.docs_any_of([{"cat", "cake"}, {"garden"}]) == [1, 2]
+    assert index.docs_any_of([{"zeppelin"}]) == []
+
+
+def test_open_fulltext_checks_the_signature(index_path, monkeypatch):
+    monkeypatch.setattr(fulltext, "_open_indexes", {})
+    opened = open_fulltext(index_path, SIGNATURE)
+    assert opened is not None
+    assert open_fulltext(index_path, SIGNATURE) is opened
+    assert open_fulltext(index_path, SIGNATURE[:2] + [3]) is None
+    assert open_fulltext(index_path.with_name("missing.fulltext"), SIGNATURE) is None
+    other = index_path.with_name("other.fulltext")
+    other.write_bytes(b"not an index")
+    assert open_fulltext(other, SIGNATURE) is None
+
+
+def test_iter_indexable_tracks_record_starts():
+    items = list(iter_indexable(iter([("a", 10, 0.5), ("b", 25, 1.0)])))
+    assert items == [("a", 0, 10, 0.5), ("b", 10, 25, 1.0)]
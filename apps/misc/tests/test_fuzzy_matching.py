@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from fulltext import FullTextBuilder, FullTextIndex
+from matching import compile_regex, trigram_index_for, within_edits
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+
+@pytest.fixture
+def index(tmp_path, records):
+    builder = FullTextBuilder()
+    for row, record in enumerate(records):
+        builder.add(" ".join(record["first_session_dialogue"][1]), row)
+    path = tmp_path / "train.fulltext"
+    builder.write(path, len(records), ["train.jsonl", 1, 2])
+    return FullTextIndex(path)
+
+
+def test_typos_expand_to_indexed_spellings(index):
+    trigrams = trigram_index_for(index, index.vocabulary)
+    assert trigram_index_for(index, index.vocabulary) is trigrams
+    assert trigrams.similar("gardne", 1) == {"garden"}
+    assert trigrams.similar("tomatos", 1) == {"tomatoes"}
+    assert trigrams.similar("naive", 1) == {"naïve"}
+    groups = [trigrams.similar(word, 1) for word in ("gardn", "cta")]
+    assert index.docs_any_of(groups) == [2]
+
+
+def test_within_edits_counts_adjacent_transpositions_once():
+    assert within_edits("garden", "gadren", 1)
+    assert not within_edits("garden", "gnrdea", 1)
+    assert within_edits("café", "cafe", 1)
+
+
+def test_regex_errors_are_value_errors():
+    assert compile_regex(r"s'il\s+vous").search("Café au lait, S'il vous plaît.")
+    with pytest.raises(ValueError, match="invalid regex"):
+        compile_regex("[garden")
+
+
+def test_matching_is_the_generated_copy():
+    spec = importlib.util.spec_from_file_location("sync_shared_modules", REPO_ROOT / "scripts" / "sync_shared_modules.py")
+    sync = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(sync)
+    assert REPO_ROOT / "apps" / "misc" / "matching.py" not in sync.stale_copies(REPO_ROOT / "apps")
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import pytest
+
+import id_index
+from id_index import IdIndex, IdIndexBuilder, id_hash, open_id_index, record_id_of
+
+SIGNATURE = ["train.jsonl", 1, 2]
+
+
+def build(tmp_path, ids, signature=SIGNATURE):
+    builder = IdIndexBuilder()
+    for row, record_id in enumerate(ids):
+        builder.add(record_id, row)
+    path = tmp_path / "train.ids"
+    builder.write(path, len(ids), signature)
+    return path
+
+
+def test_record_id_of():
+    assert record_id_of({"id": "misc-1"}) == "misc-1"
+    assert record_id_of({"id": 7}) == "7"
+    assert record_id_of({"name": "no id"}) is None
+    assert record_id_of(["not", "a", "dict"]) is None
+
+
+def test_id_hash_is_stable_and_never_empty():
+    assert id_hash("misc-1") == id_hash("misc-1")
+    assert id_hash("misc-1") != id_hash("misc-2")
+    assert id_hash("") != 0
+
+
+def test_lookup_by_id(tmp_path, records):
+    ids = [record_id_of(r) for r in records]
+    index = IdIndex(build(tmp_path, ids))
+    assert len(index) == index.count == len(records)
+    for row, record_id in enumerate(ids):
+        assert list(index.candidates(record_id)) == [row]
+    assert list(index.candidates("misc-99")) == []
+
+
+def test_repeated_ids_keep_source_order_and_rows_without_ids_count(tmp_path):
+    ids = [f"id-{i % 7}" if i % 5 else None for i in range(100)]
+    index = IdIndex(build(tmp_path, ids))
+    assert index.count == 100
+    assert len(index) == sum(1 for i in ids if i is not None)
+    for record_id in {i for i in ids if i is not None}:
+        assert list(index.candidates(record_id)) == [row for row, i in enumerate(ids) if i == record_id]
+
+
+def test_empty_index(tmp_path):
+    index = IdIndex(build(tmp_path, [None, None]))
+    assert len(index) == 0 and index.count == 2
+    assert list(index.candidates("misc-0")) == []
+
+
+def test_open_id_index_checks_the_signature(tmp_path, monkeypatch):
+    monkeypatch.setattr(id_index, "_open_indexes", {})
+    path = build(tmp_path, ["a", "b"])
+    opened = open_id_index(path, SIGNATURE)
+    assert opened is not None
+    assert open_id_index(path, SIGNATURE) is opened
+    assert open_id_index(path, SIGNATURE[:2] + [3]) is None
+    # A rebuild for the new signature replaces the shared index
+    build(tmp_path, ["b", "a"], SIGNATURE[:2] + [3])
+    assert list(open_id_index(path, SIGNATURE[:2] + [3]).candidates("a")) == [1]
+    assert open_id_index(tmp_path / "missing.ids", SIGNATURE) is None
+
+
+def test_files_of_another_kind_are_rejected(tmp_path):
+    path = tmp_path / "train.ids"
+    path.write_bytes(b"MISCFTIX" + bytes(16))
+    with pytest.raises(ValueError):
+        IdIndex(path)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+import line_index
+from line_index import (
+    build_json_record_index,
+    build_line_index,
+    open_line_index,
+    open_record_index,
+    read_sidecar,
+    sidecar_path,
+    source_signature,
+)
+
+
+def test_line_index_skips_blank_lines(jsonl_file, records):
+    index = build_line_index(jsonl_file)
+    assert len(index) == len(records)
+    assert [index[i] for i in range(len(index))] == records
+    assert index[-1] == records[-1]
+    with pytest.raises(IndexError):
+        index[len(records)]
+
+
+def test_sidecar_is_written_and_reused(jsonl_file, monkeypatch):
+    build_line_index(jsonl_file)
+    path = sidecar_path(jsonl_file)
+    assert path.name == "train.jsonl.lines.idx"
+    assert read_sidecar(path, source_signature(jsonl_file)) is not None
+
+    def no_scan(source):
+        raise AssertionError("the sidecar should have been reused")
+
+    monkeypatch.setattr(line_index, "scan_line_offsets", no_scan)
+    assert build_line_index(jsonl_file)[1]["id"] == "misc-1"
+
+
+def test_stale_or_foreign_sidecars_are_ignored(jsonl_file):
+    build_line_index(jsonl_file)
+    path = sidecar_path(jsonl_file)
+    size = jsonl_file.stat().st_size
+    assert read_sidecar(path, (0, size)) is None
+    path.write_bytes(b"not an index")
+    assert read_sidecar(path, source_signature(jsonl_file)) is None
+    assert read_sidecar(jsonl_file.with_name("missing.idx"), (0, 0)) is None
+
+
+def test_open_line_index_rebuilds_when_the_file_changes(jsonl_file, records):
+    index = open_line_index(str(jsonl_file))
+    assert open_line_index(str(jsonl_file)) is index
+    with jsonl_file.open("a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": "misc-4"}) + "\n")
+    stat = jsonl_file.stat()
+    os.utime(jsonl_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    rebuilt = open_line_index(str(jsonl_file))
+    assert rebuilt is not index
+    assert len(rebuilt) == len(records) + 1
+    assert rebuilt[-1] == {"id": "misc-4"}
+
+
+def test_json_record_index_reads_single_items(json_file, records):
+    index = build_json_record_index(json_file)
+    assert sidecar_path(json_file, line_index.RECORDS_SIDECAR_SUFFIX).exists()
+    assert len(index) == len(records)
+    assert index[3] == records[3]
+    assert index[0] == records[0]
+    assert isinstance(open_record_index(str(json_file)), line_index.JsonRecordIndex)
+
+
+def test_read_only_directory_keeps_offsets_in_memory(jsonl_file, records, monkeypatch):
+    def refuse(path, signature, offsets):
+        raise OSError("read-only file system")
+
+    monkeypatch.setattr(line_index, "write_sidecar", refuse)
+    index = build_line_index(jsonl_file)
+    assert not sidecar_path(jsonl_file).exists()
+    assert index[2] == records[2]
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+import os
+
+import projection
+from projection import ProjectionCache, compile_projection, text_leaves
+
+
+def test_text_leaves_skip_keys_and_render_scalars():
+    out = []
+    text_leaves({"name": "Alice", "age": 31, "tags": ["a", None, True], "score": 1.5}, out)
+    assert out == ["Alice", "31", "a", "true", "1.5"]
+
+
+def test_projection_follows_the_sample_shapes(records):
+    project = compile_projection(records[0], {})
+    text = project(records[1])
+    assert text.splitlines() == ["misc-1", "carol", "dan", "the garden party is on sunday.", "i will bring a cake.", "friends"]
+    assert '"' not in text and "first_session_dialogue" not in text
+    # Keys the sample lacks, and other shapes, fall back to the generic walk
+    assert project({"id": 7, "extra": {"note": "Hello"}}) == "7\nhello"
+    assert project(["Plain", 2]) == "plain\n2"
+
+
+def test_message_containers_project_their_values():
+    sample = {"messages": [{"role": "user", "content": "Hi"}]}
+    project = compile_projection(sample, {"container_key": "messages"})
+    assert project({"messages": [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello there"}]}) == (
+        "user\nhi\nassistant\nhello there"
+    )
+
+
+def test_field_projection(records):
+    project = compile_projection(records[0], {}, field="relationship")
+    assert project(records[2]) == "coworkers"
+    # Records without the field are projected whole
+    assert project({"id": "x"}) == "x"
+
+
+def search(cache, src, needle, start=0, project=None):
+    project = project or compile_projection({}, {})
+    return list(cache.iter_matches(src, lambda text: needle in text, "", start, project))
+
+
+def test_matches_with_resume_positions_and_ticks(jsonl_file, monkeypatch):
+    monkeypatch.setattr(projection, "PROJECTION_CHUNK_ROWS", 3)
+    cache = ProjectionCache(1 << 20)
+    hits = search(cache, str(jsonl_file), "garden")
+    matches = [(record["id"], end) for record, end, _, _ in hits if record is not None]
+    assert [record_id for record_id, _ in matches] == ["misc-0", "misc-1", "misc-2"]
+    # A progress tick follows the first chunk; the second one ends the file without a match
+    assert [hit[0] is None for hit in hits] == [False, False, False, True]
+    assert hits[-1][1] == matches[-1][1] and hits[-1][3] == 3
+    # Resuming after a match continues from the next record
+    resumed = search(cache, str(jsonl_file), "garden", start=matches[0][1])
+    assert [record["id"] for record, _, _, _ in resumed if record is not None] == ["misc-1", "misc-2"]
+
+
+def test_repeated_queries_use_cached_text(jsonl_file, monkeypatch):
+    monkeypatch.setattr(projection, "PROJECTION_CHUNK_ROWS", 2)
+    cache = ProjectionCache(1 << 20)
+    first = search(cache, str(jsonl_file), "cat")
+    assert cache.stats()["misses"] == 2 and cache.stats()["hits"] == 0
+    calls = []
+
+    def counting_project(record):
+        calls.append(record)
+        return ""
+
+    again = search(cache, str(jsonl_file), "cat", project=counting_project)
+    assert calls == []
+    assert again == first
+    assert cache.stats()["hits"] == 2
+
+
+def test_changed_files_are_projected_again(jsonl_file):
+    cache = ProjectionCache(1 << 20)
+    assert search(cache, str(jsonl_file), "zeppelin") == []
+    with jsonl_file.open("a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": "misc-4", "note": "A zeppelin flew over."}) + "\n")
+    stat = jsonl_file.stat()
+    os.utime(jsonl_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert [record["id"] for record, _, _, _ in search(cache, str(jsonl_file), "zeppelin")] == ["misc-4"]
+    assert cache.stats()["misses"] == 2
+
+
+def test_budget_evicts_least_recently_used_chunks(jsonl_file, monkeypatch):
+    monkeypatch.setattr(projection, "PROJECTION_CHUNK_ROWS", 1)
+    cache = ProjectionCache(1)
+    search(cache, str(jsonl_file), "garden")
+    stats = cache.stats()
+    # The newest chunk is always kept, even over budget
+    assert stats["chunks"] == 1
+    assert stats["evictions"] == stats["misses"] - 1
+    cache.clear()
+    assert cache.stats()["chunks"] == 0
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import pytest
+
+import engine
+
+
+class FakeSplit:
+    """The parts of a ``datasets.Dataset`` the search uses; Arrow access must not be needed."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        return self.rows[i]
+
+    def skip(self, n):
+        return iter(self.rows[n:])
+
+    def with_format(self, kind):
+        raise AssertionError("regex searches must not run in Arrow")
+
+
+@pytest.fixture
+def hf_split(records, monkeypatch):
+    split = FakeSplit(records)
+    monkeypatch.setattr(engine, "load_dataset", object())
+    monkeypatch.setattr(engine, "load_hf_dataset", lambda *args, **kwargs: split)
+    monkeypatch.setattr(engine, "_hf_first_records", {})
+    return split
+
+
+def matched_ids(src, pattern, field=""):
+    query = engine.new_query(src, kw=pattern, field=field, mode="Regex")
+    return [row["id"] for row, _, _, _ in engine.search_rows(query, 0) if row is not None]
+
+
+@pytest.mark.parametrize("pattern, expected", [
+    # Lookarounds and backreferences are Python-only syntax
+    (r"garden(?= party)", ["misc-1"]),
+    (r"(?<!the )garden", []),
+    (r"wi(\w)\1", ["misc-1"]),
+    # Multiline: ^ anchors each projected line, and case is ignored
+    (r"^DID THEY", ["misc-0"]),
+    (r"garden\.$", ["misc-0", "misc-2"]),
+])
+def test_hf_and_local_sources_agree(hf_split, jsonl_file, pattern, expected):
+    assert matched_ids("jihyoung/MiSC", pattern) == expected
+    assert matched_ids(str(jsonl_file), pattern) == expected
+
+
+def test_hf_regex_reports_progress(hf_split):
+    query = engine.new_query("jihyoung/MiSC", kw="café", mode="Regex")
+    hits = list(engine.search_rows(query, 1))
+    assert [row is not None for row, _, _, _ in hits] == [False, False, True]
+    assert [(position, fraction) for _, position, fraction, _ in hits][-1] == (4, 1.0)
+
+
+def test_invalid_patterns_fail_before_the_scan():
+    with pytest.raises(ValueError, match="invalid regex"):
+        engine.new_query("jihyoung/MiSC", kw="(?<=a+)b", mode="Regex")
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import pytest
+
+import scan
+from scan import iter_csv, iter_file_records, iter_json, iter_jsonl, read_records
+
+
+def collect(items):
+    return [(record["id"], end) for record, end, _ in items]
+
+
+def test_jsonl_positions_resume_after_each_record(jsonl_file, records):
+    items = list(iter_jsonl(jsonl_file))
+    assert [record for record, _, _ in items] == records
+    assert items[-1][1] == jsonl_file.stat().st_size
+    assert items[-1][2] == 1.0
+    for k, (_, end, _) in enumerate(items):
+        assert [r for r, _, _ in iter_jsonl(jsonl_file, end)] == records[k + 1:]
+
+
+@pytest.mark.parametrize("read_bytes", [7, 64, scan.JSON_READ_BYTES])
+def test_json_array_resumes_from_any_yielded_position(json_file, records, monkeypatch, read_bytes):
+    # Small reads split items (and multi-byte characters) across buffers
+    monkeypatch.setattr(scan, "JSON_READ_BYTES", read_bytes)
+    items = list(iter_json(json_file))
+    assert [record for record, _, _ in items] == records
+    for k, (_, end, _) in enumerate(items):
+        assert [r for r, _, _ in iter_json(json_file, end)] == records[k + 1:]
+
+
+def test_json_single_value_is_one_record(tmp_path):
+    path = tmp_path / "one.json"
+    path.write_text('{"id": "only"}', encoding="utf-8")
+    assert collect(iter_json(path)) == [("only", path.stat().st_size)]
+
+
+def test_csv_rows_keep_multiline_quoted_fields(csv_file, monkeypatch):
+    monkeypatch.setattr(scan, "CSV_CHUNK_ROWS", 2)
+    items = list(iter_csv(csv_file))
+    assert collect(items) == [("misc-0", 1), ("misc-1", 2), ("misc-2", 3), ("misc-3", 4)]
+    assert items[0][0]["text"] == "I planted tomatoes\nin the garden."
+    assert items[2][0]["text"] == 'first line\n\nafter a blank line, "quoted"'
+
+
+@pytest.mark.parametrize("start", [1, 2, 3, 4])
+def test_csv_resume_counts_rows_not_lines(csv_file, monkeypatch, start):
+    monkeypatch.setattr(scan, "CSV_CHUNK_ROWS", 2)
+    expected = [("misc-0", 1), ("misc-1", 2), ("misc-2", 3), ("misc-3", 4)][start:]
+    assert collect(iter_csv(csv_file, start)) == expected
+
+
+def test_read_records_by_position(jsonl_file, csv_file, records):
+    ends = [end for _, end, _ in iter_file_records(str(jsonl_file))]
+    starts = [0] + ends[:-1]
+    found = read_records(str(jsonl_file), [starts[3], starts[1]])
+    assert found == {starts[3]: records[3], starts[1]: records[1]}
+    rows = read_records(str(csv_file), [2, 0])
+    assert {start: row["id"] for start, row in rows.items()} == {0: "misc-0", 2: "misc-2"}
+    assert read_records(str(csv_file), []) == {}
@@ -1,97 +1,267 @@
 import json
+import os
 import random
+import threading
+import time
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
 import gradio as gr
 
+from binary_store import CorpusStore
+from corpus_index import SPLITS, SearchIndex
+from corpus_stats import CorpusStats
+from engine import (
+	DATA_ROOT,
+	INDEX_PATHS,
+	PAGE_SIZE,
+	SCHEMA_PATH,
+	ensure_corpus_indexes,
+	fetch_dialogues,
+	fetch_result_page,
+	format_dialogue_markdown,
+	get_corpus_stats,
+	get_corpus_store,
+	get_dialogue_locator,
+	get_near_duplicate_index,
+	get_search_index,
+	list_dialogue_ids_from_shard,
+	list_shards,
+	load_dialogues_from_shard,
+	load_services_from_schema,
+	new_result_cursor,
+	preload_shard_cache,
+	stream_shard_result_page,
+)
+from matching import MATCH_MODES, compile_regex
+from near_dups import NearDuplicateIndex
+from sampling import seeded_rng, stratified_sample
+from serving import MAX_THREADS, queue_options, search_event_options
+
+STATS_SCOPES: List[str] = ["All splits"] + list(SPLITS)
+# Histogram rows before the tail is folded into a final "≥" row
+STATS_HISTOGRAM_BINS: int = 20
+STATS_TOP_SLOTS: int = 30
+SEARCH_SCOPES: List[str] = ["Selected shard", "All splits"]
+# Minimum seconds between progress updates while a shard scan streams results
+STREAM_INTERVAL_S: float = 0.1
+# Near-duplicate clusters listed per request, and member ids shown per cluster
+NEAR_DUP_MAX_CLUSTERS: int = 50
+NEAR_DUP_MEMBERS_SHOWN: int = 10
+# Sampling: "None" draws N overall, the others draw N per split / per service
+SAMPLE_STRATA: List[str] = ["None", "Split", "Service"]
+SAMPLE_MAX_SIZE: int = 500
+# Preload indexes and shards in the background at launch (set to 0 to disable)
+WARMUP_ENABLED: bool = os.environ.get("MULTIWOZ_WARMUP", "1") != "0"
+
+
+class Warmup:
+	"""Background warm-up of the corpus indexes, the corpus store and the shard cache.
+
+	Progress is printed as ``[warmup]`` log lines (the final one reads
+	``[warmup] ready``) and exposed through ``status_markdown`` for the UI.
+	"""
 
-def get_data_root() -> Path:
-	current_file_path: Path = Path(__file__).resolve()
-	workspace_root: Path = current_file_path.parents[2]
-	return workspace_root / "multiwoz" / "data" / "MultiWOZ_2.2"
-
-
-DATA_ROOT: Path = get_data_root()
-SCHEMA_PATH: Path = DATA_ROOT / "schema.json"
-
-
-def read_json(path: Path) -> dict:
-	with path.open("r", encoding="utf-8") as f:
-		return json.load(f)
-
-
-def load_services_from_schema(schema_path: Path) -> List[str]:
-	schema: List[Dict] = read_json(schema_path)
-	return [service["service_name"] for service in schema]
-
+	def __init__(self) -> None:
+		self.state: str = "idle"  # idle -> running -> ready | failed
+		self.current: Optional[str] = None
+		self.completed: List[Tuple[str, float]] = []
+		self.error: Optional[str] = None
+		self.started_at: Optional[float] = None
+		self.finished_at: Optional[float] = None
+		self._lock = threading.Lock()
+		self._thread: Optional[threading.Thread] = None
+
+	@property
+	def ready(self) -> bool:
+		return self.state == "ready"
+
+	def start(self) -> None:
+		with self._lock:
+			if self._thread is not None:
+				return
+			self.state = "running"
+			self.started_at = time.perf_counter()
+			self._thread = threading.Thread(target=self._run, name="multiwoz-warmup", daemon=True)
+			self._thread.start()
+
+	@staticmethod
+	def stages() -> List[Tuple[str, Callable[[], object]]]:
+		return [
+			("corpus indexes", lambda: ensure_corpus_indexes(list(INDEX_PATHS))),
+			("corpus statistics", get_corpus_stats),
+			("corpus store", get_corpus_store),
+			("shard cache", preload_shard_cache),
+		]
 
-def list_shards(split: str) -> List[Path]:
-	split_dir: Path = DATA_ROOT / split
-	shards: List[Path] = sorted(split_dir.glob("dialogues_*.json"))
-	return shards
+	def _run(self) -> None:
+		for name, stage in self.stages():
+			self.current = name
+			print(f"[warmup] {name}: loading", flush=True)
+			stage_start: float = time.perf_counter()
+			try:
+				stage()
+			except Exception as e:
+				self.error = f"{name}: {e}"
+				self.state = "failed"
+				print(f"[warmup] failed at {self.error}", flush=True)
+				return
+			elapsed: float = time.perf_counter() - stage_start
+			self.completed.append((name, elapsed))
+			print(f"[warmup] {name}: done in {elapsed:.2f}s", flush=True)
+		self.current = None
+		self.finished_at = time.perf_counter()
+		self.state = "ready"
+		print(f"[warmup] ready in {self.finished_at - self.started_at:.2f}s", flush=True)
+
+	def snapshot(self) -> Dict[str, object]:
+		return {
+			"state": self.state,
+			"ready": self.ready,
+			"current": self.current,
+			"completed": [name for name, _ in self.completed],
+			"error": self.error,
+			# A failed warm-up leaves the explorer serving, loading data on first use
+			"degraded": self.state == "failed",
+		}
+
+	def status_markdown(self) -> str:
+		if self.state == "idle":
+			return "⏸️ Warm-up disabled; data loads on first use."
+		if self.state == "failed":
+			return f"⚠️ Warm-up failed ({self.error}); data loads on first use."
+		if self.state == "ready":
+			return f"✅ Ready (warmed up in {self.finished_at - self.started_at:.1f}s)."
+		done: int = len(self.completed)
+		return f"⏳ Warming up {done + 1}/{len(self.stages())}: {self.current or '...'}. Searches work meanwhile but may be slow."
+
+
+WARMUP: Warmup = Warmup()
+
+
+def readiness_response():
+	"""GET /readiness: 503 while warming up, else 200; a failed warm-up reports ``degraded`` and its error."""
+	from fastapi.responses import JSONResponse
+
+	return JSONResponse(WARMUP.snapshot(), status_code=503 if WARMUP.state == "running" else 200)
+
+
+def ui_warmup_status() -> Tuple[str, "gr.Timer"]:
+	"""Warm-up status line; the polling timer is stopped once the warm-up is over."""
+	return WARMUP.status_markdown(), gr.Timer(active=WARMUP.state == "running")
 
 
-def load_dialogues_from_shard(shard_path: Path) -> List[Dict]:
-	data: List[Dict] = read_json(shard_path)
-	return data
+def ui_update_shards(split: str) -> Tuple[List[str], str]:
+	shards: List[Path] = list_shards(split)
+	choices: List[str] = [p.name for p in shards]
+	default_choice: str = choices[0] if choices else ""
+	return choices, default_choice
 
 
-def list_dialogue_ids_from_shard(shard_path: Path) -> List[str]:
-	data: List[Dict] = load_dialogues_from_shard(shard_path)
-	return [d.get("dialogue_id", "<unknown>") for d in data]
+def finish_result_page(
+	cursor: Dict,
+	header: Optional[str],
+	found: List[Dict],
+	resume: Optional[int],
+) -> Tuple[str, Optional[Dict], Dict, Dict]:
+	"""Render a computed page; returns (markdown, cursor, prev button, next button)."""
+	no_pages: Tuple[Dict, Dict] = (gr.update(interactive=False), gr.update(interactive=False))
+	page: int = cursor["page"]
+	if not found and page == 0:
+		empty: str = {
+			"shard": "No matching dialogues. Try a different shard, domain, or keyword.",
+			"all": "No matching dialogues in any split. Try a different domain or keyword.",
+			"state": "No dialogues match this state query.",
+		}[cursor["kind"]]
+		return (empty, None) + no_pages
+	page_starts: List[int] = cursor["page_starts"][: page + 1] + ([resume] if resume is not None else [])
+	cursor = dict(cursor, page_starts=page_starts)
+	footer: str = f"Page {page + 1}" + (" · more results →" if resume is not None else " · end of results")
+	chunks: List[str] = ([header] if header else []) + [format_dialogue_markdown(d) for d in found] + [footer]
+	return (
+		"\n\n---\n\n".join(chunks),
+		cursor,
+		gr.update(interactive=page > 0),
+		gr.update(interactive=resume is not None),
+	)
+
+
+def render_result_page(cursor: Dict) -> Tuple[str, Optional[Dict], Dict, Dict]:
+	"""Compute and render a cursor's current page in one go."""
+	no_pages: Tuple[Dict, Dict] = (gr.update(interactive=False), gr.update(interactive=False))
+	try:
+		header, found, resume = fetch_result_page(cursor)
+	except ValueError as e:
+		return (f"Invalid query: {e}", None) + no_pages
+	except Exception as e:
+		return (f"Search failed: {e}", None) + no_pages
+	return finish_result_page(cursor, header, found, resume)
 
 
-def format_dialogue_markdown(dialogue: Dict) -> str:
-	dialogue_id: str = dialogue.get("dialogue_id", "<unknown>")
-	services: List[str] = dialogue.get("services", [])
-	turns: List[Dict] = dialogue.get("turns", [])
+def stream_result_page(cursor: Dict) -> Iterator[Tuple[str, Optional[Dict], Dict, Dict]]:
+	"""Like ``render_result_page`` but yields partial pages with scan progress.
 
-	lines: List[str] = []
-	lines.append(f"### {dialogue_id}")
-	if services:
-		lines.append(f"Services: {', '.join(services)}")
-	lines.append("")
-	for turn in turns:
-		speaker: str = turn.get("speaker", "?")
-		utterance: str = turn.get("utterance", "")
-		lines.append(f"**{speaker}**: {utterance}")
-	return "\n".join(lines)
-
-
-def filter_dialogues(
-	dialogues: List[Dict],
-	service_filter: Optional[str],
-	keyword: Optional[str],
-	limit: int,
-) -> Tuple[List[Dict], List[str]]:
-	service_filter_lower: Optional[str] = service_filter.lower() if service_filter else None
-	keyword_lower: Optional[str] = keyword.lower() if keyword else None
-
-	filtered: List[Dict] = []
-	for dlg in dialogues:
-		services: List[str] = [s.lower() for s in dlg.get("services", [])]
-		if service_filter_lower and service_filter_lower not in services:
-			continue
-		if keyword_lower:
-			text_joined: str = "\n".join(
-				turn.get("utterance", "") for turn in dlg.get("turns", [])
-			).lower()
-			if keyword_lower not in text_joined:
+	Index-backed cursors answer at once; shard scans yield each match as it is
+	found plus a progress line at most every ``STREAM_INTERVAL_S`` seconds.
+	Cached pages render at once, and a request identical to one in flight
+	waits for its result instead of scanning again.
+	"""
+	if cursor["kind"] != "shard":
+		yield render_result_page(cursor)
+		return
+	no_pages: Tuple[Dict, Dict] = (gr.update(interactive=False), gr.update(interactive=False))
+	start: int = cursor["page_starts"][cursor["page"]]
+	params: Dict = cursor["params"]
+	yield (f"⏳ Loading {params['split']}/{params['shard']}…", None) + no_pages
+	started: float = time.perf_counter()
+	last_emit: float = 0.0
+	last_found: int = 0
+	task = stream_shard_result_page(cursor)
+	try:
+		while True:
+			try:
+				step: Union[str, Tuple[List[Dict], int, int]] = next(task)
+			except StopIteration as done:
+				header, found, resume = done.value
+				break
+			if isinstance(step, str):
+				yield (step, None) + no_pages
 				continue
-		filtered.append(dlg)
-		if len(filtered) >= limit:
-			break
+			found, position, total = step
+			now: float = time.perf_counter()
+			if len(found) == last_found and now - last_emit < STREAM_INTERVAL_S:
+				continue
+			last_emit, last_found = now, len(found)
+			rate: float = (position - start) / max(now - started, 1e-6)
+			progress: str = (
+				f"⏳ Scanned {position:,}/{total:,} dialogues ({100 * position // max(total, 1)}%)"
+				f" · {rate:,.0f} dialogues/s · {len(found)} found"
+			)
+			chunks: List[str] = [format_dialogue_markdown(d) for d in found] + [progress]
+			yield ("\n\n---\n\n".join(chunks), None) + no_pages
+	except Exception as e:
+		yield (f"Search failed: {e}", None) + no_pages
+		return
+	finally:
+		# A superseded request stops here; closing the scan withdraws work not yet started
+		task.close()
+	yield finish_result_page(cursor, header, found, resume)
 
-	markdown_chunks: List[str] = [format_dialogue_markdown(d) for d in filtered]
-	return filtered, markdown_chunks
 
+def ui_change_page(cursor: Optional[Dict], step: int) -> Iterator[Tuple[str, Optional[Dict], Dict, Dict]]:
+	if not cursor:
+		yield "Run a search first.", None, gr.update(interactive=False), gr.update(interactive=False)
+		return
+	page: int = min(max(cursor["page"] + step, 0), len(cursor["page_starts"]) - 1)
+	yield from stream_result_page(dict(cursor, page=page))
 
-def ui_update_shards(split: str) -> Tuple[List[str], str]:
-	shards: List[Path] = list_shards(split)
-	choices: List[str] = [p.name for p in shards]
-	default_choice: str = choices[0] if choices else ""
-	return choices, default_choice
+
+def ui_query_dialogue_state(query: Optional[str], limit: int) -> Tuple[str, Optional[Dict], Dict, Dict]:
+	if not query or not query.strip():
+		message: str = "Enter a state query, e.g. `restaurant-food = italian AND hotel-stars >= 4 AND intent = book_hotel`."
+		return message, None, gr.update(interactive=False), gr.update(interactive=False)
+	return render_result_page(new_result_cursor("state", {"query": query.strip()}, limit))
 
 
 def ui_load_and_search(
@@ -100,12 +270,29 @@ def ui_load_and_search(
 	service_filter: Optional[str],
 	keyword: Optional[str],
 	limit: int,
-) -> str:
+	scope: str = SEARCH_SCOPES[0],
+	mode: str = MATCH_MODES[0],
+	max_edits: int = 1,
+) -> Iterator[Tuple[str, Optional[Dict], Dict, Dict]]:
+	no_pages: Tuple[Dict, Dict] = (gr.update(interactive=False), gr.update(interactive=False))
+	match: Dict = {"mode": mode, "max_edits": int(max_edits)}
+	if keyword and mode == "Regex":
+		try:
+			compile_regex(keyword)
+		except ValueError as e:
+			yield (f"Invalid query: {e}", None) + no_pages
+			return
+	if scope == "All splits":
+		params: Dict = {"service": service_filter or "", "keyword": keyword or "", **match}
+		yield render_result_page(new_result_cursor("all", params, limit))
+		return
 	if not split:
-		return "Please select a split."
+		yield ("Please select a split.", None) + no_pages
+		return
 	available_shards: List[Path] = list_shards(split)
 	if not available_shards:
-		return f"No shards found for split '{split}'."
+		yield (f"No shards found for split '{split}'.", None) + no_pages
+		return
 
 	if shard_filename:
 		shard_path_candidates: List[Path] = [
@@ -115,31 +302,187 @@ def ui_load_and_search(
 	else:
 		shard_path = available_shards[0]
 
+	params = {"split": split, "shard": shard_path.name, "service": service_filter or "", "keyword": keyword or "", **match}
+	yield from stream_result_page(new_result_cursor("shard", params, limit))
+
+
+def ui_find_near_duplicates(threshold: float, cross_split_only: bool = False) -> str:
 	try:
-		dialogues: List[Dict] = load_dialogues_from_shard(shard_path)
+		index: NearDuplicateIndex = get_near_duplicate_index()
+		clusters: List[List[int]] = index.clusters(float(threshold))
 	except Exception as e:
-		return f"Failed to load shard {shard_path.name}: {e}"
+		return f"Near-duplicate search failed: {e}"
+	if cross_split_only:
+		clusters = [c for c in clusters if len(index.splits_of(c)) > 1]
+	if not clusters:
+		return f"No near-duplicate dialogues at estimated similarity ≥ {threshold:.2f}."
+	covered: int = sum(len(c) for c in clusters)
+	chunks: List[str] = [
+		f"**{len(clusters)} clusters** of near-duplicate dialogues (estimated similarity ≥ {threshold:.2f}),"
+		f" covering {covered} of {len(index)} dialogues. Open any id with “View as Chat 💬”."
+	]
+	for number, cluster in enumerate(clusters[:NEAR_DUP_MAX_CLUSTERS], start=1):
+		first: int = cluster[0]
+		lines: List[str] = [f"**Cluster {number}** · {len(cluster)} dialogues · {', '.join(index.splits_of(cluster))}"]
+		for doc in cluster[:NEAR_DUP_MEMBERS_SHOWN]:
+			dialogue_id, split_name = index.docs[doc]
+			similarity: str = "" if doc == first else f" · {index.similarity(first, doc):.2f} vs. first"
+			lines.append(f"- `{dialogue_id}` ({split_name}){similarity}")
+		if len(cluster) > NEAR_DUP_MEMBERS_SHOWN:
+			lines.append(f"- … and {len(cluster) - NEAR_DUP_MEMBERS_SHOWN} more")
+		chunks.append("\n".join(lines))
+	if len(clusters) > NEAR_DUP_MAX_CLUSTERS:
+		chunks.append(f"Showing the {NEAR_DUP_MAX_CLUSTERS} largest clusters.")
+	return "\n\n---\n\n".join(chunks)
+
+
+def _bar(count: int, peak: int, width: int = 24) -> str:
+	return "█" * max(1, round(width * count / peak)) if count else ""
+
+
+def format_histogram(counter: Counter, label: str, unit: str) -> List[str]:
+	"""Markdown table of an int-keyed histogram, binned to at most ``STATS_HISTOGRAM_BINS`` rows.
+
+	Values above the 99th percentile are folded into a final ``≥`` row so one
+	outlier does not stretch the bins.
+	"""
+	values: List[Tuple[int, int]] = sorted((int(k), n) for k, n in counter.items())
+	if not values:
+		return ["No data."]
+	total: int = sum(n for _, n in values)
+	seen: int = 0
+	cap: int = values[-1][0]
+	for value, n in values:
+		seen += n
+		if seen >= 0.99 * total:
+			cap = value
+			break
+	width: int = max(1, -(-(cap + 1) // STATS_HISTOGRAM_BINS))
+	bins: Counter = Counter()
+	for value, n in values:
+		bins[value // width if value <= cap else -1] += n
+	rows: List[str] = [f"| {label} | {unit} | |", "|---|---:|---|"]
+	peak: int = max(bins.values())
+	for b in range(values[0][0] // width, cap // width + 1):
+		low: int = b * width
+		span: str = str(low) if width == 1 else f"{low}–{low + width - 1}"
+		rows.append(f"| {span} | {bins[b]:,} | {_bar(bins[b], peak)} |")
+	if bins[-1]:
+		rows.append(f"| ≥ {cap + 1} | {bins[-1]:,} | {_bar(bins[-1], peak)} |")
+	return rows
+
+
+def format_stats_markdown(stats: CorpusStats, scope: str) -> str:
+	per_split: Dict[str, Dict] = {split: stats.totals([split]) for split in SPLITS}
+	corpus: Dict = stats.totals()
+	selected: Dict = corpus if scope not in per_split else per_split[scope]
+	sections: List[str] = []
+
+	overview: List[str] = ["| Split | Dialogues | Turns | Turns / dialogue | Words / utterance |", "|---|---:|---:|---:|---:|"]
+	for name, totals in list(per_split.items()) + [("**All**", corpus)]:
+		overview.append(
+			f"| {name} | {totals['dialogues']:,} | {totals['turns']:,}"
+			f" | {totals['turns'] / max(totals['dialogues'], 1):.1f} | {totals['words'] / max(totals['turns'], 1):.1f} |"
+		)
+	sections.append("### Overview\n\n" + "\n".join(overview))
+
+	services: List[str] = sorted(corpus["services"], key=lambda s: (-corpus["services"][s], s))
+	by_service: List[str] = ["| Service | " + " | ".join(SPLITS) + " | Total |", "|---|" + "---:|" * (len(SPLITS) + 1)]
+	for service in services:
+		counts: str = " | ".join(f"{per_split[split]['services'][service]:,}" for split in SPLITS)
+		by_service.append(f"| {service} | {counts} | {corpus['services'][service]:,} |")
+	sections.append("### Dialogues per service\n\n" + "\n".join(by_service))
+
+	sections.append(f"### Turns per dialogue ({scope})\n\n" + "\n".join(format_histogram(selected["turns_per_dialogue"], "Turns", "Dialogues")))
+	sections.append(f"### Words per utterance ({scope})\n\n" + "\n".join(format_histogram(selected["words_per_utterance"], "Words", "Utterances")))
+
+	speakers: List[str] = ["| Speaker | Turns | Share of turns | Words | Words / turn |", "|---|---:|---:|---:|---:|"]
+	for speaker, turns in selected["speaker_turns"].most_common():
+		words: int = selected["speaker_words"][speaker]
+		speakers.append(
+			f"| {speaker} | {turns:,} | {100 * turns / max(selected['turns'], 1):.1f}% | {words:,} | {words / max(turns, 1):.1f} |"
+		)
+	sections.append(f"### Speakers ({scope})\n\n" + "\n".join(speakers))
+
+	slots: List[str] = ["| Slot | Dialogues filling it | Share of dialogues |", "|---|---:|---:|"]
+	for slot, dialogues in selected["slot_fills"].most_common(STATS_TOP_SLOTS):
+		slots.append(f"| {slot} | {dialogues:,} | {100 * dialogues / max(selected['dialogues'], 1):.1f}% |")
+	sections.append(f"### Most filled slots ({scope})\n\n" + "\n".join(slots))
+	return "\n\n".join(sections)
 
-	_, markdown_chunks = filter_dialogues(dialogues, service_filter, keyword, limit)
-	if not markdown_chunks:
-		return "No matching dialogues. Try a different shard, domain, or keyword."
-	return "\n\n---\n\n".join(markdown_chunks)
+
+def ui_corpus_stats(scope: str) -> str:
+	try:
+		stats: CorpusStats = get_corpus_stats()
+	except Exception as e:
+		return f"Statistics failed: {e}"
+	if not stats.shards:
+		return "No shards found."
+	return format_stats_markdown(stats, scope or STATS_SCOPES[0])
 
 
 def ui_random_dialogue() -> str:
-	split_choice: str = random.choice(["train", "dev", "test"])
-	shards: List[Path] = list_shards(split_choice)
-	if not shards:
-		return "No shards available."
-	shard_path: Path = random.choice(shards)
+	"""One dialogue drawn uniformly from the whole corpus, decoded from its byte span alone."""
 	try:
-		dialogues: List[Dict] = load_dialogues_from_shard(shard_path)
+		index: SearchIndex = get_search_index()
 	except Exception as e:
-		return f"Failed to load shard {shard_path.name}: {e}"
-	if not dialogues:
-		return "Shard has no dialogues."
-	dialogue: Dict = random.choice(dialogues)
-	return format_dialogue_markdown(dialogue)
+		return f"Failed to load the corpus index: {e}"
+	if not index.docs:
+		return "No dialogues available."
+	dialogue_id: str = index.docs[random.randrange(len(index.docs))][0]
+	found: List[Dict] = fetch_dialogues([dialogue_id])
+	if not found:
+		return f"Dialogue {dialogue_id} could not be read."
+	return format_dialogue_markdown(found[0])
+
+
+def ui_sample_dialogues(service_filter: Optional[str], size: int, seed: Optional[str], stratify: str) -> str:
+	"""A reproducible uniform sample: ``size`` dialogues overall, or per split / service when stratified.
+
+	Dialogue numbers are drawn from the search index (split and service
+	bitmaps give each stratum's members), so only the sampled dialogues are
+	ever decoded. The same seed and options always yield the same ids.
+	"""
+	try:
+		rng, used_seed = seeded_rng(seed)
+	except ValueError as e:
+		return f"Invalid seed: {e}"
+	try:
+		index: SearchIndex = get_search_index()
+	except Exception as e:
+		return f"Failed to load the corpus index: {e}"
+	size = int(size)
+	if stratify == "Split":
+		strata: Dict[str, Sequence[int]] = {split: index.search(None, service_filter, [split]) for split in SPLITS}
+	elif stratify == "Service":
+		services: List[str] = [service_filter.lower()] if service_filter else sorted(index.service_bitmaps)
+		strata = {service: index.search(None, service) for service in services}
+	else:
+		population: Sequence[int] = index.search(None, service_filter) if service_filter else range(len(index.docs))
+		strata = {"all": population}
+	picks: Dict[str, List[int]] = stratified_sample(strata, size, rng)
+	total: int = sum(len(p) for p in picks.values())
+	if not total:
+		return "No dialogues match the sampling options."
+	scope: str = f" {service_filter}" if service_filter and stratify != "Service" else ""
+	per: str = f", {size} per {stratify.lower()}" if stratify in SAMPLE_STRATA[1:] else ""
+	chunks: List[str] = [f"**Sample of {total}{scope} dialogues**{per} · seed `{used_seed}` (reuse it to draw the same sample)."]
+	lines: List[str] = []
+	for name, docs in picks.items():
+		ids: str = ", ".join(f"`{index.docs[doc][0]}`" for doc in docs) or "—"
+		lines.append(f"- **{name}** ({len(docs)} of {len(strata[name]):,}): {ids}")
+	chunks.append("\n".join(lines))
+	payload: Dict[str, object] = {
+		"seed": used_seed,
+		"stratify": stratify,
+		"ids": {name: [index.docs[doc][0] for doc in docs] for name, docs in picks.items()},
+	}
+	chunks.append("```json\n" + json.dumps(payload) + "\n```")
+	first_ids: List[str] = [index.docs[doc][0] for docs in picks.values() for doc in docs][:PAGE_SIZE]
+	rendered: List[str] = [format_dialogue_markdown(d) for d in fetch_dialogues(first_ids)]
+	if total > len(rendered):
+		rendered.append(f"Showing the first {len(rendered)} sampled dialogues; open any other id with “View as Chat 💬”.")
+	return "\n\n---\n\n".join(chunks + rendered)
 
 
 def ui_update_dialogue_ids(split: str, shard_filename: str) -> Tuple[List[str], str]:
@@ -158,12 +501,26 @@ def ui_update_dialogue_ids(split: str, shard_filename: str) -> Tuple[List[str],
 	return ids, default_id
 
 
-def ui_view_dialogue_as_chat(split: str, shard_filename: str, dialogue_id: str) -> List[Tuple[str, str]]:
+def find_dialogue(split: str, shard_filename: str, dialogue_id: str) -> Optional[Dict]:
+	if not dialogue_id:
+		return None
+	# Any id in the corpus opens directly from the store or its byte span,
+	# whatever shard is selected
+	try:
+		store: Optional[CorpusStore] = get_corpus_store()
+		position: Optional[int] = store.find(dialogue_id) if store is not None else None
+		if position is not None:
+			return store.dialogue_preview(position)
+		dialogue: Optional[Dict] = get_dialogue_locator().fetch(DATA_ROOT, dialogue_id)
+	except Exception:
+		dialogue = None
+	if dialogue is not None:
+		return dialogue
 	if not split:
-		return []
+		return None
 	available_shards: List[Path] = list_shards(split)
 	if not available_shards:
-		return []
+		return None
 	if shard_filename:
 		candidates: List[Path] = [p for p in available_shards if p.name == shard_filename]
 		shard_path: Path = candidates[0] if candidates else available_shards[0]
@@ -172,12 +529,15 @@ def ui_view_dialogue_as_chat(split: str, shard_filename: str, dialogue_id: str)
 	try:
 		dialogues: List[Dict] = load_dialogues_from_shard(shard_path)
 	except Exception:
-		return []
-	selected: Optional[Dict] = None
+		return None
 	for d in dialogues:
 		if d.get("dialogue_id") == dialogue_id:
-			selected = d
-			break
+			return d
+	return None
+
+
+def ui_view_dialogue_as_chat(split: str, shard_filename: str, dialogue_id: str) -> List[Tuple[str, str]]:
+	selected: Optional[Dict] = find_dialogue(split, shard_filename, dialogue_id)
 	if not selected:
 		return []
 	turns: List[Dict] = selected.get("turns", [])
@@ -227,46 +587,113 @@ def build_demo() -> gr.Blocks:
 			Browse and search dialogues from the MultiWOZ dataset. ✨
 			"""
 		)
-
-		with gr.Row():
-			split = gr.Dropdown(
-				label="Split",
-				choices=["train", "dev", "test"],
-				value="train",
-			)
-			shard = gr.Dropdown(
-				label="Shard file (dialogues_XXX.json)",
-				choices=_initial_choices,
-				value=_initial_default,
-			)
-
-		with gr.Row():
-			service = gr.Dropdown(
-				label="Domain (optional)",
-				choices=[""] + services,
-				value="",
-			)
-			keyword = gr.Textbox(label="Keyword (optional)")
-			limit = gr.Slider(
-				label="Max dialogues",
-				minimum=1,
-				maximum=50,
-				value=5,
-				step=1,
-			)
-
-		with gr.Row():
-			load_btn = gr.Button("Load & Search")
-			random_btn = gr.Button("Random Dialogue")
-
-		output = gr.Markdown()
-
-		# Dialogue picker + Chat view
-		with gr.Row():
-			dialogue_id = gr.Dropdown(label="Dialogue ID (optional)")
-			view_btn = gr.Button("View as Chat 💬")
-
-		chat = gr.Chatbot(label="Conversation", height=420, bubble_full_width=False)
+		# Warm-up progress, polled until the warm-up is ready or has failed
+		warmup_status = gr.Markdown(WARMUP.status_markdown)
+		warmup_timer = gr.Timer(2, active=WARMUP_ENABLED)
+		warmup_timer.tick(ui_warmup_status, outputs=[warmup_status, warmup_timer], show_progress="hidden")
+
+		with gr.Tab("Explore"):
+			with gr.Row():
+				split = gr.Dropdown(
+					label="Split",
+					choices=["train", "dev", "test"],
+					value="train",
+				)
+				shard = gr.Dropdown(
+					label="Shard file (dialogues_XXX.json)",
+					choices=_initial_choices,
+					value=_initial_default,
+				)
+
+			with gr.Row():
+				service = gr.Dropdown(
+					label="Domain (optional)",
+					choices=[""] + services,
+					value="",
+				)
+				keyword = gr.Textbox(label="Keyword (optional)")
+				limit = gr.Slider(
+					label="Max dialogues",
+					minimum=1,
+					maximum=500,
+					value=5,
+					step=1,
+				)
+				scope = gr.Radio(
+					label="Search scope",
+					choices=SEARCH_SCOPES,
+					value=SEARCH_SCOPES[0],
+				)
+
+			with gr.Row():
+				match_mode = gr.Radio(
+					label="Keyword match",
+					choices=MATCH_MODES,
+					value=MATCH_MODES[0],
+				)
+				max_edits = gr.Slider(
+					label="Fuzzy: max typos per word",
+					minimum=1,
+					maximum=3,
+					value=1,
+					step=1,
+				)
+
+			with gr.Row():
+				load_btn = gr.Button("Load & Search")
+				random_btn = gr.Button("Random Dialogue")
+
+			with gr.Row():
+				sample_size = gr.Slider(
+					label="Sample size (per stratum when stratified)",
+					minimum=1,
+					maximum=SAMPLE_MAX_SIZE,
+					value=20,
+					step=1,
+				)
+				sample_seed = gr.Textbox(label="Seed (optional, integer)", placeholder="blank = new random seed")
+				sample_strata = gr.Radio(label="Stratify by", choices=SAMPLE_STRATA, value=SAMPLE_STRATA[0])
+				sample_btn = gr.Button("Sample")
+
+			with gr.Row():
+				state_query = gr.Textbox(
+					label="Dialogue-state query (optional)",
+					placeholder="restaurant-food = italian AND hotel-stars >= 4 AND intent = book_hotel",
+				)
+				state_btn = gr.Button("Query State")
+
+			with gr.Row():
+				dup_threshold = gr.Slider(
+					label="Near-duplicate similarity (estimated Jaccard)",
+					minimum=0.5,
+					maximum=1.0,
+					value=0.8,
+					step=0.05,
+				)
+				dup_cross_split = gr.Checkbox(label="Only clusters spanning several splits", value=False)
+				dup_btn = gr.Button("Find Near-Duplicates")
+
+			output = gr.Markdown()
+			result_cursor = gr.State(None)
+			with gr.Row():
+				prev_btn = gr.Button("← Previous page", interactive=False)
+				next_btn = gr.Button("Next page →", interactive=False)
+
+			# Dialogue picker + Chat view
+			with gr.Row():
+				dialogue_id = gr.Dropdown(
+					label="Dialogue ID (optional, any split)",
+					allow_custom_value=True,
+				)
+				view_btn = gr.Button("View as Chat 💬")
+
+			chat = gr.Chatbot(label="Conversation", height=420, bubble_full_width=False)
+
+		with gr.Tab("Statistics") as stats_tab:
+			with gr.Row():
+				stats_scope = gr.Dropdown(label="Split", choices=STATS_SCOPES, value=STATS_SCOPES[0])
+				stats_btn = gr.Button("Refresh Statistics")
+			stats_output = gr.Markdown()
 
 		def _on_split_change(selected_split: str):
 			choices, default_choice = ui_update_shards(selected_split)
@@ -283,12 +710,34 @@ def build_demo() -> gr.Blocks:
 		shard.change(_on_shard_change, inputs=[split, shard], outputs=[dialogue_id])
 		split.change(_on_shard_change, inputs=[split, shard], outputs=[dialogue_id])
 
-		load_btn.click(
-			ui_load_and_search,
-			inputs=[split, shard, service, keyword, limit],
-			outputs=[output],
-		)
+		def _prev_page(cursor: Optional[Dict]):
+			yield from ui_change_page(cursor, -1)
+
+		def _next_page(cursor: Optional[Dict]):
+			yield from ui_change_page(cursor, 1)
+
+		page_outputs = [output, result_cursor, prev_btn, next_btn]
+		search_events = [
+			load_btn.click(
+				ui_load_and_search,
+				inputs=[split, shard, service, keyword, limit, scope, match_mode, max_edits],
+				outputs=page_outputs,
+				**search_event_options(),
+			),
+			prev_btn.click(_prev_page, inputs=[result_cursor], outputs=page_outputs, **search_event_options()),
+			next_btn.click(_next_page, inputs=[result_cursor], outputs=page_outputs, **search_event_options()),
+		]
+		# Editing the query cancels a scan that is still streaming results
+		for query_input in (split, shard, service, keyword, scope, match_mode, max_edits):
+			query_input.change(None, inputs=None, outputs=None, cancels=search_events)
 		random_btn.click(ui_random_dialogue, inputs=None, outputs=[output])
+		sample_btn.click(ui_sample_dialogues, inputs=[service, sample_size, sample_seed, sample_strata], outputs=[output])
+		state_btn.click(ui_query_dialogue_state, inputs=[state_query, limit], outputs=page_outputs)
+		dup_btn.click(ui_find_near_duplicates, inputs=[dup_threshold, dup_cross_split], outputs=[output], **search_event_options())
+		# Aggregates are cached on disk, so opening the tab renders without reading shards
+		stats_tab.select(ui_corpus_stats, inputs=[stats_scope], outputs=[stats_output])
+		stats_scope.change(ui_corpus_stats, inputs=[stats_scope], outputs=[stats_output])
+		stats_btn.click(ui_corpus_stats, inputs=[stats_scope], outputs=[stats_output])
 
 		view_btn.click(
 			ui_view_dialogue_as_chat,
@@ -303,6 +752,9 @@ def build_demo() -> gr.Blocks:
 
 if __name__ == "__main__":
 	demo = build_demo()
-	demo.launch()
-
-
+	if WARMUP_ENABLED:
+		WARMUP.start()
+	# Bounded queue: past MULTIWOZ_QUEUE_MAX_SIZE waiting requests, new ones are turned away at once
+	app, _, _ = demo.queue(**queue_options()).launch(prevent_thread_lock=True, max_threads=MAX_THREADS)
+	app.add_api_route("/readiness", readiness_response, methods=["GET"])
+	demo.block_thread()
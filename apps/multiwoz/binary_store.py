@@ -0,0 +1,231 @@
+import json
+import mmap
+import sys
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from corpus_index import Fingerprint, corpus_fingerprint, list_corpus_shards
+
+MAGIC: bytes = b"MWZSTORE"
+STORE_VERSION: int = 1
+# Section name -> array typecode; every section is 8-byte aligned in the file
+SECTIONS: Tuple[Tuple[str, str], ...] = (
+	("dialogue_shard", "H"),  # shard number of each dialogue
+	("dialogue_turn_offsets", "I"),  # turns of dialogue d are [off[d], off[d + 1])
+	("dialogue_service_offsets", "I"),
+	("dialogue_services", "H"),  # service codes
+	("turn_speakers", "B"),  # speaker codes
+	("turn_text_offsets", "Q"),  # utterance t is blob[off[t], off[t + 1] - 1)
+	("text", "B"),  # UTF-8 utterances, each followed by "\n"
+)
+
+# (dialogue_id, services, [(speaker, utterance), ...])
+StoreRow = Tuple[str, List[str], List[Tuple[str, str]]]
+
+
+def extract_store_rows(dialogues: List[Dict]) -> List[StoreRow]:
+	return [
+		(
+			dlg.get("dialogue_id", "<unknown>"),
+			list(dlg.get("services", [])),
+			[(t.get("speaker", "?"), t.get("utterance", "")) for t in dlg.get("turns", [])],
+		)
+		for dlg in dialogues
+	]
+
+
+def write_store(
+	out_path: Path,
+	shard_names: List[str],
+	per_shard: Sequence[List[StoreRow]],
+	fingerprint: Fingerprint,
+) -> None:
+	speakers: Dict[str, int] = {}
+	services: Dict[str, int] = {}
+	dialogue_ids: List[str] = []
+	arrays: Dict[str, array] = {name: array(code) for name, code in SECTIONS if name != "text"}
+	arrays["dialogue_turn_offsets"].append(0)
+	arrays["dialogue_service_offsets"].append(0)
+	arrays["turn_text_offsets"].append(0)
+	text = bytearray()
+	for shard_no, rows in enumerate(per_shard):
+		for dialogue_id, dialogue_services, turns in rows:
+			dialogue_ids.append(dialogue_id)
+			arrays["dialogue_shard"].append(shard_no)
+			for service in dialogue_services:
+				arrays["dialogue_services"].append(services.setdefault(service, len(services)))
+			arrays["dialogue_service_offsets"].append(len(arrays["dialogue_services"]))
+			for speaker, utterance in turns:
+				arrays["turn_speakers"].append(speakers.setdefault(speaker, len(speakers)))
+				text += utterance.encode("utf-8")
+				text += b"\n"
+				arrays["turn_text_offsets"].append(len(text))
+			arrays["dialogue_turn_offsets"].append(len(arrays["turn_speakers"]))
+
+	payloads: List[Tuple[str, bytes]] = [(name, arrays[name].tobytes()) for name, _ in SECTIONS if name != "text"]
+	payloads.append(("text", bytes(text)))
+	sections: Dict[str, Tuple[int, int]] = {}
+	offset: int = 0
+	for name, payload in payloads:
+		sections[name] = (offset, len(payload))
+		offset += (len(payload) + 7) // 8 * 8
+	header: bytes = json.dumps({
+		"version": STORE_VERSION,
+		"byteorder": sys.byteorder,
+		"fingerprint": fingerprint,
+		"shards": shard_names,
+		"speakers": list(speakers),
+		"services": list(services),
+		"dialogue_ids": dialogue_ids,
+		"sections": sections,
+	}, ensure_ascii=False).encode("utf-8")
+	header += b" " * (-(len(MAGIC) + 8 + len(header)) % 8)
+
+	tmp_path: Path = out_path.with_name(out_path.name + ".tmp")
+	with tmp_path.open("wb") as f:
+		f.write(MAGIC)
+		f.write(len(header).to_bytes(8, "little"))
+		f.write(header)
+		for _, payload in payloads:
+			f.write(payload)
+			f.write(b"\0" * (-len(payload) % 8))
+	tmp_path.replace(out_path)
+
+
+class CorpusStore:
+	"""Read-only, memory-mapped view of a store written by ``write_store``.
+
+	Integer columns are ``memoryview`` casts over the mapping and utterances
+	are slices of one UTF-8 blob, so nothing is copied until a dialogue is
+	materialized and every process mapping the file shares the page cache.
+	Materialized dialogues carry ``dialogue_id``, ``services`` and
+	``turns[].speaker/utterance`` only (no frames).
+	"""
+
+	def __init__(self, path: Path) -> None:
+		self.path = path
+		with path.open("rb") as f:
+			self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		view = memoryview(self._mm)
+		if bytes(view[: len(MAGIC)]) != MAGIC:
+			raise ValueError(f"{path} is not a MultiWOZ corpus store")
+		header_len: int = int.from_bytes(view[len(MAGIC): len(MAGIC) + 8], "little")
+		body_start: int = len(MAGIC) + 8 + header_len
+		header: Dict = json.loads(bytes(view[len(MAGIC) + 8: body_start]))
+		if header.get("version") != STORE_VERSION or header.get("byteorder") != sys.byteorder:
+			raise ValueError(f"{path} was written by an incompatible store version")
+		self.fingerprint: Fingerprint = [tuple(f) for f in header["fingerprint"]]
+		self.shards: List[str] = header["shards"]
+		self.speakers: List[str] = header["speakers"]
+		self.services: List[str] = header["services"]
+		self.services_lower: List[str] = [s.lower() for s in self.services]
+		self.dialogue_ids: List[str] = header["dialogue_ids"]
+		self._id_to_dialogue: Dict[str, int] = {d: i for i, d in enumerate(self.dialogue_ids)}
+		cols: Dict[str, memoryview] = {}
+		for name, code in SECTIONS:
+			offset, length = header["sections"][name]
+			section: memoryview = view[body_start + offset: body_start + offset + length]
+			cols[name] = section if code == "B" else section.cast(code)
+		self.dialogue_shard = cols["dialogue_shard"]
+		self.dialogue_turn_offsets = cols["dialogue_turn_offsets"]
+		self.dialogue_service_offsets = cols["dialogue_service_offsets"]
+		self.dialogue_services = cols["dialogue_services"]
+		self.turn_speakers = cols["turn_speakers"]
+		self.turn_text_offsets = cols["turn_text_offsets"]
+		self.text = cols["text"]
+		# Dialogues of each shard are contiguous; remember each shard's range
+		self._shard_ranges: Dict[str, Tuple[int, int]] = {}
+		for d in range(len(self.dialogue_ids)):
+			name: str = self.shards[self.dialogue_shard[d]]
+			start, _ = self._shard_ranges.get(name, (d, d))
+			self._shard_ranges[name] = (start, d + 1)
+
+	def __len__(self) -> int:
+		return len(self.dialogue_ids)
+
+	def shard_range(self, split: str, shard_name: str) -> range:
+		start, end = self._shard_ranges.get(f"{split}/{shard_name}", (0, 0))
+		return range(start, end)
+
+	def find(self, dialogue_id: str) -> Optional[int]:
+		return self._id_to_dialogue.get(dialogue_id)
+
+	def utterance_bytes(self, turn: int) -> memoryview:
+		"""Zero-copy UTF-8 slice of one utterance."""
+		return self.text[self.turn_text_offsets[turn]: self.turn_text_offsets[turn + 1] - 1]
+
+	def dialogue_services_of(self, d: int) -> List[str]:
+		start, end = self.dialogue_service_offsets[d], self.dialogue_service_offsets[d + 1]
+		return [self.services[self.dialogue_services[i]] for i in range(start, end)]
+
+	def dialogue_text(self, d: int) -> str:
+		"""All utterances of a dialogue joined by newlines, decoded in one go."""
+		first, last = self.dialogue_turn_offsets[d], self.dialogue_turn_offsets[d + 1]
+		if first == last:
+			return ""
+		return str(self.text[self.turn_text_offsets[first]: self.turn_text_offsets[last] - 1], "utf-8")
+
+	def dialogue_preview(self, d: int) -> Dict:
+		"""Id, services and each turn's speaker and utterance: enough to render a dialogue.
+
+		Frames, dialogue state and turn ids are not stored; read full records
+		through ``DialogueLocator.fetch``.
+		"""
+		first, last = self.dialogue_turn_offsets[d], self.dialogue_turn_offsets[d + 1]
+		return {
+			"dialogue_id": self.dialogue_ids[d],
+			"services": self.dialogue_services_of(d),
+			"turns": [
+				{
+					"speaker": self.speakers[self.turn_speakers[t]],
+					"utterance": str(self.utterance_bytes(t), "utf-8"),
+				}
+				for t in range(first, last)
+			],
+		}
+
+	def filter(
+		self,
+		dialogues: range,
+		service_filter: Optional[str],
+		keyword: Optional[str],
+		limit: int,
+		text_matcher: Optional[Callable[[str], bool]] = None,
+	) -> Iterator[int]:
+		"""Same matching rules as ``engine.filter_dialogues``, without materializing dialogues.
+
+		``text_matcher``, if given, replaces the keyword substring test and is
+		called with the dialogue's joined utterances.
+		"""
+		service_lower: Optional[str] = service_filter.lower() if service_filter else None
+		keyword_lower: Optional[str] = keyword.lower() if keyword else None
+		found: int = 0
+		for d in dialogues:
+			if found >= limit:
+				return
+			if service_lower:
+				start, end = self.dialogue_service_offsets[d], self.dialogue_service_offsets[d + 1]
+				codes = [self.dialogue_services[i] for i in range(start, end)]
+				if not any(self.services_lower[c] == service_lower for c in codes):
+					continue
+			if text_matcher is not None:
+				if not text_matcher(self.dialogue_text(d)):
+					continue
+			elif keyword_lower and keyword_lower not in self.dialogue_text(d).lower():
+				continue
+			found += 1
+			yield d
+
+
+def open_store(store_path: Path, data_root: Path) -> Optional[CorpusStore]:
+	"""Open the store if it exists and still matches the shards on disk."""
+	if not store_path.exists():
+		return None
+	try:
+		store = CorpusStore(store_path)
+	except (OSError, ValueError):
+		return None
+	if store.fingerprint != corpus_fingerprint(data_root, list_corpus_shards(data_root)):
+		return None
+	return store
@@ -0,0 +1,306 @@
+import gzip
+import json
+import re
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+SPLITS: Tuple[str, ...] = ("train", "dev", "test")
+TOKEN_RE = re.compile(r"\w+")
+INDEX_VERSION: int = 2
+_ARRAY_GAP_RE = re.compile(r"[\s,]*")
+
+# (shard path relative to the data root, mtime_ns, size)
+Fingerprint = List[Tuple[str, int, int]]
+
+
+def tokenize(text: str) -> List[str]:
+	return TOKEN_RE.findall(text.lower())
+
+
+def list_corpus_shards(data_root: Path) -> List[Path]:
+	shards: List[Path] = []
+	for split in SPLITS:
+		shards.extend(sorted((data_root / split).glob("dialogues_*.json")))
+	return shards
+
+
+def corpus_fingerprint(data_root: Path, shards: Iterable[Path]) -> Fingerprint:
+	fingerprint: Fingerprint = []
+	for shard in shards:
+		stat = shard.stat()
+		fingerprint.append((shard.relative_to(data_root).as_posix(), stat.st_mtime_ns, stat.st_size))
+	return fingerprint
+
+
+def bitmap_members(bitmap: int) -> List[int]:
+	bits: str = format(bitmap, "b")[::-1]
+	return [i for i, bit in enumerate(bits) if bit == "1"]
+
+
+def read_shard(shard_path: Path) -> List[Dict]:
+	with shard_path.open("r", encoding="utf-8") as f:
+		return json.load(f)
+
+
+def parse_shard_with_spans(shard_path: Path) -> Tuple[List[Dict], List[Tuple[str, int, int]]]:
+	"""Parse a shard, also returning (dialogue_id, byte offset, byte length) per dialogue.
+
+	Each span covers exactly one element of the shard's top-level JSON array, so
+	``read_dialogue_span`` can decode it without touching the rest of the file.
+	"""
+	text: str = shard_path.read_bytes().decode("utf-8")
+	decoder = json.JSONDecoder()
+	dialogues: List[Dict] = []
+	spans: List[Tuple[str, int, int]] = []
+	pos: int = text.index("[") + 1
+	byte_pos: int = len(text[:pos].encode("utf-8"))
+	while True:
+		# Whitespace and commas between elements are ASCII: one byte per char
+		gap_end: int = _ARRAY_GAP_RE.match(text, pos).end()
+		byte_pos += gap_end - pos
+		pos = gap_end
+		if pos >= len(text) or text[pos] == "]":
+			break
+		dialogue, end = decoder.raw_decode(text, pos)
+		length: int = len(text[pos:end].encode("utf-8"))
+		dialogues.append(dialogue)
+		spans.append((dialogue.get("dialogue_id", "<unknown>"), byte_pos, length))
+		byte_pos += length
+		pos = end
+	return dialogues, spans
+
+
+def read_dialogue_span(shard_path: Path, offset: int, length: int) -> Dict:
+	with shard_path.open("rb") as f:
+		f.seek(offset)
+		return json.loads(f.read(length))
+
+
+def save_index_payload(path: Path, payload: Dict) -> None:
+	tmp_path: Path = path.with_name(path.name + ".tmp")
+	# json.dumps (not dump) so the C encoder does the work
+	encoded: bytes = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+	with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+		f.write(encoded)
+	tmp_path.replace(path)
+
+
+def load_index_payload(path: Path) -> Optional[Dict]:
+	try:
+		with gzip.open(path, "rt", encoding="utf-8") as f:
+			payload = json.load(f)
+	except (OSError, ValueError):
+		return None
+	if payload.get("version") != INDEX_VERSION:
+		return None
+	return payload
+
+
+def extract_search_terms(dialogues: List[Dict]) -> List[Tuple[str, List[str], List[str]]]:
+	"""Reduce a parsed shard to (dialogue_id, services, unique tokens) rows."""
+	rows: List[Tuple[str, List[str], List[str]]] = []
+	for dlg in dialogues:
+		tokens = set()
+		for turn in dlg.get("turns", []):
+			tokens.update(tokenize(turn.get("utterance", "")))
+		services: List[str] = [s.lower() for s in dlg.get("services", [])]
+		rows.append((dlg.get("dialogue_id", "<unknown>"), services, sorted(tokens)))
+	return rows
+
+
+class SearchIndex:
+	"""Inverted index over every MultiWOZ shard.
+
+	Dialogues are numbered in corpus order (train, dev, test; shards sorted).
+	``postings`` maps a token to the sorted dialogue numbers containing it, and
+	services and splits are kept as integer bitmaps where bit ``n`` marks
+	dialogue ``n``.
+	"""
+
+	def __init__(
+		self,
+		docs: List[Tuple[str, str, str]],
+		postings: Dict[str, List[int]],
+		service_bitmaps: Dict[str, int],
+		split_bitmaps: Dict[str, int],
+		fingerprint: Fingerprint,
+	) -> None:
+		self.docs = docs  # (dialogue_id, split, shard file name)
+		self.postings = postings
+		self.service_bitmaps = service_bitmaps
+		self.split_bitmaps = split_bitmaps
+		self.fingerprint = fingerprint
+		self.vocabulary: List[str] = sorted(postings)
+
+	@classmethod
+	def from_shard_terms(
+		cls,
+		shards: Sequence[Path],
+		per_shard: Sequence[List[Tuple[str, List[str], List[str]]]],
+		fingerprint: Fingerprint,
+	) -> "SearchIndex":
+		docs: List[Tuple[str, str, str]] = []
+		postings: Dict[str, List[int]] = {}
+		service_bitmaps: Dict[str, int] = {}
+		split_bitmaps: Dict[str, int] = {}
+		for shard, rows in zip(shards, per_shard):
+			split: str = shard.parent.name
+			for dialogue_id, services, tokens in rows:
+				doc: int = len(docs)
+				docs.append((dialogue_id, split, shard.name))
+				bit: int = 1 << doc
+				split_bitmaps[split] = split_bitmaps.get(split, 0) | bit
+				for service in services:
+					service_bitmaps[service] = service_bitmaps.get(service, 0) | bit
+				for token in tokens:
+					postings.setdefault(token, []).append(doc)
+		return cls(docs, postings, service_bitmaps, split_bitmaps, fingerprint)
+
+	def save(self, path: Path) -> None:
+		save_index_payload(path, {
+			"version": INDEX_VERSION,
+			"fingerprint": self.fingerprint,
+			"docs": self.docs,
+			"postings": self.postings,
+			"service_bitmaps": {k: format(v, "x") for k, v in self.service_bitmaps.items()},
+			"split_bitmaps": {k: format(v, "x") for k, v in self.split_bitmaps.items()},
+		})
+
+	@classmethod
+	def load(cls, path: Path) -> Optional["SearchIndex"]:
+		payload: Optional[Dict] = load_index_payload(path)
+		if payload is None:
+			return None
+		return cls(
+			[tuple(d) for d in payload["docs"]],
+			payload["postings"],
+			{k: int(v, 16) for k, v in payload["service_bitmaps"].items()},
+			{k: int(v, 16) for k, v in payload["split_bitmaps"].items()},
+			[tuple(f) for f in payload["fingerprint"]],
+		)
+
+	def _token_docs(self, token: str, prefix: bool) -> List[int]:
+		if not prefix:
+			return self.postings.get(token, [])
+		# Prefix-expand so a partially typed last word ("restaur") still matches
+		docs = set()
+		i: int = bisect_left(self.vocabulary, token)
+		while i < len(self.vocabulary) and self.vocabulary[i].startswith(token):
+			docs.update(self.postings[self.vocabulary[i]])
+			i += 1
+		return sorted(docs)
+
+	def _mask(self, service_filter: Optional[str], splits: Optional[Iterable[str]]) -> Optional[int]:
+		mask: Optional[int] = None
+		if service_filter:
+			mask = self.service_bitmaps.get(service_filter.lower(), 0)
+		if splits is not None:
+			split_mask: int = 0
+			for split in splits:
+				split_mask |= self.split_bitmaps.get(split, 0)
+			mask = split_mask if mask is None else mask & split_mask
+		return mask
+
+	def _intersect(self, candidate_lists: List[List[int]], mask: Optional[int]) -> List[int]:
+		if not candidate_lists:
+			if mask is None:
+				return list(range(len(self.docs)))
+			return bitmap_members(mask)
+		candidate_lists.sort(key=len)
+		matches = set(candidate_lists[0])
+		for docs in candidate_lists[1:]:
+			if not matches:
+				break
+			matches.intersection_update(docs)
+		if mask is not None:
+			bits: str = format(mask, "b")[::-1]
+			matches = {doc for doc in matches if doc < len(bits) and bits[doc] == "1"}
+		return sorted(matches)
+
+	def search(
+		self,
+		keyword: Optional[str],
+		service_filter: Optional[str],
+		splits: Optional[Iterable[str]] = None,
+	) -> List[int]:
+		"""Return matching dialogue numbers in corpus order.
+
+		Every keyword token must occur in the dialogue; the last token also
+		matches as a prefix. Service and split filters are exact.
+		"""
+		tokens: List[str] = tokenize(keyword or "")
+		candidate_lists: List[List[int]] = [
+			self._token_docs(token, prefix=(i == len(tokens) - 1)) for i, token in enumerate(tokens)
+		]
+		return self._intersect(candidate_lists, self._mask(service_filter, splits))
+
+	def search_any_of(
+		self,
+		groups: Sequence[Iterable[str]],
+		service_filter: Optional[str],
+		splits: Optional[Iterable[str]] = None,
+	) -> List[int]:
+		"""Dialogues containing at least one token of every group (e.g. fuzzy expansions)."""
+		candidate_lists: List[List[int]] = []
+		for group in groups:
+			docs = set()
+			for token in group:
+				docs.update(self.postings.get(token, ()))
+			candidate_lists.append(sorted(docs))
+		return self._intersect(candidate_lists, self._mask(service_filter, splits))
+
+
+class DialogueLocator:
+	"""Map every dialogue_id in the corpus to its (split, shard, offset, length)."""
+
+	def __init__(self, locations: Dict[str, Tuple[str, str, int, int]], fingerprint: Fingerprint) -> None:
+		self.locations = locations
+		self.fingerprint = fingerprint
+
+	@classmethod
+	def from_shard_spans(
+		cls,
+		shards: Sequence[Path],
+		per_shard: Sequence[List[Tuple[str, int, int]]],
+		fingerprint: Fingerprint,
+	) -> "DialogueLocator":
+		locations: Dict[str, Tuple[str, str, int, int]] = {}
+		for shard, spans in zip(shards, per_shard):
+			for dialogue_id, offset, length in spans:
+				locations.setdefault(dialogue_id, (shard.parent.name, shard.name, offset, length))
+		return cls(locations, fingerprint)
+
+	def save(self, path: Path) -> None:
+		save_index_payload(path, {
+			"version": INDEX_VERSION,
+			"fingerprint": self.fingerprint,
+			"locations": self.locations,
+		})
+
+	@classmethod
+	def load(cls, path: Path) -> Optional["DialogueLocator"]:
+		payload: Optional[Dict] = load_index_payload(path)
+		if payload is None:
+			return None
+		return cls(
+			{k: tuple(v) for k, v in payload["locations"].items()},
+			[tuple(f) for f in payload["fingerprint"]],
+		)
+
+	def resolve(self, dialogue_id: str) -> Optional[str]:
+		"""Normalize a user-typed id (``pmul4398`` -> ``PMUL4398.json``) to a known one."""
+		candidate: str = dialogue_id.strip()
+		for option in (candidate, candidate.upper(), candidate + ".json", candidate.upper() + ".json"):
+			if option in self.locations:
+				return option
+		return None
+
+	def fetch(self, data_root: Path, dialogue_id: str) -> Optional[Dict]:
+		resolved: Optional[str] = self.resolve(dialogue_id)
+		if resolved is None:
+			return None
+		split, shard_name, offset, length = self.locations[resolved]
+		dialogue: Dict = read_dialogue_span(data_root / split / shard_name, offset, length)
+		return dialogue if dialogue.get("dialogue_id") == resolved else None
+
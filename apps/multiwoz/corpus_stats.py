@@ -0,0 +1,104 @@
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from corpus_index import (
+	INDEX_VERSION,
+	Fingerprint,
+	load_index_payload,
+	save_index_payload,
+)
+
+# Counter-valued aggregates; everything else in a shard's stats is a plain total
+COUNTERS: Sequence[str] = (
+	"services",  # service -> dialogues
+	"turns_per_dialogue",  # turn count -> dialogues
+	"words_per_utterance",  # word count -> utterances
+	"speaker_turns",  # speaker -> turns
+	"speaker_words",  # speaker -> words
+	"slot_fills",  # slot -> dialogues whose state ever fills it
+)
+TOTALS: Sequence[str] = ("dialogues", "turns", "words")
+
+
+def extract_shard_stats(dialogues: List[Dict]) -> Dict[str, object]:
+	"""Reduce a parsed shard to additive aggregates (counts keyed by str for JSON)."""
+	counters: Dict[str, Counter] = {name: Counter() for name in COUNTERS}
+	totals: Dict[str, int] = {name: 0 for name in TOTALS}
+	for dlg in dialogues:
+		turns: List[Dict] = dlg.get("turns", [])
+		totals["dialogues"] += 1
+		totals["turns"] += len(turns)
+		counters["turns_per_dialogue"][str(len(turns))] += 1
+		counters["services"].update({s.lower() for s in dlg.get("services", [])})
+		filled = set()
+		for turn in turns:
+			words: int = len(turn.get("utterance", "").split())
+			speaker: str = turn.get("speaker", "") or "UNKNOWN"
+			totals["words"] += words
+			counters["words_per_utterance"][str(words)] += 1
+			counters["speaker_turns"][speaker] += 1
+			counters["speaker_words"][speaker] += words
+			for frame in turn.get("frames", []):
+				state: Dict = frame.get("state") or {}
+				filled.update(slot.lower() for slot, values in (state.get("slot_values") or {}).items() if values)
+		counters["slot_fills"].update(filled)
+	return {**totals, **{name: dict(counter) for name, counter in counters.items()}}
+
+
+def merge_stats(parts: Iterable[Dict[str, object]]) -> Dict[str, object]:
+	"""Sum shard aggregates; counters come back as ``Counter`` objects."""
+	merged: Dict[str, object] = {name: 0 for name in TOTALS}
+	merged.update({name: Counter() for name in COUNTERS})
+	for part in parts:
+		for name in TOTALS:
+			merged[name] += part.get(name, 0)
+		for name in COUNTERS:
+			merged[name].update(part.get(name, {}))
+	return merged
+
+
+class CorpusStats:
+	"""Per-shard corpus aggregates, kept up to date one shard at a time.
+
+	Each shard's aggregates are stored with the (mtime_ns, size) they were
+	computed from, so a refresh only re-reads shards that changed and sums the
+	rest from disk. Aggregates are additive, so any split or the whole corpus
+	is a merge of its shards.
+	"""
+
+	def __init__(self, shards: Dict[str, Dict[str, object]], fingerprint: Fingerprint) -> None:
+		self.shards = shards  # shard path relative to the data root -> aggregates
+		self.fingerprint = fingerprint
+
+	def stale_shards(self, fingerprint: Fingerprint) -> List[str]:
+		"""Shards of ``fingerprint`` whose aggregates are missing or were computed from another version."""
+		known = set(self.fingerprint)
+		return [entry[0] for entry in fingerprint if entry not in known or entry[0] not in self.shards]
+
+	def updated(self, fingerprint: Fingerprint, computed: Dict[str, Dict[str, object]]) -> "CorpusStats":
+		"""Stats for ``fingerprint``: fresh aggregates for ``computed``, kept ones for the rest."""
+		shards: Dict[str, Dict[str, object]] = {}
+		for name, _, _ in fingerprint:
+			shards[name] = computed[name] if name in computed else self.shards[name]
+		return CorpusStats(shards, fingerprint)
+
+	def totals(self, splits: Optional[Iterable[str]] = None) -> Dict[str, object]:
+		wanted = None if splits is None else set(splits)
+		return merge_stats(
+			stats for name, stats in self.shards.items() if wanted is None or name.split("/", 1)[0] in wanted
+		)
+
+	def save(self, path: Path) -> None:
+		save_index_payload(path, {
+			"version": INDEX_VERSION,
+			"fingerprint": self.fingerprint,
+			"shards": self.shards,
+		})
+
+	@classmethod
+	def load(cls, path: Path) -> Optional["CorpusStats"]:
+		payload: Optional[Dict] = load_index_payload(path)
+		if payload is None:
+			return None
+		return cls(payload["shards"], [tuple(f) for f in payload["fingerprint"]])
@@ -0,0 +1,648 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Generator, Iterator, List, Optional, Tuple, Union
+
+from binary_store import CorpusStore, open_store
+from corpus_index import DialogueLocator, Fingerprint, SearchIndex, corpus_fingerprint, list_corpus_shards, tokenize
+from corpus_stats import CorpusStats
+from ingest import index_path, load_or_build_indexes, refresh_corpus_stats
+from matching import MATCH_MODES, compile_regex, trigram_index_for
+from near_dups import NearDuplicateIndex
+from result_cache import ResultCache, cache_key
+from serving import WORKERS, run_offloaded, stream_offloaded
+from state_query import StateIndex
+
+
+def get_data_root() -> Path:
+	# MULTIWOZ_DATA_ROOT points the explorer at another copy, e.g. the benchmark's synthetic corpus
+	if os.environ.get("MULTIWOZ_DATA_ROOT"):
+		return Path(os.environ["MULTIWOZ_DATA_ROOT"]).resolve()
+	current_file_path: Path = Path(__file__).resolve()
+	workspace_root: Path = current_file_path.parents[2]
+	return workspace_root / "multiwoz" / "data" / "MultiWOZ_2.2"
+
+
+DATA_ROOT: Path = get_data_root()
+SCHEMA_PATH: Path = DATA_ROOT / "schema.json"
+# Budget for parsed shards kept in memory, measured in on-disk JSON bytes.
+SHARD_CACHE_BUDGET_MB: int = int(os.environ.get("MULTIWOZ_SHARD_CACHE_MB", "256"))
+# Derived indexes live next to DATA_ROOT and are rebuilt in parallel when stale
+INDEX_PATHS: Dict[str, Path] = {kind: index_path(DATA_ROOT, kind) for kind in ("search", "locator", "state", "minhash")}
+# Written once by `python ingest.py --store`; used whenever present and up to date
+CORPUS_STORE_PATH: Path = index_path(DATA_ROOT, "store")
+# Per-shard aggregates behind the Statistics tab, refreshed shard by shard
+STATS_PATH: Path = index_path(DATA_ROOT, "stats")
+# Dialogues rendered per result page; searches stop as soon as a page is full
+PAGE_SIZE: int = int(os.environ.get("MULTIWOZ_PAGE_SIZE", "5"))
+# Streaming shard scans report progress every SCAN_STEP dialogues, throttled in time
+SCAN_STEP: int = 200
+# Dialogues fetched per page by run_query
+QUERY_PAGE_SIZE: int = 100
+# Result pages shared between users and requests; see ResultCache. Setting
+# MULTIWOZ_RESULT_CACHE_DIR also keeps them on disk across restarts.
+RESULT_CACHE_ENTRIES: int = int(os.environ.get("MULTIWOZ_RESULT_CACHE_ENTRIES", "256"))
+RESULT_CACHE_TTL_S: float = float(os.environ.get("MULTIWOZ_RESULT_CACHE_TTL_S", "900"))
+RESULT_CACHE_DIR: Optional[Path] = Path(os.environ["MULTIWOZ_RESULT_CACHE_DIR"]) if os.environ.get("MULTIWOZ_RESULT_CACHE_DIR") else None
+RESULT_CACHE: ResultCache = ResultCache(RESULT_CACHE_ENTRIES, RESULT_CACHE_TTL_S, RESULT_CACHE_DIR)
+
+
+def read_json(path: Path) -> dict:
+	with path.open("r", encoding="utf-8") as f:
+		return json.load(f)
+
+
+def load_services_from_schema(schema_path: Path) -> List[str]:
+	schema: List[Dict] = read_json(schema_path)
+	return [service["service_name"] for service in schema]
+
+
+def load_slots_from_schema(schema_path: Path) -> List[str]:
+	schema: List[Dict] = read_json(schema_path)
+	return [slot["name"] for service in schema for slot in service.get("slots", [])]
+
+
+def list_shards(split: str) -> List[Path]:
+	split_dir: Path = DATA_ROOT / split
+	shards: List[Path] = sorted(split_dir.glob("dialogues_*.json"))
+	return shards
+
+
+class ShardCache:
+	"""Process-wide LRU cache of parsed shards.
+
+	Entries are keyed by path and validated against the file's mtime and size,
+	so an edited shard is re-read on the next access. Each entry is charged its
+	on-disk size against ``budget_bytes``; least recently used shards are evicted
+	once the budget is exceeded (the most recent shard is always kept).
+	Returned lists are shared between callers and must not be mutated.
+	"""
+
+	def __init__(self, budget_bytes: int) -> None:
+		self.budget_bytes: int = budget_bytes
+		self.hits: int = 0
+		self.misses: int = 0
+		self.evictions: int = 0
+		self.invalidations: int = 0
+		self._entries: "OrderedDict[str, Tuple[Tuple[int, int], List[Dict]]]" = OrderedDict()
+		self._bytes: int = 0
+		self._lock = threading.Lock()
+		self._load_locks: Dict[str, threading.Lock] = {}
+
+	def _lookup(self, key: str, version: Tuple[int, int]) -> Optional[List[Dict]]:
+		# Caller holds self._lock
+		entry = self._entries.get(key)
+		if entry is None:
+			return None
+		if entry[0] != version:
+			self._entries.pop(key)
+			self._bytes -= entry[0][1]
+			self.invalidations += 1
+			return None
+		self._entries.move_to_end(key)
+		self.hits += 1
+		return entry[1]
+
+	def get(self, shard_path: Path) -> List[Dict]:
+		key: str = str(shard_path)
+		stat = shard_path.stat()
+		version: Tuple[int, int] = (stat.st_mtime_ns, stat.st_size)
+		with self._lock:
+			cached = self._lookup(key, version)
+			if cached is not None:
+				return cached
+			load_lock = self._load_locks.setdefault(key, threading.Lock())
+		# Only one thread parses a given shard; concurrent callers wait and reuse it
+		with load_lock:
+			with self._lock:
+				cached = self._lookup(key, version)
+				if cached is not None:
+					return cached
+			data: List[Dict] = read_json(shard_path)
+			with self._lock:
+				self.misses += 1
+				self._entries[key] = (version, data)
+				self._bytes += version[1]
+				while self._bytes > self.budget_bytes and len(self._entries) > 1:
+					_, (old_version, _) = self._entries.popitem(last=False)
+					self._bytes -= old_version[1]
+					self.evictions += 1
+		return data
+
+	def clear(self) -> None:
+		with self._lock:
+			self._entries.clear()
+			self._bytes = 0
+
+	def stats(self) -> Dict[str, int]:
+		with self._lock:
+			return {
+				"entries": len(self._entries),
+				"bytes": self._bytes,
+				"budget_bytes": self.budget_bytes,
+				"hits": self.hits,
+				"misses": self.misses,
+				"evictions": self.evictions,
+				"invalidations": self.invalidations,
+			}
+
+
+SHARD_CACHE: ShardCache = ShardCache(SHARD_CACHE_BUDGET_MB * 1024 * 1024)
+
+
+def load_dialogues_from_shard(shard_path: Path) -> List[Dict]:
+	data: List[Dict] = SHARD_CACHE.get(shard_path)
+	return data
+
+
+_corpus_indexes: Dict[str, object] = {}
+_corpus_indexes_lock = threading.Lock()
+
+
+def ensure_corpus_indexes(kinds: List[str]) -> Dict[str, object]:
+	"""Return the requested indexes, building missing or stale ones in one parallel pass."""
+	with _corpus_indexes_lock:
+		current: Fingerprint = corpus_fingerprint(DATA_ROOT, list_corpus_shards(DATA_ROOT))
+		stale: Dict[str, Path] = {
+			kind: INDEX_PATHS[kind]
+			for kind in kinds
+			if kind not in _corpus_indexes or _corpus_indexes[kind].fingerprint != current
+		}
+		if stale:
+			_corpus_indexes.update(load_or_build_indexes(DATA_ROOT, stale))
+		return {kind: _corpus_indexes[kind] for kind in kinds}
+
+
+def get_search_index() -> SearchIndex:
+	"""Return the corpus-wide search index, rebuilding it if any shard changed."""
+	return ensure_corpus_indexes(["search"])["search"]
+
+
+def get_dialogue_locator() -> DialogueLocator:
+	"""Return the corpus-wide dialogue_id -> byte span table."""
+	return ensure_corpus_indexes(["locator"])["locator"]
+
+
+def get_state_index() -> StateIndex:
+	"""Return the corpus-wide dialogue-state table."""
+	return ensure_corpus_indexes(["state"])["state"]
+
+
+def get_near_duplicate_index() -> NearDuplicateIndex:
+	"""Return the corpus-wide MinHash signatures of every dialogue."""
+	return ensure_corpus_indexes(["minhash"])["minhash"]
+
+
+_corpus_store: Optional[CorpusStore] = None
+
+
+def get_corpus_store() -> Optional[CorpusStore]:
+	"""Return the memory-mapped corpus store, or None if not converted or stale."""
+	global _corpus_store
+	with _corpus_indexes_lock:
+		current: Fingerprint = corpus_fingerprint(DATA_ROOT, list_corpus_shards(DATA_ROOT))
+		if _corpus_store is None or _corpus_store.fingerprint != current:
+			_corpus_store = open_store(CORPUS_STORE_PATH, DATA_ROOT)
+		return _corpus_store
+
+
+_corpus_stats: Optional[CorpusStats] = None
+
+
+def get_corpus_stats() -> CorpusStats:
+	"""Return the corpus statistics, recomputing only shards changed since the last call."""
+	global _corpus_stats
+	with _corpus_indexes_lock:
+		_corpus_stats = refresh_corpus_stats(DATA_ROOT, STATS_PATH, _corpus_stats)
+		return _corpus_stats
+
+
+def fetch_dialogues(dialogue_ids: List[str], full: bool = False) -> List[Dict]:
+	"""Decode just the requested dialogues, from the store or their byte spans, in order.
+
+	The store only holds previews (speakers and utterances); with ``full``
+	every dialogue is read from its byte span, frames and turn ids included.
+	"""
+	store: Optional[CorpusStore] = get_corpus_store() if not full else None
+	found: List[Dict] = []
+	for dialogue_id in dialogue_ids:
+		position: Optional[int] = store.find(dialogue_id) if store is not None else None
+		if position is not None:
+			found.append(store.dialogue_preview(position))
+			continue
+		dialogue: Optional[Dict] = get_dialogue_locator().fetch(DATA_ROOT, dialogue_id)
+		if dialogue is not None:
+			found.append(dialogue)
+	return found
+
+
+def list_dialogue_ids_from_shard(shard_path: Path) -> List[str]:
+	store: Optional[CorpusStore] = get_corpus_store()
+	if store is not None:
+		return [store.dialogue_ids[d] for d in store.shard_range(shard_path.parent.name, shard_path.name)]
+	data: List[Dict] = load_dialogues_from_shard(shard_path)
+	return [d.get("dialogue_id", "<unknown>") for d in data]
+
+
+def preload_shard_cache() -> int:
+	"""Parse shards into the cache, corpus order, until the next would exceed its budget."""
+	used: int = 0
+	loaded: int = 0
+	for shard_path in list_corpus_shards(DATA_ROOT):
+		used += shard_path.stat().st_size
+		if used > SHARD_CACHE.budget_bytes:
+			break
+		load_dialogues_from_shard(shard_path)
+		loaded += 1
+	return loaded
+
+
+def format_dialogue_markdown(dialogue: Dict) -> str:
+	dialogue_id: str = dialogue.get("dialogue_id", "<unknown>")
+	services: List[str] = dialogue.get("services", [])
+	turns: List[Dict] = dialogue.get("turns", [])
+
+	lines: List[str] = []
+	lines.append(f"### {dialogue_id}")
+	if services:
+		lines.append(f"Services: {', '.join(services)}")
+	lines.append("")
+	for turn in turns:
+		speaker: str = turn.get("speaker", "?")
+		utterance: str = turn.get("utterance", "")
+		lines.append(f"**{speaker}**: {utterance}")
+	return "\n".join(lines)
+
+
+def fuzzy_groups(keyword: str, max_edits: int) -> List[FrozenSet[str]]:
+	"""Corpus words within ``max_edits`` of each keyword token (trigram-prefiltered)."""
+	search_index: SearchIndex = get_search_index()
+	trigram_index = trigram_index_for(search_index, search_index.vocabulary)
+	return [trigram_index.similar(token, max_edits) for token in tokenize(keyword)]
+
+
+def keyword_matcher(keyword: Optional[str], mode: str, max_edits: int = 1) -> Optional[Callable[[str], bool]]:
+	"""Predicate over a dialogue's joined utterances for a keyword in ``mode``.
+
+	Returns None when there is nothing to match. Regex patterns are compiled
+	once and cached; fuzzy mode requires every keyword word to appear with at
+	most ``max_edits`` typos. Raises ``ValueError`` for an invalid regex.
+	"""
+	if not keyword:
+		return None
+	if mode == "Regex":
+		pattern = compile_regex(keyword)
+		return lambda text: pattern.search(text) is not None
+	if mode == "Fuzzy":
+		groups: List[FrozenSet[str]] = fuzzy_groups(keyword, max_edits)
+
+		def fuzzy_match(text: str) -> bool:
+			tokens = set(tokenize(text))
+			return bool(groups) and all(not group.isdisjoint(tokens) for group in groups)
+
+		return fuzzy_match
+	keyword_lower: str = keyword.lower()
+	return lambda text: keyword_lower in text.lower()
+
+
+def dialogue_matches(
+	dlg: Dict,
+	service_filter_lower: Optional[str],
+	keyword_lower: Optional[str],
+	text_matcher: Optional[Callable[[str], bool]] = None,
+) -> bool:
+	services: List[str] = [s.lower() for s in dlg.get("services", [])]
+	if service_filter_lower and service_filter_lower not in services:
+		return False
+	if text_matcher is not None:
+		return text_matcher("\n".join(turn.get("utterance", "") for turn in dlg.get("turns", [])))
+	if keyword_lower:
+		text_joined: str = "\n".join(
+			turn.get("utterance", "") for turn in dlg.get("turns", [])
+		).lower()
+		if keyword_lower not in text_joined:
+			return False
+	return True
+
+
+def filter_dialogues(
+	dialogues: List[Dict],
+	service_filter: Optional[str],
+	keyword: Optional[str],
+	limit: int,
+) -> Tuple[List[Dict], List[str]]:
+	service_filter_lower: Optional[str] = service_filter.lower() if service_filter else None
+	keyword_lower: Optional[str] = keyword.lower() if keyword else None
+
+	filtered: List[Dict] = []
+	for dlg in dialogues:
+		if not dialogue_matches(dlg, service_filter_lower, keyword_lower):
+			continue
+		filtered.append(dlg)
+		if len(filtered) >= limit:
+			break
+
+	markdown_chunks: List[str] = [format_dialogue_markdown(d) for d in filtered]
+	return filtered, markdown_chunks
+
+
+def scan_shard_steps(
+	split: str,
+	shard_name: str,
+	service_filter: Optional[str],
+	keyword: Optional[str],
+	start: int,
+	count: int,
+	mode: str = MATCH_MODES[0],
+	max_edits: int = 1,
+	full: bool = False,
+) -> Iterator[Tuple[List[Dict], int, int, Optional[int], bool]]:
+	"""Scan one shard from position ``start`` until ``count`` matches are found.
+
+	Yields ``(matches so far, position, shard size, resume position, done)``
+	after every match and every ``SCAN_STEP`` dialogues; the last item has
+	``done`` set and a resume position of None once the shard is exhausted.
+	Matches read from the corpus store are previews unless ``full``.
+	"""
+	found: List[Dict] = []
+	resume: Optional[int] = None
+	text_matcher: Optional[Callable[[str], bool]] = (
+		keyword_matcher(keyword, mode, max_edits) if mode != MATCH_MODES[0] else None
+	)
+	store: Optional[CorpusStore] = get_corpus_store()
+	if store is not None:
+		shard_range: range = store.shard_range(split, shard_name)
+		total: int = len(shard_range)
+		position: int = start
+		while position < total and resume is None:
+			step: range = shard_range[position: position + SCAN_STEP]
+			for d in store.filter(step, service_filter, keyword, count - len(found), text_matcher):
+				found.extend(fetch_dialogues([store.dialogue_ids[d]], full=True) if full else [store.dialogue_preview(d)])
+				if len(found) >= count:
+					resume = d - shard_range.start + 1
+			position = resume if resume is not None else position + len(step)
+			yield found, position, total, None, False
+	else:
+		dialogues: List[Dict] = load_dialogues_from_shard(DATA_ROOT / split / shard_name)
+		total = len(dialogues)
+		service_filter_lower: Optional[str] = service_filter.lower() if service_filter else None
+		keyword_lower: Optional[str] = keyword.lower() if keyword else None
+		for position in range(start, total):
+			if dialogue_matches(dialogues[position], service_filter_lower, keyword_lower, text_matcher):
+				found.append(dialogues[position])
+				if len(found) >= count:
+					resume = position + 1
+					break
+				yield found, position + 1, total, None, False
+			elif (position + 1 - start) % SCAN_STEP == 0:
+				yield found, position + 1, total, None, False
+	yield found, total if resume is None else resume, total, (resume if resume is not None and resume < total else None), True
+
+
+def scan_shard_page(
+	split: str,
+	shard_name: str,
+	service_filter: Optional[str],
+	keyword: Optional[str],
+	start: int,
+	count: int,
+	mode: str = MATCH_MODES[0],
+	max_edits: int = 1,
+	full: bool = False,
+) -> Tuple[List[Dict], Optional[int]]:
+	"""Blocking form of ``scan_shard_steps``: the page's matches and where to resume."""
+	for found, _, _, resume, done in scan_shard_steps(
+		split, shard_name, service_filter, keyword, start, count, mode, max_edits, full
+	):
+		if done:
+			return found, resume
+	return [], None
+
+
+def scan_corpus_regex_page(
+	service_filter: Optional[str],
+	pattern: str,
+	start: int,
+	count: int,
+	full: bool = False,
+) -> Tuple[List[Dict], Optional[int]]:
+	"""Regex over every dialogue (of the domain) in corpus order, from position ``start``.
+
+	Texts come from the corpus store when present, else from byte spans; the
+	scan stops once ``count`` dialogues match. Matches read from the store are
+	previews unless ``full``.
+	"""
+	text_matcher: Optional[Callable[[str], bool]] = keyword_matcher(pattern, "Regex")
+	search_index: SearchIndex = get_search_index()
+	candidates: List[int] = search_index.search(None, service_filter)
+	store: Optional[CorpusStore] = get_corpus_store()
+	found: List[Dict] = []
+	for position in range(start, len(candidates)):
+		dialogue_id: str = search_index.docs[candidates[position]][0]
+		d: Optional[int] = store.find(dialogue_id) if store is not None else None
+		if d is not None:
+			if text_matcher(store.dialogue_text(d)):
+				found.extend(fetch_dialogues([dialogue_id], full=True) if full else [store.dialogue_preview(d)])
+		else:
+			dialogue: Optional[Dict] = get_dialogue_locator().fetch(DATA_ROOT, dialogue_id)
+			if dialogue is not None and dialogue_matches(dialogue, None, None, text_matcher):
+				found.append(dialogue)
+		if len(found) >= count:
+			return found, (position + 1 if position + 1 < len(candidates) else None)
+	return found, None
+
+
+def new_result_cursor(kind: str, params: Dict, limit: int, page_size: int = PAGE_SIZE, full: bool = False) -> Dict:
+	"""Stable cursor kept in gr.State: the query plus where each visited page starts.
+
+	Pages hold store previews (speakers and utterances) unless ``full``, which
+	reads every result from the shards, frames and turn ids included.
+	"""
+	cursor: Dict = {"kind": kind, "params": params, "limit": int(limit), "page": 0, "page_starts": [0], "page_size": page_size}
+	if full:
+		cursor["full"] = True
+	return cursor
+
+
+def result_page_key(cursor: Dict) -> str:
+	"""Cache key of a cursor's visible page: the normalized query and page, plus the corpus fingerprint.
+
+	Keywords match case-insensitively except as regexes, and the typo limit
+	only matters to fuzzy matching, so both are normalized away where unused.
+	"""
+	params: Dict = dict(cursor["params"])
+	mode: str = params.get("mode", MATCH_MODES[0])
+	if "keyword" in params and mode != "Regex":
+		params["keyword"] = (params["keyword"] or "").lower()
+	if "max_edits" in params and mode != "Fuzzy":
+		params["max_edits"] = 0
+	page: int = cursor["page"]
+	query: Dict = {
+		"kind": cursor["kind"],
+		"params": params,
+		"limit": cursor["limit"],
+		"page_size": cursor.get("page_size", PAGE_SIZE),
+		"page": page,
+		"start": cursor["page_starts"][page],
+		"full": cursor.get("full", False),
+	}
+	return cache_key("page", query, corpus_fingerprint(DATA_ROOT, list_corpus_shards(DATA_ROOT)))
+
+
+def fetch_result_page(cursor: Dict) -> Tuple[Optional[str], List[Dict], Optional[int]]:
+	"""Only the visible page of a cursor: (header, dialogues, next page start).
+
+	Pages come from ``RESULT_CACHE`` when the same page of the same query was
+	computed since the corpus last changed; identical requests in flight share
+	one computation.
+	"""
+	if scans_corpus(cursor):
+		compute: Callable[[], Tuple[Optional[str], List[Dict], Optional[int]]] = lambda: run_offloaded(_compute_result_page, cursor)
+	else:
+		compute = lambda: _compute_result_page(cursor)
+	header, found, resume = RESULT_CACHE.get_or_compute(result_page_key(cursor), compute)
+	return header, found, resume
+
+
+def scans_corpus(cursor: Dict) -> bool:
+	"""Whether a cursor's pages are computed by scanning dialogues rather than read off an index.
+
+	Those pages run in the worker processes when ``MULTIWOZ_SEARCH_WORKERS`` is set.
+	"""
+	params: Dict = cursor["params"]
+	return cursor["kind"] == "shard" or (cursor["kind"] == "all" and params.get("mode") == "Regex" and bool(params["keyword"]))
+
+
+def stream_shard_result_page(
+	cursor: Dict,
+) -> Generator[Union[str, Tuple[List[Dict], int, int]], None, Tuple[Optional[str], List[Dict], Optional[int]]]:
+	"""Generator form of ``fetch_result_page`` for shard cursors, sharing its cache entries.
+
+	Yields (matches so far, position, shard size) while scanning, or a status
+	line while an identical scan in flight is awaited or the scan runs in a
+	worker process; returns the page.
+	"""
+	page: int = cursor["page"]
+	page_size: int = cursor.get("page_size", PAGE_SIZE)
+	params: Dict = cursor["params"]
+
+	def scan() -> Generator[Tuple[List[Dict], int, int], None, Tuple[Optional[str], List[Dict], Optional[int]]]:
+		found: List[Dict] = []
+		resume: Optional[int] = None
+		for found, position, total, resume, done in scan_shard_steps(
+			params["split"], params["shard"], params["service"], params["keyword"], cursor["page_starts"][page],
+			min(page_size, cursor["limit"] - page * page_size), params.get("mode", MATCH_MODES[0]), params.get("max_edits", 1),
+			cursor.get("full", False),
+		):
+			if done:
+				break
+			yield found, position, total
+		if (page + 1) * page_size >= cursor["limit"]:
+			resume = None
+		return None, found, resume
+
+	def offloaded() -> Generator[str, None, Tuple[Optional[str], List[Dict], Optional[int]]]:
+		return stream_offloaded(_compute_result_page, cursor, waiting=f"⏳ Scanning {params['split']}/{params['shard']} in a worker process…")
+
+	header, found, resume = yield from RESULT_CACHE.stream(
+		result_page_key(cursor), offloaded if WORKERS > 0 else scan, "⏳ Waiting for an identical search that is already running…",
+	)
+	return header, found, resume
+
+
+def _compute_result_page(cursor: Dict) -> Tuple[Optional[str], List[Dict], Optional[int]]:
+	page: int = cursor["page"]
+	page_size: int = cursor.get("page_size", PAGE_SIZE)
+	start: int = cursor["page_starts"][page]
+	count: int = min(page_size, cursor["limit"] - page * page_size)
+	params: Dict = cursor["params"]
+	full: bool = cursor.get("full", False)
+	header: Optional[str] = None
+	if cursor["kind"] == "shard":
+		found, resume = scan_shard_page(
+			params["split"], params["shard"], params["service"], params["keyword"], start, count,
+			params.get("mode", MATCH_MODES[0]), params.get("max_edits", 1), full,
+		)
+	elif cursor["kind"] == "all" and params.get("mode") == "Regex" and params["keyword"]:
+		found, resume = scan_corpus_regex_page(params["service"], params["keyword"], start, count, full)
+		header = f"Dialogues matching /{params['keyword']}/ across all splits."
+	else:
+		if cursor["kind"] == "all":
+			search_index: SearchIndex = get_search_index()
+			if params.get("mode") == "Fuzzy" and params["keyword"]:
+				groups: List[FrozenSet[str]] = fuzzy_groups(params["keyword"], params.get("max_edits", 1))
+				matches: List[int] = search_index.search_any_of(groups, params["service"])
+				spellings: str = "; ".join(", ".join(sorted(group)) or "—" for group in groups)
+				header = f"Found {len(matches)} dialogues across all splits (matched: {spellings})."
+			else:
+				matches = search_index.search(params["keyword"], params["service"])
+				header = f"Found {len(matches)} dialogues across all splits."
+			ids: List[str] = [search_index.docs[doc][0] for doc in matches[start: start + count]]
+		else:
+			state_index: StateIndex = get_state_index()
+			matches = state_index.query(params["query"], known_slots=load_slots_from_schema(SCHEMA_PATH))
+			ids = [state_index.dialogue_ids[doc] for doc in matches[start: start + count]]
+			header = f"{len(matches)} dialogues match `{params['query']}`."
+		found = fetch_dialogues(ids, full)
+		resume = start + count if start + count < len(matches) else None
+	if (page + 1) * page_size >= cursor["limit"]:
+		resume = None
+	return header, found, resume
+
+
+def new_query(
+	keyword: Optional[str] = None,
+	service: Optional[str] = None,
+	scope: str = "all",
+	split: Optional[str] = None,
+	shard: Optional[str] = None,
+	mode: str = MATCH_MODES[0],
+	max_edits: int = 1,
+	state: Optional[str] = None,
+	limit: int = 100,
+	page_size: int = QUERY_PAGE_SIZE,
+	full: bool = False,
+) -> Dict:
+	"""Result cursor for a search, as the UI builds it, without the UI.
+
+	``scope`` is ``"all"`` (the inverted index over every split) or ``"shard"``
+	(a scan of ``shard`` in ``split``, its first shard by default). A ``state``
+	query takes precedence over keyword and service. With ``full`` the results
+	are complete dialogues rather than previews. Raises ``ValueError`` for
+	an unknown mode or scope, an invalid regex or a missing split or shard.
+	"""
+	if mode not in MATCH_MODES:
+		raise ValueError(f"unknown match mode '{mode}' (expected one of: {', '.join(MATCH_MODES)})")
+	if keyword and mode == "Regex":
+		compile_regex(keyword)
+	if state:
+		return new_result_cursor("state", {"query": state.strip()}, limit, page_size, full)
+	match: Dict = {"mode": mode, "max_edits": int(max_edits)}
+	if scope == "all":
+		return new_result_cursor("all", {"service": service or "", "keyword": keyword or "", **match}, limit, page_size, full)
+	if scope != "shard":
+		raise ValueError(f"unknown scope '{scope}' (expected 'all' or 'shard')")
+	shards: List[Path] = list_shards(split) if split else []
+	if not shards:
+		raise ValueError(f"no shards found for split '{split}'")
+	if shard and shard not in {p.name for p in shards}:
+		raise ValueError(f"no shard '{shard}' in split '{split}'")
+	params: Dict = {"split": split, "shard": shard or shards[0].name, "service": service or "", "keyword": keyword or "", **match}
+	return new_result_cursor("shard", params, limit, page_size, full)
+
+
+def run_query(cursor: Dict) -> Iterator[Dict]:
+	"""Stream every dialogue of a cursor up to its limit, one page at a time.
+
+	Index-backed queries decode only the dialogues they return; shard scans
+	resume where the previous page stopped. Indexes, the corpus store and the
+	shard cache stay warm for the next query in the same process.
+	"""
+	while True:
+		_, found, resume = fetch_result_page(cursor)
+		yield from found
+		if resume is None:
+			return
+		cursor = dict(cursor, page=cursor["page"] + 1, page_starts=cursor["page_starts"][: cursor["page"] + 1] + [resume])
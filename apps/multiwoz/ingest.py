@@ -0,0 +1,202 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from binary_store import CorpusStore, extract_store_rows, write_store
+from corpus_stats import CorpusStats, extract_shard_stats
+from corpus_index import (
+	DialogueLocator,
+	Fingerprint,
+	SearchIndex,
+	corpus_fingerprint,
+	extract_search_terms,
+	list_corpus_shards,
+	parse_shard_with_spans,
+	read_shard,
+)
+from near_dups import NearDuplicateIndex, extract_minhash_rows
+from state_query import StateIndex, extract_state_rows
+
+# Everything that can be derived from the shards, and the file each one lives in
+# next to the data root
+INDEX_FILES: Dict[str, str] = {
+	"search": "search_index.json.gz",
+	"locator": "id_index.json.gz",
+	"state": "state_index.json.gz",
+	"minhash": "minhash_index.json.gz",
+	"stats": "stats.json.gz",
+	"store": "corpus.bin",
+}
+INDEX_CLASSES = {"search": SearchIndex, "locator": DialogueLocator, "state": StateIndex, "minhash": NearDuplicateIndex}
+
+
+def index_path(data_root: Path, kind: str) -> Path:
+	return data_root.parent / f"{data_root.name}.{INDEX_FILES[kind]}"
+
+
+def default_workers() -> int:
+	configured: int = int(os.environ.get("MULTIWOZ_INGEST_WORKERS", "0"))
+	return configured if configured > 0 else (os.cpu_count() or 1)
+
+
+def ingest_shard(job: Tuple[str, Tuple[str, ...]]) -> Dict[str, object]:
+	"""Parse one shard and reduce it to the compact per-shard rows of each kind.
+
+	Runs in a worker process; only these rows (tuples of str/int) are pickled
+	back, never the parsed dialogue dicts.
+	"""
+	shard, kinds = job
+	shard_path: Path = Path(shard)
+	spans: Optional[List[Tuple[str, int, int]]] = None
+	if "locator" in kinds:
+		dialogues, spans = parse_shard_with_spans(shard_path)
+	else:
+		dialogues = read_shard(shard_path)
+	result: Dict[str, object] = {}
+	if "search" in kinds:
+		result["search"] = extract_search_terms(dialogues)
+	if "locator" in kinds:
+		result["locator"] = spans
+	if "state" in kinds:
+		result["state"] = extract_state_rows(dialogues)
+	if "minhash" in kinds:
+		result["minhash"] = extract_minhash_rows(dialogues)
+	if "store" in kinds:
+		result["store"] = extract_store_rows(dialogues)
+	if "stats" in kinds:
+		result["stats"] = extract_shard_stats(dialogues)
+	return result
+
+
+def ingest_shards(shards: Sequence[Path], kinds: Iterable[str], workers: Optional[int] = None) -> List[Dict[str, object]]:
+	"""Run ``ingest_shard`` over ``shards`` on a process pool, results in input order."""
+	kinds = tuple(kinds)
+	jobs: List[Tuple[str, Tuple[str, ...]]] = [(str(shard), kinds) for shard in shards]
+	workers = min(workers or default_workers(), len(jobs))
+	if workers <= 1:
+		return [ingest_shard(job) for job in jobs]
+	with ProcessPoolExecutor(max_workers=workers) as pool:
+		return list(pool.map(ingest_shard, jobs))
+
+
+def ingest_corpus(
+	data_root: Path,
+	kinds: Iterable[str],
+	workers: Optional[int] = None,
+) -> Tuple[List[Path], Fingerprint, Dict[str, List[object]]]:
+	"""Fan shard parsing out over a process pool and collect per-shard rows in corpus order."""
+	shards: List[Path] = list_corpus_shards(data_root)
+	fingerprint: Fingerprint = corpus_fingerprint(data_root, shards)
+	kinds = tuple(kinds)
+	per_shard: List[Dict[str, object]] = ingest_shards(shards, kinds, workers)
+	return shards, fingerprint, {kind: [rows[kind] for rows in per_shard] for kind in kinds}
+
+
+def build_indexes(
+	data_root: Path,
+	paths: Dict[str, Path],
+	workers: Optional[int] = None,
+) -> Dict[str, object]:
+	"""Build every requested kind from a single parallel pass and persist it."""
+	shards, fingerprint, merged = ingest_corpus(data_root, paths, workers)
+	built: Dict[str, object] = {}
+	if "search" in merged:
+		built["search"] = SearchIndex.from_shard_terms(shards, merged["search"], fingerprint)
+	if "locator" in merged:
+		built["locator"] = DialogueLocator.from_shard_spans(shards, merged["locator"], fingerprint)
+	if "state" in merged:
+		built["state"] = StateIndex.from_shard_rows(merged["state"], fingerprint)
+	if "minhash" in merged:
+		built["minhash"] = NearDuplicateIndex.from_shard_rows(shards, merged["minhash"], fingerprint)
+	for kind, index in built.items():
+		try:
+			index.save(paths[kind])
+		except OSError:
+			pass  # read-only data dir: keep the in-memory index
+	if "store" in merged:
+		shard_names: List[str] = [s.relative_to(data_root).as_posix() for s in shards]
+		write_store(paths["store"], shard_names, merged["store"], fingerprint)
+		built["store"] = CorpusStore(paths["store"])
+	return built
+
+
+def load_or_build_indexes(
+	data_root: Path,
+	paths: Dict[str, Path],
+	workers: Optional[int] = None,
+) -> Dict[str, object]:
+	"""Load each persisted kind that still matches the shards; rebuild the rest together."""
+	fingerprint: Fingerprint = corpus_fingerprint(data_root, list_corpus_shards(data_root))
+	loaded: Dict[str, object] = {}
+	for kind, path in paths.items():
+		if not path.exists():
+			continue
+		try:
+			index = CorpusStore(path) if kind == "store" else INDEX_CLASSES[kind].load(path)
+		except (OSError, ValueError, KeyError):
+			index = None  # unreadable or older layout: rebuild
+		if index is not None and index.fingerprint == fingerprint:
+			loaded[kind] = index
+	stale: Dict[str, Path] = {kind: path for kind, path in paths.items() if kind not in loaded}
+	if stale:
+		loaded.update(build_indexes(data_root, stale, workers))
+	return loaded
+
+
+def refresh_corpus_stats(
+	data_root: Path,
+	path: Path,
+	current: Optional[CorpusStats] = None,
+	workers: Optional[int] = None,
+) -> CorpusStats:
+	"""Bring the per-shard statistics up to date, re-reading only shards that changed."""
+	fingerprint: Fingerprint = corpus_fingerprint(data_root, list_corpus_shards(data_root))
+	stats: Optional[CorpusStats] = current
+	if stats is None and path.exists():
+		try:
+			stats = CorpusStats.load(path)
+		except (OSError, ValueError, KeyError):
+			stats = None  # unreadable or older layout: recompute
+	if stats is None:
+		stats = CorpusStats({}, [])
+	if stats.fingerprint == fingerprint:
+		return stats
+	stale: List[str] = stats.stale_shards(fingerprint)
+	computed: List[Dict[str, object]] = ingest_shards([data_root / name for name in stale], ("stats",), workers)
+	stats = stats.updated(fingerprint, {name: rows["stats"] for name, rows in zip(stale, computed)})
+	try:
+		stats.save(path)
+	except OSError:
+		pass  # read-only data dir: keep the in-memory stats
+	return stats
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+	default_root: Path = Path(os.environ.get("MULTIWOZ_DATA_ROOT") or Path(__file__).resolve().parents[2] / "multiwoz" / "data" / "MultiWOZ_2.2")
+	parser = argparse.ArgumentParser(description="Build MultiWOZ 2.2 indexes (and optionally the binary store).")
+	parser.add_argument("--data-root", type=Path, default=default_root)
+	parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+	parser.add_argument("--store", action="store_true", help="also write the memory-mapped corpus store")
+	parser.add_argument("--force", action="store_true", help="rebuild even if up to date")
+	args = parser.parse_args(argv)
+	kinds: List[str] = ["search", "locator", "state", "minhash"] + (["store"] if args.store else [])
+	paths: Dict[str, Path] = {kind: index_path(args.data_root, kind) for kind in kinds}
+	started: float = time.perf_counter()
+	build = build_indexes if args.force else load_or_build_indexes
+	built: Dict[str, object] = build(args.data_root, paths, args.workers)
+	stats_path: Path = index_path(args.data_root, "stats")
+	refresh_corpus_stats(args.data_root, stats_path, CorpusStats({}, []) if args.force else None, args.workers)
+	elapsed: float = time.perf_counter() - started
+	for kind in kinds:
+		print(f"{kind}: {paths[kind]}")
+	print(f"stats: {stats_path}")
+	print(f"Ready in {elapsed:.2f}s ({len(built) + 1} artifacts, workers={args.workers or default_workers()})")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
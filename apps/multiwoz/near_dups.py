@@ -0,0 +1,117 @@
+import base64
+import sys
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from corpus_index import (
+	INDEX_VERSION,
+	Fingerprint,
+	load_index_payload,
+	save_index_payload,
+	tokenize,
+)
+from minhash import NUM_HASHES, lsh_clusters, minhash, signature_similarity
+
+
+def extract_minhash_rows(dialogues: List[Dict]) -> List[Tuple[str, bytes]]:
+	"""Reduce a parsed shard to (dialogue_id, MinHash signature bytes) rows."""
+	rows: List[Tuple[str, bytes]] = []
+	for dlg in dialogues:
+		tokens: List[str] = []
+		for turn in dlg.get("turns", []):
+			tokens.extend(tokenize(turn.get("utterance", "")))
+		rows.append((dlg.get("dialogue_id", "<unknown>"), minhash(tokens).tobytes()))
+	return rows
+
+
+class NearDuplicateIndex:
+	"""MinHash signatures of every MultiWOZ dialogue, clustered with LSH on demand.
+
+	Dialogues are numbered in corpus order. ``signatures`` holds ``NUM_HASHES``
+	values per dialogue; the fraction of equal values estimates the Jaccard
+	similarity of two dialogues' shingle sets. Dialogues sharing all values of
+	any band land in the same bucket, so only bucket-mates are ever compared
+	instead of every pair.
+	"""
+
+	def __init__(
+		self,
+		docs: List[Tuple[str, str]],
+		signatures: array,
+		fingerprint: Fingerprint,
+	) -> None:
+		self.docs = docs  # (dialogue_id, split)
+		self.signatures = signatures
+		self.fingerprint = fingerprint
+		self._clusters: Dict[float, List[List[int]]] = {}
+		self._lock = threading.Lock()
+
+	def __len__(self) -> int:
+		return len(self.docs)
+
+	@classmethod
+	def from_shard_rows(
+		cls,
+		shards: Sequence[Path],
+		per_shard: Sequence[List[Tuple[str, bytes]]],
+		fingerprint: Fingerprint,
+	) -> "NearDuplicateIndex":
+		docs: List[Tuple[str, str]] = []
+		signatures = array("I")
+		for shard, rows in zip(shards, per_shard):
+			for dialogue_id, signature in rows:
+				docs.append((dialogue_id, shard.parent.name))
+				signatures.frombytes(signature)
+		return cls(docs, signatures, fingerprint)
+
+	def save(self, path: Path) -> None:
+		save_index_payload(path, {
+			"version": INDEX_VERSION,
+			"fingerprint": self.fingerprint,
+			"docs": self.docs,
+			"num_hashes": NUM_HASHES,
+			"byteorder": sys.byteorder,
+			"signatures": base64.b64encode(self.signatures.tobytes()).decode("ascii"),
+		})
+
+	@classmethod
+	def load(cls, path: Path) -> Optional["NearDuplicateIndex"]:
+		payload: Optional[Dict] = load_index_payload(path)
+		if payload is None or payload.get("num_hashes") != NUM_HASHES:
+			return None
+		signatures = array("I")
+		signatures.frombytes(base64.b64decode(payload["signatures"]))
+		if payload["byteorder"] != sys.byteorder:
+			signatures.byteswap()
+		return cls(
+			[tuple(d) for d in payload["docs"]],
+			signatures,
+			[tuple(f) for f in payload["fingerprint"]],
+		)
+
+	def signature(self, doc: int) -> array:
+		return self.signatures[doc * NUM_HASHES: (doc + 1) * NUM_HASHES]
+
+	def similarity(self, a: int, b: int) -> float:
+		"""Estimated Jaccard similarity of two dialogues' shingle sets."""
+		return signature_similarity(self.signatures, a, b)
+
+	def clusters(self, threshold: float) -> List[List[int]]:
+		"""Groups of dialogues linked by an estimated similarity of at least ``threshold``.
+
+		Largest clusters first; members in corpus order (see ``lsh_clusters``).
+		"""
+		threshold = round(threshold, 2)
+		with self._lock:
+			cached: Optional[List[List[int]]] = self._clusters.get(threshold)
+		if cached is not None:
+			return cached
+		found: List[List[int]] = lsh_clusters(self.signatures, len(self.docs), threshold)
+		with self._lock:
+			self._clusters[threshold] = found
+		return found
+
+	def splits_of(self, cluster: Iterable[int]) -> List[str]:
+		return sorted({self.docs[doc][1] for doc in cluster})
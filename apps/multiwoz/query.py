@@ -0,0 +1,134 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from engine import format_dialogue_markdown, new_query, run_query
+from matching import MATCH_MODES
+
+# Keys a batch line may set; anything missing falls back to the command line
+SPEC_KEYS: Tuple[str, ...] = ("keyword", "service", "scope", "split", "shard", "mode", "max_edits", "state", "limit")
+FORMATS: Tuple[str, ...] = ("jsonl", "ids", "markdown")
+
+
+def resolve_mode(mode: str) -> str:
+	for name in MATCH_MODES:
+		if mode.lower() == name.lower():
+			return name
+	raise ValueError(f"unknown mode '{mode}' (expected one of: {', '.join(m.lower() for m in MATCH_MODES)})")
+
+
+def query_from_spec(spec: Dict, defaults: argparse.Namespace) -> Dict:
+	"""Result cursor for one batch line (or the command line alone), defaults filled from ``defaults``."""
+	unknown: List[str] = sorted(set(spec) - set(SPEC_KEYS))
+	if unknown:
+		raise ValueError(f"unknown keys: {', '.join(unknown)}")
+	values: Dict = {key: spec.get(key, getattr(defaults, key)) for key in SPEC_KEYS}
+	values["mode"] = resolve_mode(values["mode"])
+	# JSONL writes whole records; ids and markdown only need the store's previews
+	return new_query(**values, full=defaults.format == "jsonl")
+
+
+def format_result(dialogue: Dict, fmt: str, number: Optional[int] = None) -> str:
+	"""One output record; ``number`` tags records of a batch written to a single stream."""
+	if fmt == "ids":
+		dialogue_id: str = dialogue.get("dialogue_id", "")
+		return dialogue_id if number is None else f"{number}\t{dialogue_id}"
+	if fmt == "markdown":
+		text: str = format_dialogue_markdown(dialogue)
+		return (text if number is None else f"<!-- query {number} -->\n{text}") + "\n\n---\n"
+	row: Dict = dialogue if number is None else {"query": number, "dialogue": dialogue}
+	return json.dumps(row, ensure_ascii=False)
+
+
+def iter_specs(batch: str) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+	"""(line number, spec or None, parse error or None) for each non-blank batch line."""
+	stream: TextIO = sys.stdin if batch == "-" else open(batch, encoding="utf-8")
+	try:
+		for number, line in enumerate(stream, start=1):
+			if not line.strip():
+				continue
+			try:
+				spec = json.loads(line)
+			except ValueError as e:
+				yield number, None, f"invalid JSON: {e}"
+				continue
+			if not isinstance(spec, dict):
+				yield number, None, "expected a JSON object"
+				continue
+			yield number, spec, None
+	finally:
+		if stream is not sys.stdin:
+			stream.close()
+
+
+def write_results(cursor: Dict, out: TextIO, fmt: str, number: Optional[int] = None) -> int:
+	count: int = 0
+	for dialogue in run_query(cursor):
+		out.write(format_result(dialogue, fmt, number) + "\n")
+		count += 1
+	return count
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+	parser = argparse.ArgumentParser(description="Run MultiWOZ 2.2 explorer searches without the UI and stream the matches.")
+	parser.add_argument("--keyword", default=None)
+	parser.add_argument("--service", default=None, help="domain filter, e.g. hotel")
+	parser.add_argument("--scope", choices=("all", "shard"), default="all", help="every split via the index, or one shard")
+	parser.add_argument("--split", default="train", help="shard scope: split to scan")
+	parser.add_argument("--shard", default=None, help="shard scope: shard file (default: the split's first)")
+	parser.add_argument("--mode", default="substring", help="substring, regex or fuzzy")
+	parser.add_argument("--max-edits", type=int, default=1, help="fuzzy mode: typos allowed per word")
+	parser.add_argument("--state", default=None, help="dialogue-state query, e.g. 'restaurant-food = italian'")
+	parser.add_argument("--limit", type=int, default=100, help="dialogues per query")
+	parser.add_argument("--format", choices=FORMATS, default="jsonl")
+	parser.add_argument("--batch", help="JSONL file of queries ('-' for stdin)")
+	parser.add_argument("--output", type=Path, help="write results here instead of stdout")
+	parser.add_argument("--output-dir", type=Path, help="batch: write each query's results to <dir>/<line>.<format>")
+	args = parser.parse_args(argv)
+
+	out: TextIO = args.output.open("w", encoding="utf-8") if args.output else sys.stdout
+	try:
+		if not args.batch:
+			try:
+				cursor: Dict = query_from_spec({}, args)
+			except ValueError as e:
+				parser.error(str(e))
+			write_results(cursor, out, args.format)
+			return 0
+		if args.output_dir is not None:
+			args.output_dir.mkdir(parents=True, exist_ok=True)
+		started: float = time.perf_counter()
+		queries: int = 0
+		results: int = 0
+		failures: int = 0
+		for number, spec, error in iter_specs(args.batch):
+			queries += 1
+			try:
+				if error is not None:
+					raise ValueError(error)
+				cursor = query_from_spec(spec, args)
+				if args.output_dir is None:
+					results += write_results(cursor, out, args.format, number)
+				else:
+					with (args.output_dir / f"{number:06d}.{args.format}").open("w", encoding="utf-8") as f:
+						results += write_results(cursor, f, args.format)
+			except Exception as e:
+				failures += 1
+				print(f"query {number}: {e}", file=sys.stderr, flush=True)
+		elapsed: float = time.perf_counter() - started
+		print(
+			f"{queries} queries, {results} results, {failures} failed in {elapsed:.2f}s"
+			f" ({queries / max(elapsed, 1e-6):,.0f} queries/s)",
+			file=sys.stderr,
+		)
+		return 1 if failures else 0
+	finally:
+		if out is not sys.stdout:
+			out.close()
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,86 @@
+# Shared by the explorers under apps/: edit the copy in apps/multiwoz, then run
+# scripts/sync_shared_modules.py to regenerate the others.
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Generator, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Environment variables are <ENV_PREFIX>SEARCH_WORKERS, <ENV_PREFIX>QUEUE_MAX_SIZE, and so on
+ENV_PREFIX: str = "MULTIWOZ_"
+# Processes that run CPU-bound scans off the request threads (0: scan in the request thread)
+WORKERS: int = int(os.environ.get(f"{ENV_PREFIX}SEARCH_WORKERS", "0"))
+# Requests waiting in the Gradio queue before new ones are turned away
+QUEUE_MAX_SIZE: int = int(os.environ.get(f"{ENV_PREFIX}QUEUE_MAX_SIZE", "64"))
+# Events of one kind that run at once, unless the event sets its own limit
+DEFAULT_CONCURRENCY: int = int(os.environ.get(f"{ENV_PREFIX}CONCURRENCY", "16"))
+# Every event that scans data (searches, paging, near-duplicates, samples…) shares
+# these slots; by default two per worker so the pool is never idle and its queue stays short
+SEARCH_CONCURRENCY: int = int(os.environ.get(f"{ENV_PREFIX}SEARCH_CONCURRENCY", str(2 * WORKERS if WORKERS > 0 else 4)))
+# Gradio's Blocks.launch thread pool; every running and streaming event holds a thread
+MAX_THREADS: int = max(40, DEFAULT_CONCURRENCY + SEARCH_CONCURRENCY)
+# How often a request waiting on a worker reports progress and checks for cancellation
+POLL_INTERVAL_S: float = 0.1
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def worker_pool() -> Optional[ProcessPoolExecutor]:
+	"""The shared worker processes, started on first use; None when ``WORKERS`` is 0.
+
+	Workers are spawned rather than forked, since the server process runs
+	threads. Each keeps its own caches and indexes warm between tasks.
+	"""
+	global _pool
+	if WORKERS <= 0:
+		return None
+	with _pool_lock:
+		if _pool is None:
+			_pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+		return _pool
+
+
+def run_offloaded(fn: Callable[..., T], *args: Any) -> T:
+	"""``fn(*args)`` in a worker process, or in this thread without workers.
+
+	``fn`` and its arguments must be picklable: a module-level function of
+	plain data.
+	"""
+	pool: Optional[ProcessPoolExecutor] = worker_pool()
+	if pool is None:
+		return fn(*args)
+	return pool.submit(fn, *args).result()
+
+
+def stream_offloaded(fn: Callable[..., T], *args: Any, waiting: str = "⏳ Working…") -> Generator[str, None, T]:
+	"""Generator form of ``run_offloaded``: yields ``waiting`` until the worker is done.
+
+	Closing the generator (a superseded request) withdraws the task if no
+	worker has picked it up yet; a task already running finishes in its worker.
+	"""
+	pool: Optional[ProcessPoolExecutor] = worker_pool()
+	if pool is None:
+		return fn(*args)
+	future: Future = pool.submit(fn, *args)
+	try:
+		while True:
+			try:
+				return future.result(timeout=POLL_INTERVAL_S)
+			except FutureTimeout:
+				yield waiting
+	finally:
+		future.cancel()
+
+
+def queue_options() -> Dict[str, int]:
+	"""Keyword arguments for ``Blocks.queue``: bounded queue and default per-event concurrency."""
+	return {"max_size": QUEUE_MAX_SIZE, "default_concurrency_limit": DEFAULT_CONCURRENCY}
+
+
+def search_event_options() -> Dict[str, Any]:
+	"""Keyword arguments for the events that scan data: one shared pool of ``SEARCH_CONCURRENCY`` slots."""
+	return {"concurrency_limit": SEARCH_CONCURRENCY, "concurrency_id": "search"}
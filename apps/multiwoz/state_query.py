@@ -0,0 +1,234 @@
+import base64
+import re
+import sys
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from corpus_index import (
+	INDEX_VERSION,
+	Fingerprint,
+	load_index_payload,
+	save_index_payload,
+)
+
+# (turn index, service, slot, value, active intent); slot/value are "" for a
+# frame that only carries an intent
+StateRow = Tuple[int, str, str, str, str]
+
+COLUMNS: Tuple[str, ...] = ("dialogue", "turn", "service", "slot", "value", "intent")
+_CLAUSE_RE = re.compile(r"^\s*([A-Za-z_][\w-]*)\s*(>=|<=|!=|=|>|<|~)\s*(.+?)\s*$")
+_OR_RE = re.compile(r"\s+OR\s+", re.IGNORECASE)
+_AND_RE = re.compile(r"\s+AND\s+", re.IGNORECASE)
+
+
+def extract_state_rows(dialogues: List[Dict]) -> List[Tuple[str, List[StateRow]]]:
+	"""Flatten ``frames[].state`` of every turn into (dialogue_id, rows) pairs."""
+	extracted: List[Tuple[str, List[StateRow]]] = []
+	for dlg in dialogues:
+		rows: List[StateRow] = []
+		for turn_idx, turn in enumerate(dlg.get("turns", [])):
+			for frame in turn.get("frames", []):
+				service: str = frame.get("service", "")
+				state: Dict = frame.get("state") or {}
+				intent: str = state.get("active_intent", "") or ""
+				intent = "" if intent == "NONE" else intent.lower()
+				slot_values: Dict[str, List[str]] = state.get("slot_values") or {}
+				if not slot_values and intent:
+					rows.append((turn_idx, service, "", "", intent))
+				for slot, values in slot_values.items():
+					for value in values:
+						rows.append((turn_idx, service, slot.lower(), str(value).lower(), intent))
+		extracted.append((dlg.get("dialogue_id", "<unknown>"), rows))
+	return extracted
+
+
+def _to_number(value: str) -> Optional[float]:
+	try:
+		return float(value)
+	except ValueError:
+		return None
+
+
+def _make_predicate(op: str, target: str) -> Callable[[str], bool]:
+	if op == "~":
+		return lambda v: target in v
+	if op == "=":
+		return lambda v: v == target
+	if op == "!=":
+		return lambda v: v != target
+	target_num: Optional[float] = _to_number(target)
+	if target_num is None:
+		raise ValueError(f"'{op}' needs a numeric value, got '{target}'")
+	compare = {
+		">=": lambda x: x >= target_num,
+		"<=": lambda x: x <= target_num,
+		">": lambda x: x > target_num,
+		"<": lambda x: x < target_num,
+	}[op]
+
+	def predicate(v: str) -> bool:
+		number: Optional[float] = _to_number(v)
+		return number is not None and compare(number)
+
+	return predicate
+
+
+def _decode_column(encoded: str, byteorder: str) -> array:
+	column = array("i")
+	column.frombytes(base64.b64decode(encoded))
+	if byteorder != sys.byteorder:
+		column.byteswap()
+	return column
+
+
+class StateIndex:
+	"""Columnar (dialogue, turn, service, slot, value, intent) table over all frames.
+
+	String columns are interned into per-column tables and stored as integer
+	codes in ``array("i")`` columns. Queries evaluate their predicate once per
+	distinct value, then union the precomputed dialogue sets for the matching
+	codes, so cost is independent of how many turns the corpus has.
+	"""
+
+	def __init__(
+		self,
+		dialogue_ids: List[str],
+		strings: Dict[str, List[str]],
+		columns: Dict[str, array],
+		fingerprint: Fingerprint,
+	) -> None:
+		self.dialogue_ids = dialogue_ids
+		self.strings = strings  # column name -> code -> string, for service/slot/value/intent
+		self.columns = columns
+		self.fingerprint = fingerprint
+		self._codes: Dict[str, Dict[str, int]] = {
+			name: {s: i for i, s in enumerate(table)} for name, table in strings.items()
+		}
+		# (slot code, value code) -> dialogues, and intent / service code -> dialogues
+		slot_value_docs: Dict[Tuple[int, int], set] = {}
+		intent_docs: Dict[int, set] = {}
+		service_docs: Dict[int, set] = {}
+		dialogue_col, slot_col, value_col = columns["dialogue"], columns["slot"], columns["value"]
+		intent_col, service_col = columns["intent"], columns["service"]
+		for row in range(len(dialogue_col)):
+			doc: int = dialogue_col[row]
+			slot_value_docs.setdefault((slot_col[row], value_col[row]), set()).add(doc)
+			intent_docs.setdefault(intent_col[row], set()).add(doc)
+			service_docs.setdefault(service_col[row], set()).add(doc)
+		self._slot_values: Dict[int, List[Tuple[int, FrozenSet[int]]]] = {}
+		for (slot, value), docs in slot_value_docs.items():
+			self._slot_values.setdefault(slot, []).append((value, frozenset(docs)))
+		self._intent_docs = {k: frozenset(v) for k, v in intent_docs.items()}
+		self._service_docs = {k: frozenset(v) for k, v in service_docs.items()}
+
+	def __len__(self) -> int:
+		return len(self.columns["dialogue"])
+
+	@classmethod
+	def from_shard_rows(
+		cls,
+		per_shard: Sequence[List[Tuple[str, List[StateRow]]]],
+		fingerprint: Fingerprint,
+	) -> "StateIndex":
+		dialogue_ids: List[str] = []
+		strings: Dict[str, List[str]] = {name: [""] for name in ("service", "slot", "value", "intent")}
+		codes: Dict[str, Dict[str, int]] = {name: {"": 0} for name in strings}
+		columns: Dict[str, array] = {name: array("i") for name in COLUMNS}
+
+		def intern(name: str, value: str) -> int:
+			code: Optional[int] = codes[name].get(value)
+			if code is None:
+				code = codes[name][value] = len(strings[name])
+				strings[name].append(value)
+			return code
+
+		for extracted in per_shard:
+			for dialogue_id, rows in extracted:
+				doc: int = len(dialogue_ids)
+				dialogue_ids.append(dialogue_id)
+				for turn_idx, service, slot, value, intent in rows:
+					columns["dialogue"].append(doc)
+					columns["turn"].append(turn_idx)
+					columns["service"].append(intern("service", service))
+					columns["slot"].append(intern("slot", slot))
+					columns["value"].append(intern("value", value))
+					columns["intent"].append(intern("intent", intent))
+		return cls(dialogue_ids, strings, columns, fingerprint)
+
+	def save(self, path: Path) -> None:
+		save_index_payload(path, {
+			"version": INDEX_VERSION,
+			"fingerprint": self.fingerprint,
+			"dialogue_ids": self.dialogue_ids,
+			"strings": self.strings,
+			"byteorder": sys.byteorder,
+			"columns": {name: base64.b64encode(col.tobytes()).decode("ascii") for name, col in self.columns.items()},
+		})
+
+	@classmethod
+	def load(cls, path: Path) -> Optional["StateIndex"]:
+		payload: Optional[Dict] = load_index_payload(path)
+		if payload is None:
+			return None
+		return cls(
+			payload["dialogue_ids"],
+			payload["strings"],
+			{name: _decode_column(col, payload["byteorder"]) for name, col in payload["columns"].items()},
+			[tuple(f) for f in payload["fingerprint"]],
+		)
+
+	def _clause_docs(self, clause: str, known_slots: Optional[FrozenSet[str]]) -> FrozenSet[int]:
+		match = _CLAUSE_RE.match(clause)
+		if not match:
+			raise ValueError(f"cannot parse clause '{clause.strip()}' (expected: field op value)")
+		field, op, raw_value = match.group(1).lower(), match.group(2), match.group(3)
+		target: str = raw_value.strip("\"'").lower()
+		predicate: Callable[[str], bool] = _make_predicate(op, target)
+
+		if field in ("intent", "service"):
+			table: List[str] = self.strings[field]
+			lookup: Dict[int, FrozenSet[int]] = self._intent_docs if field == "intent" else self._service_docs
+			docs = set()
+			for code, name in enumerate(table):
+				if name and predicate(name):
+					docs.update(lookup.get(code, ()))
+			return frozenset(docs)
+
+		if known_slots is not None and field not in known_slots:
+			raise ValueError(f"unknown slot '{field}' (not in schema.json)")
+		slot_code: Optional[int] = self._codes["slot"].get(field)
+		if slot_code is None:
+			return frozenset()
+		values: List[str] = self.strings["value"]
+		docs = set()
+		for value_code, value_docs in self._slot_values.get(slot_code, []):
+			if predicate(values[value_code]):
+				docs.update(value_docs)
+		return frozenset(docs)
+
+	def query(self, expression: str, known_slots: Optional[Iterable[str]] = None) -> List[int]:
+		"""Evaluate ``a = x AND b >= 4 OR intent = y`` and return dialogue numbers.
+
+		Fields are slot names (``restaurant-food``), ``intent`` or ``service``;
+		operators are ``= != > >= < <=`` and ``~`` (substring). A clause holds for
+		a dialogue if any of its turns satisfies it. AND binds tighter than OR.
+		Raises ``ValueError`` for malformed queries or unknown slots.
+		"""
+		if not expression or not expression.strip():
+			raise ValueError("empty query")
+		slots: Optional[FrozenSet[str]] = (
+			frozenset(s.lower() for s in known_slots) if known_slots is not None else None
+		)
+		result = set()
+		for disjunct in _OR_RE.split(expression.strip()):
+			matched: Optional[FrozenSet[int]] = None
+			for clause in _AND_RE.split(disjunct):
+				docs: FrozenSet[int] = self._clause_docs(clause, slots)
+				matched = docs if matched is None else matched & docs
+				if not matched:
+					break
+			result.update(matched or ())
+		return sorted(result)
+
+
@@ -0,0 +1,100 @@
+import json
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pytest
+
+# The app's modules import one another by bare name, as when app.py runs from its folder
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# (speaker, utterance, {service: {slot: [values]}}, active intent)
+Turn = Tuple[str, str, Dict[str, Dict[str, List[str]]], str]
+
+
+def make_dialogue(dialogue_id: str, services: Sequence[str], turns: Sequence[Turn]) -> Dict:
+	"""A dialogue in the MultiWOZ 2.2 shape, with one frame per service on every turn."""
+	built: List[Dict] = []
+	for turn_id, (speaker, utterance, state, intent) in enumerate(turns):
+		frames: List[Dict] = []
+		for service in services:
+			frame: Dict = {"actions": [], "service": service, "slots": []}
+			if speaker == "USER":
+				frame["state"] = {
+					"active_intent": intent if service in state else "NONE",
+					"requested_slots": [],
+					"slot_values": state.get(service, {}),
+				}
+			frames.append(frame)
+		built.append({"frames": frames, "speaker": speaker, "turn_id": str(turn_id), "utterance": utterance})
+	return {"dialogue_id": dialogue_id, "services": list(services), "turns": built}
+
+
+DIALOGUES: Dict[str, List[List[Dict]]] = {
+	"train": [
+		[
+			make_dialogue("PMUL0001.json", ["restaurant", "hotel"], [
+				("USER", "I want a cheap Italian restaurant in the centre.", {"restaurant": {"restaurant-food": ["italian"], "restaurant-pricerange": ["cheap"]}}, "find_restaurant"),
+				("SYSTEM", "Pizza Hut City Centre is cheap and serves Italian food.", {}, ""),
+				("USER", "Also a 4 star hotel with free parking please.", {"hotel": {"hotel-stars": ["4"], "hotel-parking": ["yes"]}}, "book_hotel"),
+			]),
+			make_dialogue("SNG0002.json", ["hotel"], [
+				("USER", "Find me a guesthouse with 2 stars.", {"hotel": {"hotel-stars": ["2"], "hotel-type": ["guesthouse"]}}, "find_hotel"),
+				("SYSTEM", "The Acorn Guest House has 2 stars.", {}, ""),
+			]),
+		],
+		[
+			make_dialogue("SNG0003.json", ["train"], [
+				("USER", "I need a train to Cambridge on Friday.", {"train": {"train-destination": ["cambridge"], "train-day": ["friday"]}}, "find_train"),
+				("SYSTEM", "TR1234 leaves at 09:00.", {}, ""),
+			]),
+		],
+	],
+	"dev": [
+		[
+			make_dialogue("PMUL0004.json", ["restaurant", "hotel"], [
+				("USER", "Any expensive Chinese restaurant in the north?", {"restaurant": {"restaurant-food": ["chinese"], "restaurant-pricerange": ["expensive"]}}, "find_restaurant"),
+				("SYSTEM", "The Hotpot serves Chinese food in the north.", {}, ""),
+				("USER", "And a hotel with 5 stars.", {"hotel": {"hotel-stars": ["5"]}}, "find_hotel"),
+			]),
+		],
+	],
+	"test": [
+		[
+			make_dialogue("SNG0005.json", ["taxi"], [
+				("USER", "Book a taxi to the museum, please. Naïve question: is it far?", {"taxi": {"taxi-destination": ["museum"]}}, "book_taxi"),
+				("SYSTEM", "Your taxi is booked.", {}, ""),
+			]),
+		],
+	],
+}
+
+
+def write_corpus(data_root: Path, dialogues: Optional[Dict[str, List[List[Dict]]]] = None) -> List[Path]:
+	"""Write ``dialogues`` as ``{split}/dialogues_NNN.json`` shards under ``data_root``."""
+	shards: List[Path] = []
+	for split, split_shards in (dialogues or DIALOGUES).items():
+		(data_root / split).mkdir(parents=True, exist_ok=True)
+		for number, shard in enumerate(split_shards, start=1):
+			path: Path = data_root / split / f"dialogues_{number:03d}.json"
+			path.write_text(json.dumps(shard, indent=4, ensure_ascii=False), encoding="utf-8")
+			shards.append(path)
+	return shards
+
+
+@pytest.fixture
+def corpus() -> Dict[str, List[List[Dict]]]:
+	return DIALOGUES
+
+
+@pytest.fixture
+def data_root(tmp_path: Path) -> Path:
+	"""A small MultiWOZ 2.2-shaped corpus: two train shards, one dev and one test shard."""
+	root: Path = tmp_path / "MultiWOZ_2.2"
+	write_corpus(root)
+	return root
+
+
+@pytest.fixture
+def corpus_writer() -> Callable[..., List[Path]]:
+	return write_corpus
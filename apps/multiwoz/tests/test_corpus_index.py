@@ -0,0 +1,141 @@
+import gzip
+import json
+import os
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+import ingest
+from corpus_index import (
+	DialogueLocator,
+	SearchIndex,
+	corpus_fingerprint,
+	extract_search_terms,
+	list_corpus_shards,
+	parse_shard_with_spans,
+	read_dialogue_span,
+	read_shard,
+)
+
+
+@pytest.fixture
+def search_index(data_root: Path) -> SearchIndex:
+	shards: List[Path] = list_corpus_shards(data_root)
+	per_shard = [extract_search_terms(read_shard(shard)) for shard in shards]
+	return SearchIndex.from_shard_terms(shards, per_shard, corpus_fingerprint(data_root, shards))
+
+
+def ids(index: SearchIndex, docs: List[int]) -> List[str]:
+	return [index.docs[doc][0] for doc in docs]
+
+
+def test_shards_are_listed_in_corpus_order(data_root: Path):
+	names: List[str] = [shard.relative_to(data_root).as_posix() for shard in list_corpus_shards(data_root)]
+	assert names == ["train/dialogues_001.json", "train/dialogues_002.json", "dev/dialogues_001.json", "test/dialogues_001.json"]
+
+
+def test_search_requires_every_token(search_index: SearchIndex):
+	assert ids(search_index, search_index.search("cheap italian", None)) == ["PMUL0001.json"]
+	assert ids(search_index, search_index.search("Chinese", None)) == ["PMUL0004.json"]
+	assert search_index.search("italian zeppelin", None) == []
+
+
+def test_last_token_matches_as_prefix(search_index: SearchIndex):
+	assert ids(search_index, search_index.search("restaur", None)) == ["PMUL0001.json", "PMUL0004.json"]
+	# Only the last token is expanded
+	assert search_index.search("restaur italian", None) == []
+
+
+def test_service_and_split_filters(search_index: SearchIndex):
+	assert ids(search_index, search_index.search("star", "hotel")) == ["PMUL0001.json", "SNG0002.json", "PMUL0004.json"]
+	assert ids(search_index, search_index.search("star", "Hotel", splits=["dev"])) == ["PMUL0004.json"]
+	assert ids(search_index, search_index.search(None, "taxi")) == ["SNG0005.json"]
+	assert len(search_index.search(None, None)) == 5
+	assert search_index.search("stars", "attraction") == []
+
+
+def test_search_any_of_groups(search_index: SearchIndex):
+	groups = [{"italian", "chinese"}, {"cheap", "expensive"}]
+	assert ids(search_index, search_index.search_any_of(groups, None)) == ["PMUL0001.json", "PMUL0004.json"]
+	assert ids(search_index, search_index.search_any_of(groups, None, splits=["train"])) == ["PMUL0001.json"]
+
+
+def test_spans_decode_each_dialogue_alone(data_root: Path):
+	shard: Path = data_root / "test" / "dialogues_001.json"
+	dialogues, spans = parse_shard_with_spans(shard)
+	assert [span[0] for span in spans] == [d["dialogue_id"] for d in dialogues]
+	for (dialogue_id, offset, length), dialogue in zip(spans, dialogues):
+		# Offsets are in bytes, so the non-ASCII utterance must not shift them
+		assert read_dialogue_span(shard, offset, length) == dialogue
+
+
+def test_locator_resolves_typed_ids_and_fetches_full_records(data_root: Path):
+	shards: List[Path] = list_corpus_shards(data_root)
+	per_shard = [parse_shard_with_spans(shard)[1] for shard in shards]
+	locator = DialogueLocator.from_shard_spans(shards, per_shard, corpus_fingerprint(data_root, shards))
+	assert locator.resolve("pmul0004") == "PMUL0004.json"
+	assert locator.resolve("SNG0002.json") == "SNG0002.json"
+	assert locator.resolve("PMUL9999") is None
+	dialogue: Dict = locator.fetch(data_root, "sng0005")
+	assert dialogue["dialogue_id"] == "SNG0005.json"
+	assert dialogue["turns"][0]["frames"][0]["state"]["slot_values"] == {"taxi-destination": ["museum"]}
+
+
+def test_save_and_load_round_trip(search_index: SearchIndex, tmp_path: Path):
+	path: Path = tmp_path / "search_index.json.gz"
+	search_index.save(path)
+	loaded = SearchIndex.load(path)
+	assert loaded is not None
+	assert loaded.fingerprint == search_index.fingerprint
+	assert loaded.search("star", "hotel", splits=["train"]) == search_index.search("star", "hotel", splits=["train"])
+
+
+def test_load_rejects_other_versions(search_index: SearchIndex, tmp_path: Path):
+	path: Path = tmp_path / "search_index.json.gz"
+	search_index.save(path)
+	with gzip.open(path, "rt", encoding="utf-8") as f:
+		payload: Dict = json.load(f)
+	payload["version"] -= 1
+	with gzip.open(path, "wt", encoding="utf-8") as f:
+		json.dump(payload, f)
+	assert SearchIndex.load(path) is None
+	path.write_bytes(b"not gzip")
+	assert SearchIndex.load(path) is None
+
+
+def test_indexes_are_rebuilt_when_the_fingerprint_changes(data_root: Path, corpus_writer, corpus, monkeypatch):
+	paths: Dict[str, Path] = {kind: ingest.index_path(data_root, kind) for kind in ("search", "locator")}
+	builds: List[List[str]] = []
+	build_indexes = ingest.build_indexes
+
+	def counting_build(root, stale, workers=None):
+		builds.append(sorted(stale))
+		return build_indexes(root, stale, workers)
+
+	monkeypatch.setattr(ingest, "build_indexes", counting_build)
+	first = ingest.load_or_build_indexes(data_root, paths, workers=1)
+	assert builds == [["locator", "search"]]
+	assert all(path.exists() for path in paths.values())
+
+	# Unchanged shards: both indexes load from disk
+	again = ingest.load_or_build_indexes(data_root, paths, workers=1)
+	assert builds == [["locator", "search"]]
+	assert again["search"].fingerprint == first["search"].fingerprint
+
+	# Touching a shard changes its mtime, so both indexes are stale
+	shard: Path = data_root / "dev" / "dialogues_001.json"
+	stat = shard.stat()
+	os.utime(shard, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+	ingest.load_or_build_indexes(data_root, paths, workers=1)
+	assert builds == [["locator", "search"]] * 2
+
+	# New content is picked up by the rebuilt indexes
+	extra = json.loads(json.dumps(corpus["train"][1][0]))
+	extra["dialogue_id"] = "SNG0006.json"
+	extra["turns"][0]["utterance"] = "Is there a zeppelin tour?"
+	corpus_writer(data_root, {"dev": [corpus["dev"][0] + [extra]]})
+	rebuilt = ingest.load_or_build_indexes(data_root, paths, workers=1)
+	assert len(builds) == 3
+	assert ids(rebuilt["search"], rebuilt["search"].search("zeppelin", None)) == ["SNG0006.json"]
+	assert rebuilt["locator"].fetch(data_root, "SNG0006")["turns"][0]["utterance"] == "Is there a zeppelin tour?"
@@ -0,0 +1,74 @@
+import importlib.util
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from matching import TrigramIndex, compile_regex, trigram_index_for, trigrams, within_edits
+
+REPO_ROOT: Path = Path(__file__).resolve().parents[3]
+
+
+@pytest.mark.parametrize("a, b, max_edits, expected", [
+	("hotel", "hotel", 0, True),
+	("hotel", "hotle", 1, True),  # adjacent transposition counts once
+	("hotel", "htoel", 1, True),
+	("hotel", "holet", 1, False),  # not adjacent: two substitutions
+	("hotel", "holet", 2, True),
+	("taxi", "taxis", 1, True),
+	("taxi", "tax", 1, True),
+	("taxi", "maxi", 1, True),
+	("taxi", "train", 1, False),
+	("ab", "ba", 0, False),
+	("", "ab", 1, False),
+	("", "ab", 2, True),
+])
+def test_within_edits(a: str, b: str, max_edits: int, expected: bool):
+	assert within_edits(a, b, max_edits) is expected
+	assert within_edits(b, a, max_edits) is expected
+
+
+def test_trigrams_are_padded():
+	assert trigrams("ab") == {"  a", " ab", "ab "}
+	assert trigrams("") == {"   "}
+
+
+def test_compile_regex_is_case_insensitive_and_cached():
+	pattern = compile_regex(r"^pizza\b")
+	assert pattern is compile_regex(r"^pizza\b")
+	assert pattern.search("Thanks.\nPIZZA Hut") is not None
+
+
+def test_compile_regex_reports_invalid_patterns():
+	with pytest.raises(ValueError, match="invalid regex"):
+		compile_regex("restaurant(")
+
+
+def test_trigram_index_finds_words_within_edits():
+	vocabulary: List[str] = ["restaurant", "restaurants", "hotel", "hostel", "hotels", "taxi", "tax", "train"]
+	index = TrigramIndex(vocabulary)
+	assert index.similar("resturant", 1) == {"restaurant"}
+	assert index.similar("resturant", 2) == {"restaurant", "restaurants"}
+	assert index.similar("hotle", 1) == {"hotel"}
+	assert index.similar("hotel", 1) == {"hotel", "hostel", "hotels"}
+	# Short words fall back to the length buckets
+	assert index.similar("tx", 1) == {"tax"}
+	assert index.similar("zeppelin", 2) == frozenset()
+	assert index.similar("hotle", 1) is index.similar("hotle", 1)
+
+
+def test_trigram_index_is_built_once_per_owner():
+	class Owner:
+		pass
+
+	owner, other = Owner(), Owner()
+	index = trigram_index_for(owner, ["hotel"])
+	assert trigram_index_for(owner, ["ignored"]) is index
+	assert trigram_index_for(other, ["taxi"]) is not index
+
+
+def test_shared_modules_match_their_generated_copies():
+	spec = importlib.util.spec_from_file_location("sync_shared_modules", REPO_ROOT / "scripts" / "sync_shared_modules.py")
+	sync = importlib.util.module_from_spec(spec)
+	spec.loader.exec_module(sync)
+	assert sync.stale_copies(REPO_ROOT / "apps") == []
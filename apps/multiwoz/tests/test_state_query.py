@@ -0,0 +1,86 @@
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from state_query import StateIndex, extract_state_rows
+
+KNOWN_SLOTS: List[str] = [
+	"restaurant-food", "restaurant-pricerange", "hotel-stars", "hotel-parking", "hotel-type",
+	"train-destination", "train-day", "taxi-destination",
+]
+
+
+@pytest.fixture
+def index(corpus: Dict[str, List[List[Dict]]]) -> StateIndex:
+	per_shard = [extract_state_rows(shard) for split in ("train", "dev", "test") for shard in corpus[split]]
+	return StateIndex.from_shard_rows(per_shard, [])
+
+
+def ids(index: StateIndex, expression: str) -> List[str]:
+	return [index.dialogue_ids[doc] for doc in index.query(expression, known_slots=KNOWN_SLOTS)]
+
+
+def test_extract_state_rows_lowercases_and_drops_none_intent(corpus):
+	(dialogue_id, rows), _ = extract_state_rows(corpus["train"][0])
+	assert dialogue_id == "PMUL0001.json"
+	assert (0, "restaurant", "restaurant-food", "italian", "find_restaurant") in rows
+	# The hotel frame of the first turn carries no state and an intent of NONE
+	assert not any(service == "hotel" and turn == 0 for turn, service, _, _, _ in rows)
+
+
+def test_equality_and_substring(index):
+	assert ids(index, "restaurant-food = italian") == ["PMUL0001.json"]
+	assert ids(index, "restaurant-food = ITALIAN") == ["PMUL0001.json"]
+	assert ids(index, "restaurant-food ~ ital") == ["PMUL0001.json"]
+	assert ids(index, "restaurant-food = 'chinese'") == ["PMUL0004.json"]
+	assert ids(index, "restaurant-food != italian") == ["PMUL0004.json"]
+
+
+def test_numeric_comparisons(index):
+	assert ids(index, "hotel-stars >= 4") == ["PMUL0001.json", "PMUL0004.json"]
+	assert ids(index, "hotel-stars > 4") == ["PMUL0004.json"]
+	assert ids(index, "hotel-stars < 3") == ["SNG0002.json"]
+	assert ids(index, "hotel-stars <= 2") == ["SNG0002.json"]
+
+
+def test_intent_and_service_fields(index):
+	assert ids(index, "intent = book_taxi") == ["SNG0005.json"]
+	assert ids(index, "intent ~ book") == ["PMUL0001.json", "SNG0005.json"]
+	assert ids(index, "service = train") == ["SNG0003.json"]
+
+
+def test_and_binds_tighter_than_or(index):
+	# (italian AND 5 stars) OR train: the first conjunction matches nothing
+	assert ids(index, "restaurant-food = italian AND hotel-stars = 5 OR service = train") == ["SNG0003.json"]
+	assert ids(index, "restaurant-food = italian and hotel-stars >= 4") == ["PMUL0001.json"]
+	assert ids(index, "service = taxi or service = train") == ["SNG0003.json", "SNG0005.json"]
+
+
+def test_known_slot_without_values_matches_nothing(index):
+	assert index.query("hotel-type = hotel", known_slots=KNOWN_SLOTS) == []
+	assert index.query("attraction-area = north") == []
+
+
+@pytest.mark.parametrize("expression, message", [
+	("", "empty query"),
+	("   ", "empty query"),
+	("restaurant-food italian", "cannot parse clause"),
+	("= italian", "cannot parse clause"),
+	("restaurant-food =", "cannot parse clause"),
+	("service = taxi AND 4 stars", "cannot parse clause"),
+	("hotel-stars >= four", "needs a numeric value"),
+	("restaurant-colour = red", "unknown slot 'restaurant-colour'"),
+])
+def test_grammar_errors(index, expression, message):
+	with pytest.raises(ValueError, match=message):
+		index.query(expression, known_slots=KNOWN_SLOTS)
+
+
+def test_save_and_load_round_trip(index, tmp_path: Path):
+	path: Path = tmp_path / "state_index.json.gz"
+	index.save(path)
+	loaded = StateIndex.load(path)
+	assert loaded is not None
+	for expression in ("hotel-stars >= 4", "intent ~ find", "restaurant-food = chinese OR service = taxi"):
+		assert loaded.query(expression) == index.query(expression)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import inspect
+import json
+import os
+import random
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from harness import Bench
+
+APP_DIR = Path(__file__).resolve().parents[1] / "apps" / "misc"
+
+
+def event_handlers(demo: Any) -> Dict[str, Callable]:
+    """The functions wired to a Blocks app's events, by name (the MiSC handlers are closures in build_demo)."""
+    fns = demo.fns.values() if isinstance(demo.fns, dict) else demo.fns
+    return {block_fn.fn.__name__: block_fn.fn for block_fn in fns if getattr(block_fn, "fn", None) is not None}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time the MiSC explorer's hot paths; prints a JSON report.")
+    parser.add_argument("--data-dir", type=Path, required=True, help="directory with misc.jsonl and misc.csv")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ["MISC_SEARCH_WORKERS"] = "0"
+    os.environ.pop("MISC_RESULT_CACHE_DIR", None)
+    sys.path.insert(0, str(APP_DIR))
+    import app
+    import engine
+
+    handlers = event_handlers(app.build_demo(app.DATASET_LINK))
+    fetch_slice, random_item, view_chat = handlers["fetch_slice"], handlers["random_item"], handlers["view_chat"]
+    parse_misc_chat = inspect.getclosurevars(view_chat).nonlocals["_parse_misc_chat"]
+
+    bench = Bench("misc", args.repeat, args.warmup)
+    rng = random.Random(args.seed)
+    jsonl = str(args.data_dir / "misc.jsonl")
+    csv = str(args.data_dir / "misc.csv")
+    with open(jsonl, encoding="utf-8") as f:
+        records = sum(1 for _ in f)
+    # Every search runs in full: results are shared through the result cache otherwise
+    clear_cache = lambda i: engine.RESULT_CACHE.clear()
+
+    for kind, src in (("jsonl", jsonl), ("csv", csv)):
+        bench.time_setup(f"first_record[{kind}]", lambda: engine.get_first_record(src, "", "train"))
+        bench.measure(
+            f"fetch_slice[{kind},substring,hit]",
+            lambda i: fetch_slice(src, "", "train", "parking", 10, ""),
+            before=clear_cache,
+        )
+        bench.measure(
+            f"fetch_slice[{kind},substring,miss]",
+            lambda i: fetch_slice(src, "", "train", "zeppelin", 10, ""),
+            before=clear_cache,
+            items=records,
+        )
+        bench.measure(f"random_item[{kind}]", lambda i: random_item(src, "", "train"))
+    bench.measure(
+        "fetch_slice[jsonl,regex,miss]",
+        lambda i: fetch_slice(jsonl, "", "train", r"zep+elin\d", 10, "", "Regex"),
+        before=clear_cache,
+        items=records,
+    )
+    bench.time_setup("fulltext_index[jsonl]", lambda: engine.ensure_fulltext_index(jsonl, "", "train"))
+    bench.measure(
+        "fetch_slice[jsonl,bm25]",
+        lambda i: fetch_slice(jsonl, "", "train", "cheap italian restaurant", 10, "", "Ranked (BM25)"),
+        before=clear_cache,
+    )
+
+    # Chat view by record id (through the id index) and by row number
+    ids = [f"misc-{rng.randrange(records)}" for _ in range(64)]
+    bench.time_setup("id_index[jsonl]", lambda: engine.ensure_id_index(jsonl, "", "train"))
+    bench.measure("view_chat[jsonl,id]", lambda i: view_chat(jsonl, "", "train", ids[i % len(ids)]))
+    rows = [str(rng.randrange(records)) for _ in range(64)]
+    bench.measure("view_chat[csv,row]", lambda i: view_chat(csv, "", "train", rows[i % len(rows)]))
+
+    # The MiSC session parser alone, over decoded records
+    sample = [engine.record_at(jsonl, "", "train", int(row)) for row in rows]
+    bench.measure("_parse_misc_chat", lambda i: parse_misc_chat(sample[i % len(sample)]), repeat=max(args.repeat, 1000))
+
+    report = bench.report()
+    report["records"] = records
+    json.dump(report, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
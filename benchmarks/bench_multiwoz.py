@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+from harness import Bench
+
+APP_DIR = Path(__file__).resolve().parents[1] / "apps" / "multiwoz"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time the MultiWOZ explorer's hot paths; prints a JSON report.")
+    parser.add_argument("--data-root", type=Path, required=True, help="MultiWOZ 2.2-shaped directory")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # The app reads its configuration at import time
+    os.environ["MULTIWOZ_DATA_ROOT"] = str(args.data_root)
+    os.environ["MULTIWOZ_WARMUP"] = "0"
+    os.environ["MULTIWOZ_SEARCH_WORKERS"] = "0"
+    os.environ.pop("MULTIWOZ_RESULT_CACHE_DIR", None)
+    sys.path.insert(0, str(APP_DIR))
+    import app
+    import engine
+
+    bench = Bench("multiwoz", args.repeat, args.warmup)
+    rng = random.Random(args.seed)
+    shards = [(split, path) for split in ("train", "dev", "test") for path in engine.list_shards(split)]
+    if not shards:
+        parser.error(f"no shards under {args.data_root}")
+    bench.time_setup("ensure_corpus_indexes", lambda: engine.ensure_corpus_indexes(["search", "locator", "state", "minhash"]))
+
+    # Parsing a shard from disk, then the same shard served from the shard cache
+    order = [path for _, path in shards]
+    rng.shuffle(order)
+    per_shard = len(engine.load_dialogues_from_shard(order[0]))
+    bench.measure(
+        "load_dialogues_from_shard[cold]",
+        lambda i: engine.load_dialogues_from_shard(order[i % len(order)]),
+        before=lambda i: engine.SHARD_CACHE.clear(),
+        items=per_shard,
+    )
+    bench.measure("load_dialogues_from_shard[cached]", lambda i: engine.load_dialogues_from_shard(order[0]), items=per_shard)
+
+    # Filtering a parsed shard: a common keyword fills the page early, a missing one scans every dialogue
+    dialogues = engine.load_dialogues_from_shard(order[0])
+    bench.measure("filter_dialogues[hit]", lambda i: engine.filter_dialogues(dialogues, "hotel", "parking", 100))
+    bench.measure(
+        "filter_dialogues[miss]", lambda i: engine.filter_dialogues(dialogues, None, "zeppelin", 100), items=len(dialogues)
+    )
+
+    # Chat view of dialogues anywhere in the corpus, looked up through the locator index
+    targets = []
+    for split, path in rng.sample(shards, min(len(shards), 8)):
+        for dialogue_id in rng.sample(engine.list_dialogue_ids_from_shard(path), 4):
+            targets.append((split, path.name, dialogue_id))
+    bench.measure(
+        "ui_view_dialogue_as_chat",
+        lambda i: app.ui_view_dialogue_as_chat(*targets[i % len(targets)]),
+        before=lambda i: engine.SHARD_CACHE.clear(),
+    )
+
+    report = bench.report()
+    report["shards"] = len(shards)
+    json.dump(report, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# Parameters that must match for two reports to be comparable
+COMPARABLE_PARAMS = ("dialogues", "records", "seed", "repeat", "synth_version")
+
+
+def incompatibilities(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    return [
+        f"{key}: {baseline['params'].get(key)} in the baseline, {current['params'].get(key)} now"
+        for key in COMPARABLE_PARAMS
+        if current["params"].get(key) != baseline["params"].get(key)
+    ]
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.2,
+    p99_tolerance: float = 0.5,
+    rss_tolerance: float = 0.2,
+    min_delta_ms: float = 0.05,
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Rows comparing ``current`` with ``baseline`` per benchmark, and the regressions found.
+
+    A benchmark regresses when its p50 grows by more than ``tolerance`` (a
+    fraction) or its p99 by more than ``p99_tolerance``, and by more than
+    ``min_delta_ms`` either way, so sub-microsecond jitter is ignored. An app
+    regresses when its peak RSS grows by more than ``rss_tolerance``.
+    """
+    rows: List[Dict[str, Any]] = []
+    regressions: List[str] = []
+    for app, report in current["apps"].items():
+        before = baseline["apps"].get(app)
+        if before is None:
+            continue
+        for name, now in report["benchmarks"].items():
+            then = before["benchmarks"].get(name)
+            if then is None:
+                rows.append({"app": app, "name": name, "status": "new"})
+                continue
+            row = {"app": app, "name": name, "status": "ok"}
+            for metric, limit in (("p50_ms", tolerance), ("p99_ms", p99_tolerance)):
+                ratio = now[metric] / max(then[metric], 1e-9)
+                row[metric] = (then[metric], now[metric], ratio)
+                if ratio > 1 + limit and now[metric] - then[metric] > min_delta_ms:
+                    row["status"] = "REGRESSION"
+                    regressions.append(f"{app} {name}: {metric} {then[metric]:.3f} -> {now[metric]:.3f} ms ({ratio:.2f}x)")
+                elif ratio < 1 / (1 + limit) and then[metric] - now[metric] > min_delta_ms and row["status"] == "ok":
+                    row["status"] = "faster"
+            rows.append(row)
+        if report.get("peak_rss_mb") and before.get("peak_rss_mb"):
+            ratio = report["peak_rss_mb"] / before["peak_rss_mb"]
+            if ratio > 1 + rss_tolerance:
+                regressions.append(f"{app}: peak RSS {before['peak_rss_mb']:.1f} -> {report['peak_rss_mb']:.1f} MB ({ratio:.2f}x)")
+    return rows, regressions
+
+
+def format_rows(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'benchmark':<48} {'p50 base→now (ms)':>26} {'p99 base→now (ms)':>26}  status"]
+    for row in rows:
+        label = f"{row['app']} {row['name']}"
+        if row["status"] == "new":
+            lines.append(f"{label:<48} {'':>26} {'':>26}  new")
+            continue
+        cells = [f"{then:.3f}→{now:.3f} ({ratio:.2f}x)" for then, now, ratio in (row["p50_ms"], row["p99_ms"])]
+        lines.append(f"{label:<48} {cells[0]:>26} {cells[1]:>26}  {row['status']}")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare a benchmark report with a saved baseline.")
+    parser.add_argument("current", type=Path)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p50 growth (fraction)")
+    parser.add_argument("--p99-tolerance", type=float, default=0.5, help="allowed p99 growth (fraction)")
+    parser.add_argument("--rss-tolerance", type=float, default=0.2, help="allowed peak RSS growth (fraction)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+    current = json.loads(args.current.read_text(encoding="utf-8"))
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    return report_comparison(current, baseline, args)
+
+
+def report_comparison(current: Dict[str, Any], baseline: Dict[str, Any], args: argparse.Namespace) -> int:
+    """Print the comparison to stderr; exit status 1 on regressions, 2 if the reports are not comparable."""
+    problems = incompatibilities(current, baseline)
+    if problems:
+        print("Baseline not comparable (" + "; ".join(problems) + ")", file=sys.stderr)
+        return 2
+    rows, regressions = compare(current, baseline, args.tolerance, args.p99_tolerance, args.rss_tolerance, args.min_delta_ms)
+    print(format_rows(rows), file=sys.stderr)
+    if current.get("machine") != baseline.get("machine"):
+        print("Note: the baseline was recorded on a different machine.", file=sys.stderr)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    print(f"{len(regressions)} regression(s)" if regressions else "No regressions.", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
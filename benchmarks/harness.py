@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def drain(result: Any) -> Any:
+    """Run a handler's result to completion: generators are exhausted, their last item returned."""
+    if hasattr(result, "__next__"):
+        last = None
+        for last in result:
+            pass
+        return last
+    return result
+
+
+def summarize(samples_s: List[float], items: int = 0) -> Dict[str, Any]:
+    """Latency percentiles (ms) and throughput of timed calls; ``items`` is work per call, e.g. rows scanned."""
+    total = sum(samples_s)
+    if len(samples_s) > 1:
+        cuts = statistics.quantiles(samples_s, n=100, method="inclusive")
+        p50, p90, p99 = cuts[49], cuts[89], cuts[98]
+    else:
+        p50 = p90 = p99 = samples_s[0]
+    summary = {
+        "calls": len(samples_s),
+        "mean_ms": round(1000 * total / len(samples_s), 4),
+        "p50_ms": round(1000 * p50, 4),
+        "p90_ms": round(1000 * p90, 4),
+        "p99_ms": round(1000 * p99, 4),
+        "max_ms": round(1000 * max(samples_s), 4),
+        "ops_per_s": round(len(samples_s) / max(total, 1e-9), 2),
+    }
+    if items:
+        summary["items_per_call"] = items
+        summary["items_per_s"] = round(items * len(samples_s) / max(total, 1e-9), 1)
+    return summary
+
+
+class Bench:
+    """Collects the benchmarks of one app run into the report ``run.py`` merges.
+
+    ``measure`` times one call cold, then ``warmup`` untimed calls, then
+    ``repeat`` timed calls. ``call(i)`` gets the call number so callers can
+    rotate through inputs; ``before(i)``, if given, runs untimed ahead of each
+    call (e.g. to clear a cache so every call does the full work).
+    """
+
+    def __init__(self, app: str, repeat: int, warmup: int) -> None:
+        self.app = app
+        self.repeat = repeat
+        self.warmup = warmup
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.setup: Dict[str, float] = {}
+
+    def time_setup(self, name: str, fn: Callable[[], Any]) -> Any:
+        """Time a one-off step, such as building the indexes a hot path needs."""
+        started = time.perf_counter()
+        value = drain(fn())
+        self.setup[name] = round(1000 * (time.perf_counter() - started), 2)
+        print(f"[{self.app}] setup {name}: {self.setup[name]:,.1f} ms", file=sys.stderr, flush=True)
+        return value
+
+    def measure(
+        self,
+        name: str,
+        call: Callable[[int], Any],
+        before: Optional[Callable[[int], Any]] = None,
+        items: int = 0,
+        repeat: Optional[int] = None,
+    ) -> None:
+        repeat = self.repeat if repeat is None else repeat
+        rss_before = peak_rss_mb()
+        samples: List[float] = []
+        cold_s = 0.0
+        for i in range(1 + self.warmup + repeat):
+            if before is not None:
+                before(i)
+            started = time.perf_counter()
+            drain(call(i))
+            elapsed = time.perf_counter() - started
+            if i == 0:
+                cold_s = elapsed
+            elif i > self.warmup:
+                samples.append(elapsed)
+        summary = summarize(samples, items)
+        summary["cold_ms"] = round(1000 * cold_s, 4)
+        rss_after = peak_rss_mb()
+        if rss_before is not None and rss_after is not None:
+            summary["peak_rss_growth_mb"] = round(rss_after - rss_before, 1)
+        self.results[name] = summary
+        print(
+            f"[{self.app}] {name}: p50 {summary['p50_ms']:,.3f} ms · p99 {summary['p99_ms']:,.3f} ms"
+            f" · {summary['ops_per_s']:,.1f} ops/s",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    def report(self) -> Dict[str, Any]:
+        return {"setup_ms": self.setup, "benchmarks": self.results, "peak_rss_mb": peak_rss_mb()}
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from compare import report_comparison
+from synth import MISC_DIR, MULTIWOZ_DIR, SYNTH_VERSION, ensure_data, parse_scale
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_WORKDIR = Path(tempfile.gettempdir()) / "dataset-explorers-bench"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+APPS = ("multiwoz", "misc")
+
+
+def run_app(app: str, workdir: Path, args: argparse.Namespace) -> Dict[str, Any]:
+    # Each app runs in its own interpreter: both have modules named app and engine, and peak RSS is per process
+    data = ["--data-root", str(workdir / MULTIWOZ_DIR)] if app == "multiwoz" else ["--data-dir", str(workdir / MISC_DIR)]
+    command = [
+        sys.executable, str(BENCH_DIR / f"bench_{app}.py"), *data,
+        "--repeat", str(args.repeat), "--warmup", str(args.warmup), "--seed", str(args.seed),
+    ]
+    started = time.perf_counter()
+    done = subprocess.run(command, stdout=subprocess.PIPE, text=True, env=dict(os.environ, PYTHONHASHSEED="0"))
+    if done.returncode != 0:
+        raise RuntimeError(f"{app} benchmarks failed with exit status {done.returncode}")
+    report = json.loads(done.stdout)
+    report["wall_s"] = round(time.perf_counter() - started, 2)
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the explorers' hot paths on synthetic data and compare with a baseline.")
+    parser.add_argument("--scale", type=parse_scale, default=10_000, help="dialogues and records to generate, e.g. 10k, 1M, 10M")
+    parser.add_argument("--dialogues", type=parse_scale, default=None, help="MultiWOZ dialogues (default: --scale)")
+    parser.add_argument("--records", type=parse_scale, default=None, help="MiSC records (default: --scale)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=30, help="timed calls per benchmark")
+    parser.add_argument("--warmup", type=int, default=3, help="untimed calls after the first (cold) one")
+    parser.add_argument("--apps", nargs="+", choices=APPS, default=list(APPS))
+    parser.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR, help="where synthetic data is generated and kept")
+    parser.add_argument("--keep-indexes", action="store_true", help="reuse indexes built by a previous run")
+    parser.add_argument("--output", type=Path, help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="compare with this report if it exists")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run's report to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p50 growth (fraction)")
+    parser.add_argument("--p99-tolerance", type=float, default=0.5, help="allowed p99 growth (fraction)")
+    parser.add_argument("--rss-tolerance", type=float, default=0.2, help="allowed peak RSS growth (fraction)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+    dialogues = args.scale if args.dialogues is None else args.dialogues
+    records = args.scale if args.records is None else args.records
+
+    manifest = ensure_data(args.workdir, dialogues, records, args.seed, args.keep_indexes)
+    report: Dict[str, Any] = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "params": {
+            "dialogues": manifest["dialogues"],
+            "records": manifest["records"],
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "synth_version": SYNTH_VERSION,
+        },
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "apps": {app: run_app(app, args.workdir, args) for app in args.apps},
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    if args.save_baseline:
+        args.baseline.write_text(text + "\n", encoding="utf-8")
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+        return 0
+    if args.baseline.exists():
+        return report_comparison(report, json.loads(args.baseline.read_text(encoding="utf-8")), args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import random
+import shutil
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+# Bump when the generated data changes shape, so cached copies are regenerated
+SYNTH_VERSION = 1
+# MultiWOZ 2.2 ships its splits as shards of 512 dialogues, about 80/10/10 train/dev/test
+SHARD_DIALOGUES = 512
+SPLIT_SHARES = (("train", 0.8), ("dev", 0.1), ("test", 0.1))
+MULTIWOZ_DIR = Path("multiwoz") / "MultiWOZ_2.2"
+MISC_DIR = Path("misc")
+MANIFEST = "manifest.json"
+
+SERVICES = {
+    "restaurant": ["food", "area", "pricerange", "name", "bookday", "bookpeople", "booktime"],
+    "hotel": ["pricerange", "type", "parking", "stars", "internet", "area", "name", "bookday", "bookpeople", "bookstay"],
+    "attraction": ["area", "type", "name"],
+    "train": ["departure", "destination", "day", "arriveby", "leaveat", "bookpeople"],
+    "taxi": ["departure", "destination", "arriveby", "leaveat"],
+}
+VALUES = {
+    "food": ["italian", "chinese", "indian", "british", "european", "thai", "modern european"],
+    "area": ["centre", "north", "south", "east", "west"],
+    "pricerange": ["cheap", "moderate", "expensive"],
+    "stars": ["2", "3", "4", "5"],
+    "type": ["guesthouse", "hotel", "museum", "college", "park"],
+    "day": ["monday", "tuesday", "friday", "saturday"],
+}
+WORDS = (
+    "i need a place to stay in the centre of town with free parking and wifi please book it for two nights "
+    "is there a cheap restaurant serving italian food near the museum what time does the train leave from "
+    "cambridge to london on friday can you recommend an attraction taxi pick me up at the hotel thank you "
+    "goodbye sure your reference number is there are several options which area would you prefer"
+).split()
+SPEAKERS = ["Mina", "Jae", "Sora", "Hyun", "Ara", "Dong", "Yuri", "Min", "Eun", "Tae"]
+RELATIONSHIPS = ["friends", "neighbors", "co-workers", "classmates", "family"]
+INTERVALS = ["a few hours", "a few days", "a week", "a few months"]
+SESSIONS = ["first", "second", "third", "fourth", "fifth"]
+
+
+def sentence(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+
+def multiwoz_schema() -> List[Dict[str, Any]]:
+    return [
+        {
+            "service_name": service,
+            "description": f"{service} bookings and information",
+            "slots": [{"name": f"{service}-{slot}", "description": slot, "is_categorical": slot in VALUES} for slot in slots],
+            "intents": [{"name": f"find_{service}"}, {"name": f"book_{service}"}],
+        }
+        for service, slots in SERVICES.items()
+    ]
+
+
+def multiwoz_dialogue(rng: random.Random, number: int) -> Dict[str, Any]:
+    """A dialogue in the MultiWOZ 2.2 shape: USER/SYSTEM turns, with frames carrying the dialogue state."""
+    services = rng.sample(sorted(SERVICES), rng.choice((1, 1, 2, 2, 3)))
+    state: Dict[str, Dict[str, List[str]]] = {service: {} for service in services}
+    turns = []
+    for turn_id in range(2 * rng.randint(3, 10)):
+        speaker = "USER" if turn_id % 2 == 0 else "SYSTEM"
+        frames = []
+        for service in services:
+            frame: Dict[str, Any] = {"actions": [], "service": service, "slots": []}
+            if speaker == "USER":
+                slot = rng.choice(SERVICES[service])
+                state[service][f"{service}-{slot}"] = [rng.choice(VALUES.get(slot, VALUES["area"]))]
+                frame["state"] = {
+                    "active_intent": rng.choice([f"find_{service}", f"book_{service}", "NONE"]),
+                    "requested_slots": [],
+                    "slot_values": dict(state[service]),
+                }
+            frames.append(frame)
+        turns.append({"frames": frames, "speaker": speaker, "turn_id": str(turn_id), "utterance": sentence(rng, 6, 22)})
+    prefix = "PMUL" if len(services) > 1 else "SNG"
+    return {"dialogue_id": f"{prefix}{number:07d}.json", "services": services, "turns": turns}
+
+
+def write_multiwoz(root: Path, dialogues: int, seed: int) -> Dict[str, int]:
+    """MultiWOZ 2.2 layout under ``root``: schema.json and {train,dev,test}/dialogues_NNN.json."""
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "schema.json").write_text(json.dumps(multiwoz_schema(), indent=4), encoding="utf-8")
+    number = 0
+    shards: Dict[str, int] = {}
+    for index, (split, share) in enumerate(SPLIT_SHARES):
+        count = dialogues - number if index == len(SPLIT_SHARES) - 1 else round(dialogues * share)
+        split_dir = root / split
+        split_dir.mkdir(exist_ok=True)
+        shards[split] = 0
+        for start in range(0, count, SHARD_DIALOGUES):
+            shard = [multiwoz_dialogue(rng, number + i + 1) for i in range(min(SHARD_DIALOGUES, count - start))]
+            number += len(shard)
+            shards[split] += 1
+            with (split_dir / f"dialogues_{shards[split]:03d}.json").open("w", encoding="utf-8") as f:
+                json.dump(shard, f, indent=4)
+    return shards
+
+
+def misc_record(rng: random.Random, number: int) -> Dict[str, Any]:
+    """A record in the MiSC shape: speakers plus *_session_dialogue [[speakers...], [utterances...]] pairs."""
+    pair = rng.sample(SPEAKERS, 2)
+    record: Dict[str, Any] = {
+        "id": f"misc-{number}",
+        "main_speaker": pair[0],
+        "speaker_list": pair,
+        "relationship": rng.choice(RELATIONSHIPS),
+        "time_interval": rng.choice(INTERVALS),
+    }
+    for session in SESSIONS[: rng.randint(2, len(SESSIONS))]:
+        turns = rng.randint(4, 12)
+        record[f"{session}_session_dialogue"] = [
+            [pair[i % 2] for i in range(turns)],
+            [sentence(rng, 5, 18) for _ in range(turns)],
+        ]
+    record["summary"] = sentence(rng, 10, 30)
+    return record
+
+
+def misc_records(records: int, seed: int) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    for number in range(records):
+        yield misc_record(rng, number)
+
+
+def write_misc(root: Path, records: int, seed: int) -> None:
+    """``misc.jsonl`` (nested records) and ``misc.csv`` (flat: sessions joined into one text column)."""
+    root.mkdir(parents=True, exist_ok=True)
+    with (root / "misc.jsonl").open("w", encoding="utf-8") as f:
+        for record in misc_records(records, seed):
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    with (root / "misc.csv").open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "main_speaker", "relationship", "time_interval", "text"])
+        for record in misc_records(records, seed):
+            text = " ".join(u for k, v in record.items() if k.endswith("_session_dialogue") for u in v[1])
+            writer.writerow([record["id"], record["main_speaker"], record["relationship"], record["time_interval"], text])
+
+
+def ensure_data(workdir: Path, dialogues: int, records: int, seed: int, keep_indexes: bool = False) -> Dict[str, Any]:
+    """Generate the synthetic corpora under ``workdir`` unless the same ones are already there.
+
+    Anything else in the generated directories (indexes, columnar copies and
+    other sidecars the apps write) is removed unless ``keep_indexes``, so every
+    run measures index builds from scratch.
+    """
+    manifest_path = workdir / MANIFEST
+    wanted = {"version": SYNTH_VERSION, "dialogues": dialogues, "records": records, "seed": seed}
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        manifest = {}
+    if {k: manifest.get(k) for k in wanted} != wanted:
+        for sub in (MULTIWOZ_DIR.parent, MISC_DIR):
+            shutil.rmtree(workdir / sub, ignore_errors=True)
+        print(f"Generating {dialogues:,} dialogues and {records:,} records under {workdir}…", file=sys.stderr, flush=True)
+        shards = write_multiwoz(workdir / MULTIWOZ_DIR, dialogues, seed) if dialogues else {}
+        if records:
+            write_misc(workdir / MISC_DIR, records, seed)
+        files = sorted(str(p.relative_to(workdir)) for sub in (MULTIWOZ_DIR.parent, MISC_DIR) for p in (workdir / sub).rglob("*") if p.is_file())
+        manifest = dict(wanted, shards=shards, files=files)
+        manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    elif not keep_indexes:
+        generated = set(manifest["files"])
+        for sub in (MULTIWOZ_DIR.parent, MISC_DIR):
+            for path in sorted((workdir / sub).rglob("*"), reverse=True):
+                if path.is_file() and str(path.relative_to(workdir)) not in generated:
+                    path.unlink()
+    return manifest
+
+
+def parse_scale(text: str) -> int:
+    """``10000``, ``10k``, ``1.5M``…"""
+    text = text.strip().lower().replace("_", "")
+    factor = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if factor > 1 else text) * factor)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate synthetic MultiWOZ- and MiSC-shaped data for the benchmarks.")
+    parser.add_argument("workdir", type=Path)
+    parser.add_argument("--dialogues", type=parse_scale, default=10_000)
+    parser.add_argument("--records", type=parse_scale, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    manifest = ensure_data(args.workdir, args.dialogues, args.records, args.seed, keep_indexes=True)
+    print(json.dumps({k: v for k, v in manifest.items() if k != "files"}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+APPS_DIR = Path(__file__).resolve().parents[1] / "apps"
+# Modules every explorer ships its own copy of, so each app folder still deploys
+# on its own. The copies under CANONICAL_APP are edited; the others are generated.
+CANONICAL_APP = "multiwoz"
+SHARED_MODULES: List[str] = ["matching.py", "minhash.py", "result_cache.py", "sampling.py", "serving.py"]
+# All that differs between copies: indentation, and the ENV_PREFIX line naming their environment variables
+APP_STYLES: Dict[str, Dict[str, str]] = {
+    "multiwoz": {"indent": "\t", "env_prefix": "MULTIWOZ_"},
+    "misc": {"indent": "    ", "env_prefix": "MISC_"},
+}
+ENV_PREFIX_LINE = re.compile(r'^ENV_PREFIX(: str)? = "[A-Z_]*"$', re.M)
+
+
+def render(source: str, app: str) -> str:
+    """The canonical ``source`` as ``app`` ships it."""
+    style = APP_STYLES[app]
+    lines = []
+    for line in source.splitlines(keepends=True):
+        body = line.lstrip("\t")
+        lines.append(style["indent"] * (len(line) - len(body)) + body)
+    return ENV_PREFIX_LINE.sub(lambda m: f'ENV_PREFIX{m.group(1) or ""} = "{style["env_prefix"]}"', "".join(lines))
+
+
+def expected_copies(apps_dir: Path = APPS_DIR) -> Dict[Path, str]:
+    """Every generated copy and the text it should have."""
+    copies = {}
+    for module in SHARED_MODULES:
+        source = (apps_dir / CANONICAL_APP / module).read_text(encoding="utf-8")
+        for app in APP_STYLES:
+            if app != CANONICAL_APP:
+                copies[apps_dir / app / module] = render(source, app)
+    return copies
+
+
+def stale_copies(apps_dir: Path = APPS_DIR) -> List[Path]:
+    """Copies that are missing or differ from their canonical module."""
+    return [
+        path
+        for path, text in expected_copies(apps_dir).items()
+        if not path.exists() or path.read_text(encoding="utf-8") != text
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=f"Regenerate the explorers' copies of the modules they share from apps/{CANONICAL_APP}."
+    )
+    parser.add_argument("--check", action="store_true", help="only report stale copies; exit status 1 if any")
+    args = parser.parse_args()
+    stale = stale_copies()
+    if args.check:
+        for path in stale:
+            print(f"out of date: {path.relative_to(APPS_DIR.parent)}", file=sys.stderr)
+        return 1 if stale else 0
+    copies = expected_copies()
+    for path in stale:
+        path.write_text(copies[path], encoding="utf-8")
+        print(f"updated {path.relative_to(APPS_DIR.parent)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())